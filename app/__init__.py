@@ -1,50 +1,85 @@
 import asyncio
+import glob
 import logging
-
-import click
-from flask import Flask
-from flask.cli import with_appcontext
+import os
+from typing import TYPE_CHECKING
 
 from app.config import Config
 
-from app.resources import api, initLogger
+if TYPE_CHECKING:
+    from flask import Flask
 
 logger = logging.getLogger(Config.APP_NAME)
 
 
-def create_app() -> Flask:
+def create_app() -> "Flask":
+    # Flask, Flask-RESTX and the browser stack are imported here and in the
+    # commands that need them, so `import app` (and app.cli) stays cheap
+    import click
+    from flask import Flask
+    from flask.cli import with_appcontext
+
+    from app.cli import convert_steps, report, run_log, validate
+    from app.resources import api, initLogger
+
     app = Flask(__name__)
 
     api.api.init_app(app)
 
     @click.command()
-    @click.option("--mode", default="ai", help="ai or replay")
+    @click.option("--mode", default="ai", help="ai, cache or replay")
     @click.option("--testcase", default="./storage/testcase/create_backup_job_365.txt", help="Path to the steps file")
+    @click.option("--resume-from", default=None,
+                  help="Step number, last-failure or changed: replay the previous run's checkpoint up to there")
     @with_appcontext
-    def process(mode, testcase):
+    def process(mode, testcase, resume_from):
         initLogger()
-        from app.services.main import MainService
-        asyncio.run(MainService().process(mode=mode, test_case=testcase))
+        from app.services.checkpoints import parse_resume_from
+        from app.services.main import DATA_FILE, MainService, resolve_testcase_path
+        from app.testcase.compiled import TestCaseCache
+
+        if resume_from:
+            try:
+                parse_resume_from(resume_from)
+            except ValueError as e:
+                raise click.BadParameter(str(e), param_hint="--resume-from")
 
+        path = resolve_testcase_path(testcase)
+        if "dataset" in TestCaseCache().load(path, DATA_FILE).directives:
+            if resume_from:
+                raise click.UsageError("--resume-from is not supported for @dataset testcases")
+            # One run per @dataset row, scheduled like a suite
+            from app.services.suite import SuiteRunner
+            runner = SuiteRunner(os.path.dirname(path) or ".", mode=mode, pattern=glob.escape(os.path.basename(path)))
+            summary = asyncio.run(runner.run())
+            logger.info(f"✓ Summary: {runner.run_dir}/summary.json")
+            if summary["failed"]:
+                raise SystemExit(1)
+            return
+        asyncio.run(MainService().process(mode=mode, test_case=testcase, resume_from=resume_from))
 
     @click.command()
-    @click.option("--input", default="./storage/steps.txt", help="Input steps file path")
-    @click.option("--output-json", default="./storage/actions.json", help="Output JSON file path")
-    @click.option("--output-text", default="./storage/actions_natural.txt", help="Output natural language file path")
+    @click.option("--directory", default="./storage/testcase", help="Directory with testcase .txt files")
+    @click.option("--mode", default="ai", help="ai or cache")
+    @click.option("--concurrency", default=None, type=int, help="Max testcases in flight (default SUITE_CONCURRENCY)")
+    @click.option("--output", default="./storage/results", help="Directory for per-test results and summary")
     @with_appcontext
-    def convert_steps(input, output_json, output_text):
-        """Convert human-written test steps to Stagehand-friendly actions."""
+    def process_suite(directory, mode, concurrency, output):
+        """Run all testcases of a directory concurrently on a shared browser."""
         initLogger()
-        from app.utils.step_converter import convert_steps_to_actions
-        
-        logger.info(f"Converting steps from: {input}")
-        actions = convert_steps_to_actions(input, output_json, output_text)
-        logger.info(f"✓ Converted {len(actions)} actions")
-        logger.info(f"✓ JSON output: {output_json}")
-        logger.info(f"✓ Text output: {output_text}")
+        from app.services.suite import SuiteRunner
+        runner = SuiteRunner(directory, concurrency=concurrency, mode=mode, output_dir=output)
+        summary = asyncio.run(runner.run())
+        logger.info(f"✓ Summary: {runner.run_dir}/summary.json")
+        if summary["failed"]:
+            raise SystemExit(1)
 
     app.cli.add_command(process)
+    app.cli.add_command(process_suite)
     app.cli.add_command(convert_steps)
+    app.cli.add_command(validate)
+    app.cli.add_command(run_log)
+    app.cli.add_command(report)
 
     logger.info("Version -> %s" % Config.VERSION)
     return app
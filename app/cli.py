@@ -0,0 +1,126 @@
+"""
+Browser-free commands.
+
+Registered on the Flask CLI as well, but also runnable without Flask or
+the Stagehand/Playwright stack, which is what CI lint/validate jobs use:
+
+    python -m app.cli validate --directory=./storage/testcase
+    python -m app.cli convert-steps --input=./storage/steps.txt
+    python -m app.cli run-log --follow
+    python -m app.cli report --top=20
+"""
+import glob
+import json
+import logging
+import os
+
+import click
+
+from app.config import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+
+@click.command()
+@click.option("--input", default="./storage/steps.txt", help="Input steps file path")
+@click.option("--output-json", default="./storage/actions.json", help="Output JSON file path")
+@click.option("--output-text", default="./storage/actions_natural.txt", help="Output natural language file path")
+def convert_steps(input, output_json, output_text):
+    """Convert human-written test steps to Stagehand-friendly actions."""
+    from app.resources import initLogger
+    initLogger()
+    from app.utils.step_converter import convert_steps_to_actions
+
+    logger.info(f"Converting steps from: {input}")
+    actions = convert_steps_to_actions(input, output_json, output_text)
+    logger.info(f"✓ Converted {len(actions)} actions")
+    logger.info(f"✓ JSON output: {output_json}")
+    logger.info(f"✓ Text output: {output_text}")
+
+
+@click.command()
+@click.argument("paths", nargs=-1)
+@click.option("--directory", default="./storage/testcase", help="Directory with testcase .txt files (when no paths are given)")
+@click.option("--data", "data_path", default="./storage/data.json", help="Data file for {{key}} placeholders")
+def validate(paths, directory, data_path):
+    """Parse and compile testcases, reporting syntax errors and unresolved placeholders."""
+    from app.testcase.compiled import PLACEHOLDER_RE, TestCaseCache, dataset_path, load_dataset
+
+    paths = list(paths) or sorted(glob.glob(os.path.join(directory, "*.txt")))
+    testcases = TestCaseCache()
+    failures = 0
+
+    for path in paths:
+        try:
+            test_case = testcases.load(path, data_path)
+            keys = set(test_case.data)
+            rows_path = dataset_path(test_case, path)
+            if rows_path:
+                keys |= set(load_dataset(rows_path)[0])
+        except (OSError, ValueError) as e:
+            failures += 1
+            click.echo(f"✗ {path}: {e}")
+            continue
+
+        missing = sorted({
+            slot for step in test_case.steps for slot in PLACEHOLDER_RE.findall(step.text)
+            if slot not in keys
+        })
+        if missing:
+            failures += 1
+            click.echo(f"✗ {path}: unresolved placeholders {', '.join(missing)}")
+            continue
+
+        fast = sum(1 for step in test_case.steps if step.fast_path)
+        click.echo(f"✓ {path}: {len(test_case.steps)} steps ({fast} on the fast path)")
+
+    if failures:
+        raise SystemExit(1)
+
+
+@click.command("run-log")
+@click.argument("path", required=False)
+@click.option("--follow", is_flag=True, help="Keep printing new records until the run ends")
+@click.option("--array", "as_array", is_flag=True, help="Print the executed actions as one JSON array (old cached_steps.json format)")
+def run_log(path, follow, as_array):
+    """Print a JSONL run log (default: the most recent one in RUN_LOG_DIR)."""
+    from app.services.run_log import latest_run_log, load_actions, read_run_log
+
+    path = path or latest_run_log()
+    if not path:
+        raise click.ClickException(f"No run logs in {Config.RUN_LOG_DIR}")
+
+    if as_array:
+        click.echo(json.dumps(load_actions(path), indent=2, ensure_ascii=False))
+        return
+    for record in read_run_log(path, follow=follow):
+        click.echo(json.dumps(record, ensure_ascii=False))
+
+
+@click.command()
+@click.argument("paths", nargs=-1)
+@click.option("--top", default=10, help="Number of slowest steps to list")
+@click.option("--json", "as_json", is_flag=True, help="Print the report as JSON")
+def report(paths, top, as_json):
+    """Phase percentiles, LLM usage and the slowest steps across stored run logs."""
+    from app.services.report import build_report, format_report
+
+    data = build_report(list(paths) or None, top=top)
+    if not data["files"]:
+        raise click.ClickException("No run logs found")
+    click.echo(json.dumps(data, indent=2, ensure_ascii=False) if as_json else format_report(data))
+
+
+@click.group()
+def cli():
+    pass
+
+
+cli.add_command(convert_steps)
+cli.add_command(validate)
+cli.add_command(run_log)
+cli.add_command(report)
+
+
+if __name__ == "__main__":
+    cli()
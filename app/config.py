@@ -18,4 +18,64 @@ class Config:
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
     APP_NAME: str = os.getenv("APP_NAME", "QA_TESTS")
     LOGGER_TYPE: str = os.getenv("LOGGER_TYPE", "console")
+    LOGGER_FORMAT: str = os.getenv("LOGGER_FORMAT", "text")
+    LOGGER_LEVEL: str = os.getenv("LOGGER_LEVEL", "DEBUG")
+    LOGGER_ASYNC: bool = os.getenv("LOGGER_ASYNC", "True").lower() == "true"
     REQUEST_TIMEOUT: int = int(os.getenv("REQUEST_TIMEOUT", "60"))
+
+    SELECTOR_CACHE_FILE: str = os.getenv("SELECTOR_CACHE_FILE", "./storage/selector_cache.json")
+    SELECTOR_CACHE_TIMEOUT_MS: int = int(os.getenv("SELECTOR_CACHE_TIMEOUT_MS", "3000"))
+
+    BROWSER_HEADLESS: bool = os.getenv("BROWSER_HEADLESS", "False").lower() == "true"
+    SUITE_CONCURRENCY: int = int(os.getenv("SUITE_CONCURRENCY", "4"))
+
+    SCREENSHOT_POLICY: str = os.getenv("SCREENSHOT_POLICY", "all")
+    SCREENSHOT_FORMAT: str = os.getenv("SCREENSHOT_FORMAT", "jpeg")
+    SCREENSHOT_QUALITY: int = int(os.getenv("SCREENSHOT_QUALITY", "80"))
+    SCREENSHOT_RING_SIZE: int = int(os.getenv("SCREENSHOT_RING_SIZE", "6"))
+    SCREENSHOT_QUEUE_SIZE: int = int(os.getenv("SCREENSHOT_QUEUE_SIZE", "32"))
+
+    SETTLE_QUIET_MS: int = int(os.getenv("SETTLE_QUIET_MS", "300"))
+    SETTLE_MAX_MS: int = int(os.getenv("SETTLE_MAX_MS", "5000"))
+
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+    SESSION_POOL_SIZE: int = int(os.getenv("SESSION_POOL_SIZE", "2"))
+    SESSION_MAX_USES: int = int(os.getenv("SESSION_MAX_USES", "20"))
+    SESSION_HEALTH_TIMEOUT_MS: int = int(os.getenv("SESSION_HEALTH_TIMEOUT_MS", "5000"))
+
+    SESSION_STATE_DIR: str = os.getenv("SESSION_STATE_DIR", "./storage/sessions")
+    SESSION_STATE_TTL_S: int = int(os.getenv("SESSION_STATE_TTL_S", str(8 * 3600)))
+
+    WORKER_CONCURRENCY: int = int(os.getenv("WORKER_CONCURRENCY", "2"))
+    WORKER_MAX_RETRIES: int = int(os.getenv("WORKER_MAX_RETRIES", "2"))
+    WORKER_SHUTDOWN_TIMEOUT_S: int = int(os.getenv("WORKER_SHUTDOWN_TIMEOUT_S", "600"))
+
+    FAST_PATH: bool = os.getenv("FAST_PATH", "True").lower() == "true"
+    FAST_PATH_TIMEOUT_MS: int = int(os.getenv("FAST_PATH_TIMEOUT_MS", "3000"))
+
+    TESTCASE_IR_DIR: str = os.getenv("TESTCASE_IR_DIR", "./storage/.compiled")
+
+    RUN_LOG_DIR: str = os.getenv("RUN_LOG_DIR", "./storage/runs")
+    RUN_LOG_COMPRESS: bool = os.getenv("RUN_LOG_COMPRESS", "False").lower() == "true"
+
+    RECOVERY_CACHE: bool = os.getenv("RECOVERY_CACHE", "True").lower() == "true"
+    RECOVERY_CACHE_FILE: str = os.getenv("RECOVERY_CACHE_FILE", "./storage/recovery_cache.json")
+
+    TRACING: str = os.getenv("TRACING", "off")
+    TRACING_ENDPOINT: str = os.getenv("TRACING_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACING_FILE: str = os.getenv("TRACING_FILE", "./storage/traces/spans.jsonl")
+    TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+    TRACING_PROPAGATE: bool = os.getenv("TRACING_PROPAGATE", "False").lower() == "true"
+
+    LLM_CACHE: bool = os.getenv("LLM_CACHE", "False").lower() == "true"
+    LLM_CACHE_DIR: str = os.getenv("LLM_CACHE_DIR", "./storage/llm_cache")
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+    LLM_CACHE_TTL_S: int = int(os.getenv("LLM_CACHE_TTL_S", str(7 * 24 * 3600)))
+
+    SCOPE_ACTIVE_WINDOW: bool = os.getenv("SCOPE_ACTIVE_WINDOW", "True").lower() == "true"
+
+    CHECKPOINTS: bool = os.getenv("CHECKPOINTS", "False").lower() == "true"
+    CHECKPOINT_DIR: str = os.getenv("CHECKPOINT_DIR", "./storage/checkpoints")
+
+    PIPELINE: bool = os.getenv("PIPELINE", "False").lower() == "true"
+    PIPELINE_SPECULATE_QUIET_MS: int = int(os.getenv("PIPELINE_SPECULATE_QUIET_MS", "100"))
@@ -0,0 +1,40 @@
+import logging
+import os
+import uuid
+
+from app import Config
+from app.services.main import MainService
+from app.services.run_log import run_log_path
+from app.services.session_pool import SessionPool
+
+logger = logging.getLogger(Config.APP_NAME)
+
+RESULTS_DIR = "./storage/results"
+
+
+async def process_message(queue_name: str, data: dict, pool: SessionPool) -> dict:
+    """
+    Run one queued testcase on a warm pooled session.
+
+    Message: {"testcase": "<file>", "mode": "ai|cache", "tenant": "<optional>",
+              "run_id": "<optional>"}
+    """
+    testcase = data.get("testcase")
+    if not testcase:
+        raise ValueError("Message has no 'testcase'")
+
+    run_id = data.get("run_id") or uuid.uuid4().hex[:12]
+    run_dir = os.path.join(RESULTS_DIR, queue_name, run_id)
+
+    async with pool.session(data.get("tenant")) as stagehand:
+        service = MainService(
+            stagehand=stagehand,
+            run_id=run_id,
+            run_log_file=run_log_path("run", run_dir),
+            screenshot_dir=os.path.join(run_dir, "screenshots"),
+        )
+        summary = await service.process(mode=data.get("mode", "ai"), test_case=testcase)
+
+    summary["run_id"] = run_id
+    logger.info(f"[{summary['status'].upper()}] {testcase} (run {run_id})")
+    return summary
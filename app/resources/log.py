@@ -1,49 +1,140 @@
-import sys
+import atexit
+import contextvars
+import json
 import logging
+import queue
+import sys
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
 
 from app.config import Config
 
 logger = logging.getLogger(Config.APP_NAME)
-logger.setLevel(logging.DEBUG)
+logger.setLevel(Config.LOGGER_LEVEL.upper())
 logging.getLogger().handlers = []
 
-globalExtra = {}
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+# Per-run fields (run_id, testcase, ...) attached to every record. A context
+# variable, so concurrent runs in one process (suite, queue worker) each see
+# their own fields; the dict is replaced, never mutated.
+_log_context = contextvars.ContextVar("log_context", default={})
+
+_listener = None
 
 
 def addExtra(key, val=None):
-    globalExtra[key] = val
+    _log_context.set({**_log_context.get(), key: val})
 
 
 def getExtra(extra=None):
     if extra is None:
         extra = {}
-    extra.update(globalExtra)
+    extra.update(_log_context.get())
     return extra
 
 
+@contextmanager
+def log_context(**fields):
+    """Add fields to the records logged inside the block (and its tasks)."""
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+class lazy:
+    """
+    Defer an expensive log argument until the record is emitted; nothing
+    is computed when the level is disabled:
+
+        logger.debug("Raw result: %s", lazy(describe, result))
+    """
+
+    __slots__ = ("fn", "args")
+
+    def __init__(self, fn, *args):
+        self.fn = fn
+        self.args = args
+
+    def __str__(self):
+        return str(self.fn(*self.args))
+
+
 class LogFilter(logging.Filter):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
     def filter(self, record):
-        record.extra = getExtra()
+        record.extra = _log_context.get()
         return True
 
 
-def initLogger():
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, message and the run context."""
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "message": record.getMessage(),
+            **getattr(record, "extra", {}),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RawQueueHandler(QueueHandler):
+    """
+    Queue the record as it is. The stock prepare() formats the message on
+    the calling thread; here the listener does it. The run context is
+    already a snapshot on the record (LogFilter runs before prepare).
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def _handler():
     if Config.LOGGER_TYPE == "file":
-        fh = logging.FileHandler("app.log")
-        formatter = logging.Formatter(
-            "%(asctime)s - %(levelname)s - %(message)s"
-        )
-        fh.setFormatter(formatter)
-        fh.addFilter(LogFilter())
-        logger.addHandler(fh)
+        handler = logging.FileHandler("app.log")
+    else:
+        handler = logging.StreamHandler(sys.stdout)
+    if Config.LOGGER_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
     else:
-        sh = logging.StreamHandler(sys.stdout)
-        formatter = logging.Formatter(
-            "%(asctime)s - %(levelname)s - %(message)s"
-        )
-        sh.setFormatter(formatter)
-        sh.addFilter(LogFilter())
-        logger.addHandler(sh)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def _stop_listener():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def initLogger():
+    global _listener
+    if logger.handlers:
+        # Already set up (e.g. by manage.py and again by a CLI command)
+        return
+
+    handler = _handler()
+    if not Config.LOGGER_ASYNC:
+        handler.addFilter(LogFilter())
+        logger.addHandler(handler)
+        return
+
+    # Records are queued on the calling thread (the filter reads the run
+    # context there) and formatted + written by the listener thread, so
+    # formatting (and lazy() arguments) and console/file I/O never block
+    # the event loop
+    queue_handler = RawQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(LogFilter())
+    logger.addHandler(queue_handler)
+    _listener = QueueListener(queue_handler.queue, handler)
+    _listener.start()
+    atexit.register(_stop_listener)
@@ -0,0 +1,100 @@
+import logging
+
+from stagehand import Stagehand, StagehandConfig
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+BROWSER_ARGS = ["--disable-blink-features=AutomationControlled"]
+
+
+def stagehand_config(**overrides) -> StagehandConfig:
+    options = {
+        "env": "LOCAL",
+        "model_name": "google/gemini-2.5-flash",
+        "model_api_key": Config.GEMINI_API_KEY,
+        "verbose": 2,
+    }
+    options.update(overrides)
+    return StagehandConfig(**options)
+
+
+async def attach_context(stagehand: Stagehand, context) -> Stagehand:
+    """
+    Initialize a Stagehand instance on top of an existing BrowserContext
+    instead of letting stagehand.init() launch its own browser.
+
+    Browser and Playwright handles stay owned by the caller, so
+    stagehand.close() only closes this context.
+    """
+    from stagehand.browser import apply_stealth_scripts
+    from stagehand.context import StagehandContext
+
+    stagehand._playwright = None
+    stagehand._browser = None
+    stagehand._context = context
+    stagehand.context = await StagehandContext.init(context, stagehand)
+    await apply_stealth_scripts(context, stagehand.logger)
+
+    stagehand._page = await stagehand.context.new_page()
+    stagehand._playwright_page = stagehand._page._page
+    stagehand._initialized = True
+    return stagehand
+
+
+class BrowserPool:
+    """
+    One shared Chromium process; every session gets its own BrowserContext
+    (cookies, storage and cache isolated per test).
+    """
+
+    def __init__(self, headless: bool = None):
+        self.headless = Config.BROWSER_HEADLESS if headless is None else headless
+        self._playwright = None
+        self._browser = None
+
+    async def start(self):
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(
+            headless=self.headless,
+            args=BROWSER_ARGS,
+        )
+        logger.info(f"Shared browser started (headless={self.headless})")
+
+    async def new_session(self) -> Stagehand:
+        if self._browser is None:
+            raise RuntimeError("BrowserPool.start() must be awaited first")
+
+        context = await self._browser.new_context(
+            ignore_https_errors=True,
+            bypass_csp=True,
+            locale="en-US",
+            viewport={"width": 1280, "height": 980},
+        )
+        stagehand = Stagehand(config=stagehand_config())
+        try:
+            return await attach_context(stagehand, context)
+        except Exception:
+            await context.close()
+            raise
+
+    async def stop(self):
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception as e:
+                logger.warning(f"Error closing shared browser: {e}")
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
@@ -0,0 +1,145 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+# --resume-from values besides a step number
+RESUME_LAST_FAILURE = "last-failure"
+RESUME_CHANGED = "changed"
+
+# How a checkpointed step is brought back on resume
+RESOLVED_FAST_PATH = "fast_path"  # the step's compiled Playwright action
+RESOLVED_LIVE = "live"            # no deterministic form (wait steps, agent recoveries): run it again
+RESOLVED_SKIPPED = "skipped"      # login prefix skipped through @use_session
+
+
+class Checkpoint:
+    """
+    Progress of one run of a testcase: the page state it started from
+    (URL + Playwright storage state) and, per completed step, the URL it
+    left the page on and how the step was resolved. Saved after every step,
+    so a failed or killed run can be resumed from where it stopped.
+    """
+
+    def __init__(self, path: str, data: dict):
+        self.path = path
+        self.data = data
+
+    @property
+    def steps(self) -> list:
+        return self.data["steps"]
+
+    @property
+    def failed_step(self) -> int | None:
+        return self.data.get("failed_step")
+
+    @property
+    def start(self) -> dict:
+        return self.data.get("start") or {}
+
+    def record(self, step_no: int, step, url: str, resolved: dict):
+        """Completed step `step_no` (1-based); drops anything recorded after it."""
+        del self.steps[step_no - 1:]
+        self.steps.append({
+            "step": step_no,
+            "line_no": step.line_no,
+            "instruction": step.instruction,
+            "kind": step.kind,
+            "url": url,
+            "resolved": resolved,
+        })
+        self.data["failed_step"] = None
+        self.save()
+
+    def fail(self, step_no: int):
+        self.data["failed_step"] = step_no
+        self.save()
+
+    def save(self):
+        self.data["updated_at"] = time.time()
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.data, f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not write checkpoint: {e}")
+
+
+class CheckpointStore:
+    """Latest checkpoint per testcase (and dataset row) under `CHECKPOINT_DIR`."""
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or Config.CHECKPOINT_DIR
+
+    def path_for(self, testcase_path: str, data_row: dict = None) -> str:
+        key = f"{os.path.abspath(testcase_path)}|{json.dumps(data_row or {}, sort_keys=True, default=str)}"
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", os.path.splitext(os.path.basename(testcase_path))[0])
+        return os.path.join(self.directory, f"{name}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}.json")
+
+    def load(self, testcase_path: str, data_row: dict = None) -> Checkpoint | None:
+        path = self.path_for(testcase_path, data_row)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return Checkpoint(path, json.load(f))
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Checkpoint {path} unreadable: {e}")
+            return None
+
+    async def begin(self, testcase_path: str, data_row: dict, run_id: str, page) -> Checkpoint:
+        """New checkpoint of this run, starting from the page as it is now."""
+        checkpoint = Checkpoint(self.path_for(testcase_path, data_row), {
+            "run_id": run_id,
+            "testcase": testcase_path,
+            "start": {"url": page.url, "storage_state": await page.context.storage_state()},
+            "steps": [],
+            "failed_step": None,
+        })
+        checkpoint.save()
+        return checkpoint
+
+
+def first_changed_step(checkpoint: Checkpoint, steps: list) -> int:
+    """0-based index of the first step that differs from the checkpointed run (edited testcase)."""
+    for index, (step, recorded) in enumerate(zip(steps, checkpoint.steps)):
+        if step.instruction != recorded["instruction"] or step.kind != recorded["kind"]:
+            return index
+    return min(len(steps), len(checkpoint.steps))
+
+
+def parse_resume_from(value) -> int | str:
+    """Step number (1-based), `last-failure` or `changed`."""
+    text = str(value).strip().lower()
+    if text in (RESUME_LAST_FAILURE, RESUME_CHANGED):
+        return text
+    if text.isdigit() and int(text) >= 1:
+        return int(text)
+    raise ValueError(f"Invalid resume point '{value}', expected a step number, "
+                     f"'{RESUME_LAST_FAILURE}' or '{RESUME_CHANGED}'")
+
+
+def resume_point(checkpoint: Checkpoint, steps: list, resume_from) -> int:
+    """
+    0-based index of the first step to run live: the requested step, but
+    never past a step that was edited since the checkpoint was written or
+    that was never completed.
+    """
+    limit = first_changed_step(checkpoint, steps)
+    resume_from = parse_resume_from(resume_from)
+    if resume_from == RESUME_CHANGED:
+        return limit
+    if resume_from == RESUME_LAST_FAILURE:
+        if checkpoint.failed_step is None:
+            logger.info("The checkpointed run did not fail, resuming after its last step")
+            return limit
+        return min(checkpoint.failed_step - 1, limit)
+    return min(resume_from - 1, limit)
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import time
+
+from app import Config
+from app.testcase.step_compiler import CompiledStep
+
+logger = logging.getLogger(Config.APP_NAME)
+
+# ExtJS combo pickers render their options outside the field
+BOUNDLIST_ITEM = ".x-boundlist-item, .x-combo-list-item"
+
+# Expect / Wait re-count the visible text matches this often
+TEXT_POLL_S = 0.2
+
+
+class FastPathMiss(Exception):
+    """The compiled step could not be resolved unambiguously; use Stagehand."""
+
+
+def _visible(locator):
+    return locator.locator("visible=true")
+
+
+async def _single(locator, description: str):
+    """Exactly one visible match, otherwise the step is ambiguous."""
+    visible = _visible(locator)
+    count = await visible.count()
+    if count != 1:
+        raise FastPathMiss(f"{count} visible matches for {description}")
+    return visible.first
+
+
+async def _first_single(candidates, description: str):
+    for locator in candidates:
+        try:
+            return await _single(locator, description)
+        except FastPathMiss:
+            continue
+    raise FastPathMiss(f"No unique element for {description}")
+
+
+async def _wait_for_text(page, text: str, negate: bool, timeout_ms: int):
+    """
+    Wait until exactly one visible element has the text (none when negated).
+    Hidden copies, such as the inactive cards ExtJS keeps in the DOM, never
+    count; several visible ones are ambiguous.
+    """
+    visible = _visible(page.get_by_text(text, exact=True))
+    deadline = time.monotonic() + timeout_ms / 1000
+    while True:
+        count = await visible.count()
+        if count == (0 if negate else 1):
+            return
+        if count > 1 and not negate:
+            raise FastPathMiss(f'{count} visible matches for "{text}"')
+        if time.monotonic() >= deadline:
+            raise FastPathMiss(f'"{text}" still {"visible" if negate else "not visible"} after {timeout_ms} ms')
+        await asyncio.sleep(TEXT_POLL_S)
+
+
+async def _field(page, label: str):
+    return await _first_single(
+        (page.get_by_label(label, exact=True), page.get_by_placeholder(label, exact=True)),
+        f'field "{label}"',
+    )
+
+
+async def _clickable(page, name: str, role: str = None):
+    roles = (role,) if role in ("button", "link") else ("button", "link", "menuitem", "tab")
+    candidates = [page.get_by_role(r, name=name, exact=True) for r in roles]
+    candidates.append(page.get_by_text(name, exact=True))
+    return await _first_single(candidates, f'"{name}"')
+
+
+async def execute_compiled(page, step: CompiledStep, timeout_ms: int = None,
+                           wait_timeout_ms: int = None):
+    """
+    Run a compiled step with plain Playwright locators.
+
+    Raises FastPathMiss when the target is missing or ambiguous so the
+    caller can hand the step to page.act()/page.observe() unchanged.
+    """
+    timeout_ms = timeout_ms or Config.FAST_PATH_TIMEOUT_MS
+    try:
+        await _execute(page, step, timeout_ms, wait_timeout_ms or timeout_ms)
+    except FastPathMiss:
+        raise
+    except Exception as e:
+        raise FastPathMiss(f"{step.action} '{step.target}' failed: {e}") from e
+
+
+async def _execute(page, step: CompiledStep, timeout_ms: int, wait_timeout_ms: int):
+    if step.action == "type":
+        field = await _field(page, step.target)
+        await field.fill(step.value or "", timeout=timeout_ms)
+
+    elif step.action == "clear":
+        field = await _field(page, step.target)
+        await field.fill("", timeout=timeout_ms)
+
+    elif step.action in ("click", "open"):
+        target = await _clickable(page, step.target, step.role)
+        await target.click(timeout=timeout_ms)
+
+    elif step.action == "ensure":
+        roles = (step.role,) if step.role else ("checkbox", "radio")
+        candidates = [page.get_by_role(r, name=step.target, exact=True) for r in roles]
+        candidates.append(page.get_by_label(step.target, exact=True))
+        target = await _first_single(candidates, f'option "{step.target}"')
+        if await target.is_checked() == step.negate:
+            if step.negate:
+                await target.uncheck(timeout=timeout_ms)
+            else:
+                await target.check(timeout=timeout_ms)
+
+    elif step.action == "select":
+        field = await _field(page, step.target)
+        tag = await field.evaluate("el => el.tagName.toLowerCase()")
+        if tag == "select":
+            await field.select_option(label=step.value, timeout=timeout_ms)
+        else:
+            await field.click(timeout=timeout_ms)
+            option = page.locator(BOUNDLIST_ITEM).filter(has_text=step.value)
+            await (await _single(option, f'option "{step.value}"')).click(timeout=timeout_ms)
+
+    elif step.action in ("expect", "wait"):
+        wait_ms = timeout_ms if step.action == "expect" else wait_timeout_ms
+        await _wait_for_text(page, step.target, step.negate, wait_ms)
+
+    elif step.action == "press":
+        await page.keyboard.press(step.target)
+
+    else:
+        raise FastPathMiss(f"Unsupported compiled action: {step.action}")
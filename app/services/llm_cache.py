@@ -0,0 +1,192 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+# Stagehand inference calls that only depend on their prompt: the instruction
+# and the pruned accessibility tree of the page
+CACHED_FUNCTIONS = ("ACT", "OBSERVE")
+
+NO_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+
+
+def scrub_images(value):
+    """
+    A prompt (messages or call parameters) without inline image payloads,
+    which differ on every capture. Shared with the benchmark cassettes.
+    """
+    if isinstance(value, dict):
+        if value.get("type") in ("image_url", "image"):
+            return {"type": value["type"]}
+        return {k: scrub_images(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [scrub_images(v) for v in value]
+    if isinstance(value, str) and value.startswith("data:image/"):
+        return "data:image"
+    return value
+
+
+def _has_elements(response) -> bool:
+    """Only answers that found something are worth replaying."""
+    try:
+        return bool(json.loads(response.choices[0].message.content).get("elements"))
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return False
+
+
+def response_key(model: str, messages: list, params: dict) -> str:
+    """Content address of one inference: model + prompt (instruction, DOM snapshot) + parameters."""
+    payload = {"model": model, "messages": scrub_images(messages), "params": scrub_images(params)}
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    On-disk, content-addressed cache of Stagehand's act/observe model
+    responses: `<dir>/<key[:2]>/<key>.json`.
+
+    The key covers the prompt, which already holds the instruction and the
+    page's accessibility tree, so a hit means the model would have been
+    asked the exact same question. The file mtime is the LRU clock (touched
+    on every hit); `ttl_s` is counted from when the response was stored.
+    Entries are written atomically, so parallel runs can share a directory.
+    """
+
+    def __init__(self, directory: str = None, max_entries: int = None, ttl_s: int = None):
+        self.directory = directory or Config.LLM_CACHE_DIR
+        self.max_entries = Config.LLM_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.ttl_s = Config.LLM_CACHE_TTL_S if ttl_s is None else ttl_s
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def path_for(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key: str) -> dict | None:
+        path = self.path_for(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            self.misses += 1
+            return None
+
+        if self.ttl_s and time.time() - entry.get("created_at", 0) > self.ttl_s:
+            self._remove(path)
+            self.misses += 1
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return entry["response"]
+
+    def put(self, key: str, response: dict, function_name: str = None):
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"created_at": time.time(), "function": function_name, "response": response},
+                      f, ensure_ascii=False, default=str)
+        os.replace(tmp_path, path)
+        self.stores += 1
+        # Bound the directory every so often instead of on every write
+        if self.max_entries and self.stores % 50 == 0:
+            self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used beyond max_entries."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        entries.append((os.path.getmtime(path), path))
+                    except OSError:
+                        continue
+
+        now = time.time()
+        entries.sort()
+        excess = len(entries) - self.max_entries if self.max_entries else 0
+        for index, (mtime, path) in enumerate(entries):
+            # mtime >= created_at, so an entry untouched for ttl_s is expired too
+            if index < excess or (self.ttl_s and now - mtime > self.ttl_s):
+                self._remove(path)
+
+    def invalidate(self, key: str):
+        self._remove(self.path_for(key))
+
+    def _remove(self, path: str):
+        try:
+            os.remove(path)
+            self.evictions += 1
+        except OSError:
+            pass
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores, "evictions": self.evictions}
+
+
+def install_response_cache(stagehand, cache: LLMResponseCache):
+    """
+    Answer the act/observe inferences of this Stagehand session from
+    `cache`, calling the model only on a miss. Patches the session's LLM
+    client instance; a no-op in API mode (no local client).
+    """
+    client = getattr(stagehand, "llm", None)
+    if client is None or getattr(client, "_response_cache", None) is cache:
+        return
+    original = getattr(client, "_uncached_create_response", None) or client.create_response
+    client._uncached_create_response = original
+    client._response_cache = cache
+    client._response_cache_last_hit = None
+
+    async def create_response(*, messages, model=None, function_name=None, **kwargs):
+        if function_name not in CACHED_FUNCTIONS:
+            return await original(messages=messages, model=model, function_name=function_name, **kwargs)
+
+        key = response_key(model or client.default_model, messages, kwargs)
+        cached = cache.get(key)
+        if cached is not None:
+            import litellm
+            logger.debug(f"LLM response cache hit ({function_name})")
+            client._response_cache_last_hit = key
+            # No tokens were spent: Stagehand accounts `usage` as real cost.
+            # Hits are counted by the cache itself
+            return litellm.ModelResponse(**{**cached, "usage": dict(NO_USAGE)})
+
+        client._response_cache_last_hit = None
+        response = await original(messages=messages, model=model, function_name=function_name, **kwargs)
+        if _has_elements(response):
+            try:
+                cache.put(key, response.model_dump(), function_name)
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning(f"Could not store LLM response: {e}")
+        return response
+
+    client.create_response = create_response
+
+
+def forget_last_hit(stagehand):
+    """Drop the cached response the session's last inference was answered from (it led to a failure)."""
+    client = getattr(stagehand, "llm", None)
+    key = getattr(client, "_response_cache_last_hit", None)
+    if key:
+        client._response_cache.invalidate(key)
+        client._response_cache_last_hit = None
+        logger.info("Cached LLM response led to a failure, dropped it")
+
+
+def cache_hits(stagehand) -> int:
+    cache = getattr(getattr(stagehand, "llm", None), "_response_cache", None)
+    return cache.hits if cache is not None else 0
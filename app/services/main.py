@@ -1,194 +1,483 @@
 import asyncio
 import json
 import logging
-from stagehand import StagehandConfig, Stagehand
-from app.testcase.test_case import load_testcase
+import os
+from contextlib import asynccontextmanager
+from app.testcase.compiled import TestCaseCache, bind_row
+from app.services.selector_cache import PartialReplayError, SelectorCache, page_fingerprint, replay_cached_step
+from app.services.smart_selector import extract_method_from_act_result, perform_act_with_smart_selector
+from app.services.screenshots import ScreenshotPipeline
+from app.services.session_state import SessionStateStore, apply_storage_state
+from app.services.checkpoints import (
+    RESOLVED_FAST_PATH, RESOLVED_LIVE, RESOLVED_SKIPPED, CheckpointStore, resume_point,
+)
+from app.services.settle import wait_for_settle
+from app.services.scope import SCOPE_AUTO, SCOPE_PAGE, scoped_snapshot
+from app.services.pipeline import Lookahead
+from app.services.wait_engine import watch_status
+from app.services.recovery_cache import RecoveryCache, perform_agent_action, verify_replay
+from app.services.llm_cache import LLMResponseCache, cache_hits, forget_last_hit, install_response_cache
+from app.services.metrics import StepTimer, count_agent_requests, count_llm_requests, total_metrics
+from app.services.run_log import RESTART, RUN_END, RUN_START, STEP, RunLog, run_log_path
+from app.services.tracing import NOOP_SPAN, get_tracer, propagate
+from app.resources.log import lazy, log_context
+from app.services.result_validation import RESOLVED, validate_agent_result, validate_result
+from app.services.fast_path import FastPathMiss, execute_compiled
+from app.testcase.step_compiler import KIND_CLICK, KIND_EXPECT, KIND_WAIT
 from app import Config
 import re
 import time
+import uuid
 
 logger = logging.getLogger(Config.APP_NAME)
 
+TESTCASE_DIR = "./storage/testcase"
+DATA_FILE = "./storage/data.json"
+
+
+def describe_result(result) -> str:
+    """Type, repr and public attributes of a Stagehand result (debug logging)."""
+    attrs = [attr for attr in dir(result) if not attr.startswith("_")]
+    return f"{type(result).__name__}: {result!r} (attributes: {attrs})"
+
+
+def resolve_testcase_path(test_case: str) -> str:
+    """Accept either a path or a file name relative to storage/testcase."""
+    if os.path.exists(test_case):
+        return test_case
+    return os.path.join(TESTCASE_DIR, test_case)
+
 
 class MainService:
-    def __init__(self):
+    def __init__(self, stagehand=None, cache_file=None, screenshot_dir=None, selector_cache=None,
+                 run_id=None, run_log_file=None, recovery_cache=None, llm_cache=None):
         self.recorded_actions = []  # сюда пишем действия
-        self.cache_file = "./storage/cached_steps.json"
+        # Recorded agent actions read by replay mode
+        self.cache_file = cache_file or "./storage/cached_steps.json"
+        self.run_id = run_id or f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        # Streaming JSONL log of this run, one record per executed step
+        self.run_log_file = run_log_file or run_log_path(self.run_id)
+        self.run_log = None
+        # Tracing span of the current run (NOOP_SPAN when tracing is off / unsampled)
+        self.trace = NOOP_SPAN
+        self.screenshot_dir = screenshot_dir or "./storage/screenshots"
+        self.screenshots = ScreenshotPipeline(self.screenshot_dir)
         self.test_case = None
-        
-
-    async def process(self, mode="ai",test_case="./storage/testcase/create_backup_job_365.txt"):
+        self.selector_cache = selector_cache
+        # Successful agent recoveries, replayed before agent.execute() runs again
+        if recovery_cache is None and Config.RECOVERY_CACHE:
+            recovery_cache = RecoveryCache()
+        self.recovery_cache = recovery_cache
+        # act/observe model responses by prompt (instruction + page snapshot)
+        if llm_cache is None and Config.LLM_CACHE:
+            llm_cache = LLMResponseCache()
+        self.llm_cache = llm_cache
+        self.session_states = SessionStateStore()
+        # Per-step progress of this run, what --resume-from restarts from
+        self.checkpoints = CheckpointStore() if Config.CHECKPOINTS else None
+        self.checkpoint = None
+        # Pipelined mode: speculative Expect observes used / redone
+        self.speculation = {"used": 0, "discarded": 0}
+        self.testcases = TestCaseCache()
+        # Externally managed session (e.g. handed in by the suite runner)
+        self.stagehand = stagehand
+
+    async def process(self, mode="ai",test_case="./storage/testcase/create_backup_job_365.txt", data_row: dict = None,
+                      resume_from=None):
+        # run_id / testcase go with every record logged during this run (and its tasks)
+        with log_context(run_id=self.run_id, testcase=os.path.basename(test_case)):
+            return await self._process(mode, test_case, data_row, resume_from)
+
+    async def _process(self, mode: str, test_case: str, data_row: dict = None, resume_from=None):
         logger.debug(f"Start QA automation, mode={mode}")
-        
-       
-        test_case = f"./storage/testcase/{test_case}"
-        logger.info(f"Loading steps from {test_case}")
-        with open(test_case, "r", encoding="utf-8") as f:
-            steps_text = f.read()
+        started_at = time.time()
 
-        # use test_case.py to parse steps.txt
+        test_case = resolve_testcase_path(test_case)
+        logger.info(f"Loading steps from {test_case}")
 
-        self.test_case = load_testcase(test_case)
-        action_steps = [step.text for step in self.test_case.steps]
-        print(action_steps)
+        # Parsed steps + resolved data.json placeholders, cached until either file changes
+        self.test_case = self.testcases.load(test_case, DATA_FILE)
+        if data_row:
+            # One row of the testcase's @dataset
+            self.test_case = bind_row(self.test_case, data_row)
+        action_steps = self.test_case.steps
+        data_vars = self.test_case.data
 
         logger.info(f"Loaded {len(action_steps)} action steps from {test_case}")
 
-        # Load test data
-        data_path = "./storage/data.json"
-        with open(data_path, "r", encoding="utf-8") as f:
-            data_vars = json.load(f)
-
-        # Init Stagehand
-        config = StagehandConfig(
-            env="LOCAL",
-            model_name="google/gemini-2.5-flash",
-            model_api_key=Config.GEMINI_API_KEY,
-            verbose=2
+        # --resume-from: replay the previous run's steps up to the resume point
+        previous = None
+        resume_at = 0
+        if resume_from and mode != "replay":
+            if self.checkpoints is None:
+                # Keep checkpointing the resumed run so it can be resumed in turn
+                self.checkpoints = CheckpointStore()
+            previous = self.checkpoints.load(test_case, data_row)
+            if previous is None:
+                logger.warning("No checkpoint for this testcase, running from the first step")
+            else:
+                resume_at = resume_point(previous, action_steps, resume_from)
+
+        # Init Stagehand (only when no session was handed in)
+        owns_stagehand = self.stagehand is None
+        if owns_stagehand:
+            # Imported here: stagehand costs seconds of import time
+            from stagehand import Stagehand
+            from app.services.browser_pool import stagehand_config
+            self.stagehand = Stagehand(config=stagehand_config())
+            await self.stagehand.init()
+        stagehand = self.stagehand
+        # Counts what reaches the model, so it goes below the response cache
+        count_llm_requests(stagehand)
+        if self.llm_cache is not None:
+            install_response_cache(stagehand, self.llm_cache)
+
+        self.trace = get_tracer().start_trace(
+            "testcase", **{"run.id": self.run_id, "testcase.name": self.test_case.name,
+                           "testcase.file": test_case, "run.mode": mode}
         )
+        self.run_log = RunLog(self.run_log_file)
+        self.run_log.write(RUN_START, run_id=self.run_id, testcase=self.test_case.name,
+                           file=test_case, mode=mode, steps_total=len(action_steps),
+                           trace_id=self.trace.trace_id, resumed_at=resume_at + 1 if previous else None)
+        logger.info(f"Run log: {self.run_log_file}")
+        summary = None
+
+        try:
+            page = stagehand.page
+
+            await page.set_viewport_size({
+                "width": 1280,
+                "height": 980
+            })
+
+            url = data_vars.get("url", "https://127.0.0.1:4443/")
+
+            # @use_session: restore the recorded login state and skip the login prefix
+            # (a resumed run starts from the checkpointed run's start state instead)
+            session_name = self.test_case.directives.get("use_session") if mode != "replay" and not previous else None
+            restored = False
+            if session_name:
+                restored = await self.session_states.restore(session_name, page)
+
+            # Open your main app page
+            if previous is not None:
+                await apply_storage_state(page, previous.start.get("storage_state"), previous.start.get("url") or url)
+            elif not restored:
+                await page.goto(url)
+            logger.info("Initial page loaded")
+
+            if self.checkpoints is not None and mode != "replay":
+                self.checkpoint = await self.checkpoints.begin(test_case, data_row, self.run_id, page)
+
+            # Mode: REPLAY (без агента)
+            if mode == "replay":
+                await self.replay_mode(stagehand)
+                summary = self.summarize([], len(action_steps), started_at)
+                return summary
+
+            # CACHE mode: replay resolved selectors, LLM only on miss / failure
+            if mode == "cache" and self.selector_cache is None:
+                self.selector_cache = SelectorCache()
+            if self.selector_cache is not None:
+                logger.info(f"Selector cache enabled ({len(self.selector_cache.entries)} entries)")
+
+            # AI Mode: Execute each action using page.act()
+            logger.info("Starting AI mode - executing actions with page.act()")
+            setup_steps = self.test_case.session_setup_steps if session_name else 0
+            executed_actions = []
+
+            if previous is not None:
+                executed_actions = await self.resume_steps(stagehand, action_steps, previous, resume_at)
+            elif restored:
+                logger.info(f"Session '{session_name}' restored, skipping {setup_steps} login steps")
+                executed_actions = []
+                for action in self.skipped_steps(action_steps[:setup_steps]):
+                    self.log_step(executed_actions, action)
+                    self.checkpoint_step(page, action["step"], action_steps[action["step"] - 1],
+                                         {"kind": RESOLVED_SKIPPED})
+                executed_actions += await self.run_steps(stagehand, action_steps, start=setup_steps)
+
+                if self.post_login_expect_failed(executed_actions, action_steps, setup_steps):
+                    logger.warning(f"Post-login expectation failed, session '{session_name}' is stale - logging in again")
+                    self.session_states.invalidate(session_name)
+                    await page.context.clear_cookies()
+                    await page.goto(url)
+                    restored = False
+                    executed_actions = []
+                    if self.checkpoint is not None:
+                        # Start over from the logged-out page, or a resume would restore the stale session
+                        self.checkpoint = await self.checkpoints.begin(test_case, data_row, self.run_id, page)
+                    self.run_log.write(RESTART, reason=f"session '{session_name}' stale")
+
+            if session_name and not restored:
+                # Run the login prefix live and record the resulting state
+                executed_actions = await self.run_steps(stagehand, action_steps, stop=setup_steps)
+                if not self.failed_actions(executed_actions) and len(executed_actions) == setup_steps:
+                    await wait_for_settle(page)
+                    await self.session_states.save(session_name, page)
+                    executed_actions += await self.run_steps(stagehand, action_steps, start=setup_steps)
+            elif not session_name and previous is None:
+                executed_actions = await self.run_steps(stagehand, action_steps)
+
+            if self.llm_cache is not None:
+                stats = self.llm_cache.stats()
+                logger.info(f"LLM response cache: {stats['hits']} hits, {stats['misses']} misses")
+
+            if Config.PIPELINE and sum(self.speculation.values()):
+                logger.info(f"Speculative observes: {self.speculation['used']} used, "
+                            f"{self.speculation['discarded']} discarded")
+
+            if self.recovery_cache is not None and self.recovery_cache.hits:
+                logger.info(f"Recovery cache: {self.recovery_cache.hits} agent runs replayed")
+
+            if self.selector_cache is not None:
+                self.selector_cache.save()
+                logger.info(
+                    f"Selector cache: {self.selector_cache.hits} hits, "
+                    f"{self.selector_cache.misses} misses"
+                )
+
+            # Final screenshot
+            await wait_for_settle(page)
+            screenshot_path = await self.screenshots.capture(page, "final", "final")
+            if screenshot_path:
+                logger.info(f"Screenshot saved to {screenshot_path}")
+
+            summary = self.summarize(executed_actions, len(action_steps), started_at)
+            return summary
+        finally:
+            # Let the writer thread drain before the run is reported done
+            await asyncio.to_thread(self.screenshots.close)
+            self.run_log.write(RUN_END, **(summary or {"status": "error"}))
+            self.run_log.close()
+            if summary:
+                self.trace.set_attributes(**{"run.status": summary["status"],
+                                             "run.steps_executed": summary["steps_executed"]})
+            self.trace.end(None if summary and summary["status"] == "passed" else
+                           (summary or {}).get("error") or "run failed")
+            if owns_stagehand:
+                await stagehand.close()
+                self.stagehand = None
+            logger.debug("End QA automation")
+
+    async def replay_recovery(self, stagehand, key: str) -> bool:
+        """Replay a recorded agent recovery; False (and invalidated) when it does not reproduce the agent's run."""
+        entry = self.recovery_cache.get(key)
+        if not entry:
+            return False
 
-        stagehand = Stagehand(config=config)
-        await stagehand.init()
         page = stagehand.page
-        agent = stagehand.agent  # Access the agent for fallback reasoning
-
-        await page.set_viewport_size({
-            "width": 1280,
-            "height": 980
-        })
-
-        # Open your main app page
-        url = data_vars.get("url", "https://127.0.0.1:4443/")
-        await page.goto(url)
-        logger.info("Initial page loaded")
-
-        # Mode: REPLAY (без агента)
-        if mode == "replay":
-            return await self.replay_mode(stagehand)
+        logger.info(f"♻️ Replaying recorded agent recovery ({len(entry['actions'])} actions)")
+        try:
+            for action in entry["actions"]:
+                await perform_agent_action(page, action)
+            await wait_for_settle(page)
+            mismatch = await verify_replay(page, entry)
+        except Exception as e:
+            mismatch = f"replay failed: {e}"
+
+        if mismatch:
+            logger.info(f"Recorded recovery did not reproduce ({mismatch}), falling back to the agent")
+            self.recovery_cache.invalidate(key)
+            return False
+
+        self.recovery_cache.touch(key)
+        return True
+
+    def log_step(self, executed_actions: list, action: dict, timer: StepTimer = None):
+        """Keep the action for the summary and stream it to the run log."""
+        if timer is not None:
+            action["metrics"] = timer.as_dict()
+            timer.trace.set_attributes(**{
+                "step.status": action.get("status"),
+                "llm.calls": action["metrics"]["llm_calls"],
+                "llm.prompt_tokens": action["metrics"]["prompt_tokens"],
+                "llm.completion_tokens": action["metrics"]["completion_tokens"],
+            })
+            if str(action.get("status", "")).startswith("failed"):
+                timer.trace.set_error(action.get("error") or action.get("agent_error") or action["status"])
+        executed_actions.append(action)
+        if self.run_log is not None:
+            self.run_log.write(STEP, **action)
+
+    @staticmethod
+    def failed_actions(executed_actions: list) -> list:
+        return [
+            a for a in executed_actions
+            if not str(a.get("status", "")).startswith(("success", "skipped"))
+        ]
+
+    @staticmethod
+    def skipped_steps(steps: list) -> list:
+        return [
+            {"step": i, "instruction": step.instruction, "original": step.text, "status": "skipped_via_session"}
+            for i, step in enumerate(steps, 1)
+        ]
+
+    def post_login_expect_failed(self, executed_actions: list, action_steps: list, setup_steps: int) -> bool:
+        """True when the first Expect after the skipped login prefix failed."""
+        for index in range(setup_steps, len(action_steps)):
+            if action_steps[index].kind == KIND_EXPECT:
+                failed_steps = {a["step"] for a in self.failed_actions(executed_actions)}
+                return index + 1 in failed_steps
+        return False
+
+    def summarize(self, executed_actions: list, steps_total: int, started_at: float) -> dict:
+        failed = self.failed_actions(executed_actions)
+        passed = len(executed_actions) == steps_total and not failed
+        return {
+            "testcase": self.test_case.name if self.test_case else None,
+            "status": "passed" if passed else "failed",
+            "steps_total": steps_total,
+            "steps_executed": len(executed_actions),
+            "failed_step": failed[0]["step"] if failed else None,
+            "error": (failed[0].get("error") or failed[0].get("agent_error")) if failed else None,
+            "duration_s": round(time.time() - started_at, 2),
+            "log_file": self.run_log_file,
+            "metrics": total_metrics(executed_actions),
+        }
 
-        # AI Mode: Execute each action using page.act()
-        logger.info("Starting AI mode - executing actions with page.act()")
-        
+    async def run_steps(self, stagehand, action_steps: list, start: int = 0, stop: int = None) -> list:
+        """Run action_steps[start:stop]; step numbers stay absolute (1-based)."""
+        page = stagehand.page
         executed_actions = []
+        lookahead = None
         
-        for i, action_step in enumerate(action_steps, 1):
+        for i, step in enumerate(action_steps[start:stop], start + 1):
+            # Started by the previous step in pipelined mode
+            ahead, lookahead = lookahead, None
+            # Placeholders were resolved when the testcase was compiled
+            action_step = step.text
+            action_instruction = step.instruction
+            step_span = self.trace.child(
+                f"step {i}", **{"step.number": i, "step.kind": step.kind, "step.instruction": action_instruction}
+            )
+            timer = StepTimer(stagehand, trace=step_span)
             try:
                 logger.info(f"[{i}/{len(action_steps)}] Executing: {action_step}")
-                
-                # Replace placeholders with actual values from data.json
-                action_instruction = action_step
-                for key, value in data_vars.items():
-                    placeholder = f"{{{{{key}}}}}"
-                    if placeholder in action_instruction:
-                        action_instruction = action_instruction.replace(placeholder, str(value))
-                
+                # Lets the product's backend traces join this step
+                await propagate(page, step_span)
+
+                # Wait for the UI to go idle after the previous step / page load
+                with timer.span("settle"):
+                    if ahead is not None:
+                        await ahead.settled()
+                    else:
+                        await wait_for_settle(page)
+
                 # Take screenshot before action
-                screenshot_before = f"./storage/screenshots/step_{i:03d}_before.png"
-                try:
-                    await page.screenshot(path=screenshot_before)
-                    logger.debug(f"Screenshot saved: {screenshot_before}")
-                except Exception as e:
-                    logger.warning(f"Could not save before screenshot: {e}")
+                with timer.span("screenshot"):
+                    screenshot_before = await self.screenshots.capture(page, f"step_{i:03d}_before", "before")
                 
                 # Determine execution method based on action type
                 # Fill actions: use page.act() (faster, more reliable for form inputs)
                 # Click actions: use page.act() with useVision=True (more intelligent, handles complex UI better)
-                is_click_action = action_instruction.lower().startswith('click') or 'click' in action_instruction.lower() or action_instruction.lower().startswith('press') or 'press' in action_instruction.lower()
-                is_expect_action = action_instruction.lower().startswith('expect')
-                is_wait_action = action_instruction.lower().startswith('wait')
-               
-                if is_expect_action:
+                is_click_action = step.kind == KIND_CLICK
+                is_expect_action = step.kind == KIND_EXPECT
+                is_wait_action = step.kind == KIND_WAIT
+
+                # Resolution order: selector cache -> compiled fast path -> LLM
+                resolved_by = None
+                cache_key = None
+                cached_entry = None
+                with timer.span("resolve"):
+                    if self.selector_cache is not None and not is_wait_action:
+                        fingerprint = await page_fingerprint(page)
+                        cache_key = SelectorCache.make_key(self.test_case.name, action_instruction, fingerprint)
+                        cached_entry = self.selector_cache.get(cache_key)
+                        if cached_entry:
+                            try:
+                                replayed = await replay_cached_step(page, cached_entry, action_instruction)
+                            except PartialReplayError:
+                                # Half of the step happened; the LLM would do it twice
+                                self.selector_cache.invalidate(cache_key)
+                                raise
+                            if replayed:
+                                resolved_by = "cache"
+                                self.selector_cache.touch(cache_key)
+                                logger.info(f"⚡ Replayed from selector cache: {action_instruction}")
+                            else:
+                                logger.info(f"Cached selectors failed, re-resolving with LLM: {action_instruction}")
+                                self.selector_cache.invalidate(cache_key)
+
+                    compiled = step.fast_path if Config.FAST_PATH else None
+                    if resolved_by is None and compiled is not None:
+                        try:
+                            await execute_compiled(page, compiled, wait_timeout_ms=self.max_wait_ms())
+                            resolved_by = "fast_path"
+                            logger.info(f"⚡ Executed via fast path: {action_instruction}")
+                        except FastPathMiss as e:
+                            logger.debug(f"Fast path missed, delegating to Stagehand: {e}")
+
+                if resolved_by:
+                    result = None
+                elif is_expect_action:
                     # Use page.observe for expect actions (assertions/validations)
                     logger.debug(f"Calling page.observe() for expect action: {action_instruction}")
-                    result = await page.observe(action_instruction)
-                    logger.info(f"🔎 Observe executed for expect: {result}")
+                    with timer.span("observe"):
+                        result = await self.speculative_observation(ahead)
+                        if result is None:
+                            async with self.scoped(stagehand):
+                                result = await page.observe(action_instruction)
                 elif is_click_action:
                     # Use page.act with vision for click actions (more intelligent)
                     logger.debug(f"Calling page.act() with vision for click action: {action_instruction}")
-                    result = await page.act(action_instruction, useVision=True)
-                    logger.info(f"🤖 Vision-based act executed click: {result}")
+                    with timer.span("act"):
+                        async with self.scoped(stagehand):
+                            result = await page.act(action_instruction, useVision=True)
                 elif is_wait_action:
                     logger.debug(f"Calling page.wait() for wait action: {action_instruction}")
-                    await self.execute_wait_step(page, action_instruction)
-                    logger.info(f"⏳ Act executed wait: {result}")
+                    with timer.span("wait"):
+                        result = await self.execute_wait_step(page, action_instruction)
                 else:
                     # Use page.observe for other actions
                     logger.debug(f"Calling page.act() with: {action_instruction}")
-                    result = await page.act(action_instruction)
+                    with timer.span("act"):
+                        async with self.scoped(stagehand):
+                            result = await page.act(action_instruction)
+
                 # Validate that action was actually executed
-                action_succeeded = False
-                error_message = None
-                
-                # Log the raw result for debugging
-                logger.debug(f"Raw result type: {type(result)}")
-                logger.debug(f"Raw result type name: {type(result).__name__}")
-                logger.debug(f"Raw result repr: {repr(result)}")
-                logger.debug(f"Raw result str: {str(result)}")
-                logger.debug(f"Raw result dir: {[attr for attr in dir(result) if not attr.startswith('_')]}")
-                
-                # Check for string representation indicating failure (fallback check)
-                result_str = str(result)
-                if "success=False" in result_str or "No observe results found" in result_str:
-                    error_message = f"Action failed based on string representation: {result_str}"
-                    logger.error(f"❌ {error_message}")
-                
-                # Check for ActResult object (Stagehand's result type)
-                elif hasattr(result, 'success'):
-                    # This is an ActResult object
-                    logger.debug(f"Detected ActResult object with success={result.success}")
-                    if result.success:
-                        action_succeeded = True
-                        logger.debug(f"ActResult: success=True")
+                with timer.span("validate"):
+                    outcome = RESOLVED if resolved_by else validate_result(result)
+                action_succeeded = outcome.success
+                error_message = outcome.reason
+                if action_succeeded and Config.PIPELINE:
+                    # Settle (and speculatively observe) for the next step while this one wraps up
+                    lookahead = self.look_ahead(stagehand, action_steps, i, stop)
+                if not resolved_by:
+                    # Log the raw result for debugging (built only when DEBUG is on)
+                    logger.debug("Raw result: %s", lazy(describe_result, result))
+                    if outcome.success:
+                        logger.info(f"🤖 Stagehand {outcome}")
                     else:
-                        error_message = f"ActResult: success=False, message='{getattr(result, 'message', 'No message')}'"
                         logger.error(f"❌ {error_message}")
-                        
-                elif result is None:
-                    error_message = "Action returned None - no element found or action failed"
-                    
-                elif isinstance(result, dict):
-                    # Check if it's a dict with empty elements
-                    if 'elements' in result:
-                        elements = result.get('elements', [])
-                        if len(elements) == 0:
-                            error_message = "Action returned empty elements list - element not found on page"
-                        else:
-                            action_succeeded = True
-                            logger.debug(f"Action found {len(elements)} element(s) in dict")
-                    else:
-                        action_succeeded = True  # Assume success for other dict types
-                        
-                elif isinstance(result, list):
-                    if len(result) == 0:
-                        error_message = "Action found 0 elements - element not found on page"
-                    else:
-                        # Check if it's a list of ObserveResult objects
-                        if all(hasattr(item, 'selector') for item in result):
-                            action_succeeded = True
-                            logger.debug(f"Action found {len(result)} element(s): {[getattr(r, 'selector', str(r)) for r in result]}")
-                        else:
-                            action_succeeded = True  # Other list types
-                            
-                elif hasattr(result, '__len__') and len(result) == 0:
-                    error_message = "Action result is empty - element not found on page"
-                    
-                else:
-                    # For other result types, assume success if not None
-                    action_succeeded = True
-                    logger.debug(f"Action returned non-None result: {type(result)}")
                 
                 # Take screenshot after action
-                screenshot_after = f"./storage/screenshots/step_{i:03d}_after.png"
-                try:
-                    await page.screenshot(path=screenshot_after)
-                    logger.debug(f"Screenshot saved: {screenshot_after}")
-                except Exception as e:
-                    logger.warning(f"Could not save after screenshot: {e}")
+                with timer.span("screenshot"):
+                    screenshot_after = await self.screenshots.capture(page, f"step_{i:03d}_after", "after")
+
+                if not action_succeeded and cache_hits(stagehand) > timer.cache_hits_before:
+                    # Never serve an answer again that just failed
+                    forget_last_hit(stagehand)
 
                 if is_expect_action and not action_succeeded:
                     logger.warning(f"⚠️ Expectation failed: {error_message}")
                     raise Exception(f"Expectation failed: {error_message}")   
 
+                # A recorded agent recovery for this step and page replaces the agent run
+                recovery_key = None
+                if not action_succeeded and self.recovery_cache is not None:
+                    recovery_key = RecoveryCache.make_key(
+                        self.test_case.name, action_instruction, await page_fingerprint(page)
+                    )
+                    with timer.span("recovery"):
+                        recovered = await self.replay_recovery(stagehand, recovery_key)
+                    if recovered:
+                        action_succeeded = True
+                        resolved_by = "recovery_cache"
+                        screenshot_after = await self.screenshots.capture(page, f"step_{i:03d}_recovery", "after")
+
                 # If action failed, try agent fallback
                 if not action_succeeded:
                     logger.warning(f"⚠️ Primary action failed: {error_message}")
@@ -238,71 +527,30 @@ Do not proceed to any other steps.
                             instructions="You are an intelligent QA recovery agent. Use advanced reasoning to complete failed UI actions.",
                             options={"apiKey": Config.GEMINI_API_KEY}
                         )
+                        count_agent_requests(stagehand, agent)
                         
                         # Use agent.execute for multi-step reasoning and recovery
-                        logger.debug(f"Agent instruction: {agent_instruction}")
-                        agent_result = await agent.execute(
-                            instruction=agent_instruction,
-                            max_steps=10,  # Allow up to 10 reasoning steps
-                            auto_screenshot=True,
-                            highlightCursor=False
-                        )
-                        
-                        logger.info(f"🤖 Agent.execute() result: {agent_result}")
+                        logger.debug("Agent instruction: %s", agent_instruction)
+                        with timer.span("agent"):
+                            agent_result = await agent.execute(
+                                instruction=agent_instruction,
+                                max_steps=10,  # Allow up to 10 reasoning steps
+                                auto_screenshot=True,
+                                highlightCursor=False
+                            )
                         
                         # Take screenshot after agent attempt
-                        screenshot_agent = f"./storage/screenshots/step_{i:03d}_agent_fallback.png"
-                        try:
-                            await page.screenshot(path=screenshot_agent)
-                            logger.debug(f"Agent fallback screenshot saved: {screenshot_agent}")
-                        except Exception as e:
-                            logger.warning(f"Could not save agent screenshot: {e}")
+                        with timer.span("screenshot"):
+                            screenshot_agent = await self.screenshots.capture(page, f"step_{i:03d}_agent_fallback", "agent")
                         
-                        # Check if agent succeeded
-                        # agent.execute() returns an ExecuteResult object with actions list
-                        agent_succeeded = False
-                        agent_diagnostics = None
-                        
-                        if hasattr(agent_result, 'actions'):
-                            # ExecuteResult object from agent.execute()
-                            actions_count = len(agent_result.actions)
-                            logger.info(f"Agent executed {actions_count} actions during recovery")
-                            
-                            # Check if agent performed any actions
-                            if actions_count > 0:
-                                # Log the actions taken
-                                for idx, action in enumerate(agent_result.actions, 1):
-                                    action_info = str(action)
-                                    logger.debug(f"  Agent action {idx}: {action_info}")
-                                
-                                # Check the last action for success
-                                last_action = agent_result.actions[-1]
-                                
-                                # Check for success indicators in the action
-                                if hasattr(last_action, 'success'):
-                                    agent_succeeded = last_action.success
-                                elif hasattr(last_action, 'status'):
-                                    agent_succeeded = last_action.status == 'success'
-                                else:
-                                    # If no explicit success indicator, consider it successful if actions were taken
-                                    agent_succeeded = True
-                                
-                                logger.info(f"Agent recovery result: {'Success' if agent_succeeded else 'Failed'}")
-                            else:
-                                logger.warning("Agent executed 0 actions - no recovery attempted")
-                                agent_diagnostics = "Agent could not find any way to complete the action"
-                        else:
-                            # Fallback for unexpected result format
-                            logger.warning(f"Unexpected agent result format: {type(agent_result)}")
-                            agent_result_str = str(agent_result)
-                            
-                            # Check for explicit failure indicators
-                            if "success=False" in agent_result_str or "No observe results found" in agent_result_str:
-                                logger.error(f"❌ Agent fallback failed - detected failure in result: {agent_result_str}")
-                                agent_succeeded = False
-                            elif agent_result:
-                                # Non-null result without clear failure indicator - consider partial success
-                                agent_succeeded = True
+                        # Check if agent succeeded (AgentResult locally, AgentExecuteResult via the API)
+                        agent_outcome = validate_agent_result(agent_result)
+                        agent_succeeded = agent_outcome.success
+                        agent_diagnostics = agent_outcome.reason
+                        logger.info(f"🤖 Agent executed {agent_outcome.action_count} actions during recovery")
+                        for idx, action in enumerate(getattr(agent_result, "actions", None) or [], 1):
+                            logger.debug("  Agent action %d: %s", idx, action)
+                        logger.info(f"Agent recovery result: {'Success' if agent_succeeded else 'Failed'}")
                         
                         if agent_succeeded:
                             logger.info(f"✓ Agent.execute() fallback succeeded!")
@@ -310,15 +558,21 @@ Do not proceed to any other steps.
                             # Serialize agent actions for logging
                             agent_actions_log = []
                             if hasattr(agent_result, 'actions'):
-                                for action in agent_result.actions:
+                                for action in agent_result.actions or []:
                                     if hasattr(action, "model_dump"):
                                         agent_actions_log.append(action.model_dump())
                                     elif hasattr(action, "__dict__"):
                                         agent_actions_log.append(action.__dict__)
                                     else:
                                         agent_actions_log.append(str(action))
+
+                            if recovery_key and getattr(agent_result, 'actions', None):
+                                await wait_for_settle(page)
+                                fingerprint_after = await page_fingerprint(page)
+                                if self.recovery_cache.put(recovery_key, agent_result.actions, fingerprint_after):
+                                    logger.info(f"Agent recovery recorded for: {action_instruction}")
                             
-                            executed_actions.append({
+                            self.log_step(executed_actions, {
                                 "step": i,
                                 "instruction": action_instruction,
                                 "original": action_step,
@@ -328,34 +582,25 @@ Do not proceed to any other steps.
                                 "agent_steps_count": len(agent_actions_log),
                                 "screenshot_before": screenshot_before,
                                 "screenshot_after": screenshot_agent
-                            })
+                            }, timer)
+                            self.checkpoint_step(page, i, step, {"kind": RESOLVED_LIVE})
                         else:
                             logger.error(f"❌ Agent.execute() fallback failed")
                             
-                            # Try to extract diagnostic info
-                            if agent_diagnostics is None and hasattr(agent_result, 'actions'):
-                                # Look for diagnostic information in the actions
-                                diagnostics_parts = []
-                                for action in agent_result.actions:
-                                    action_str = str(action)
-                                    if any(keyword in action_str.lower() for keyword in ['cannot', 'not found', 'failed', 'error']):
-                                        diagnostics_parts.append(action_str)
-                                agent_diagnostics = "; ".join(diagnostics_parts) if diagnostics_parts else "No specific diagnostics available"
-                            
-                            executed_actions.append({
+                            self.log_step(executed_actions, {
                                 "step": i,
                                 "instruction": action_instruction,
                                 "original": action_step,
                                 "status": "failed_with_agent_execute",
                                 "primary_error": error_message,
-                                "agent_diagnostics": agent_diagnostics or str(agent_result),
+                                "agent_diagnostics": agent_diagnostics,
                                 "screenshot_error": screenshot_agent
-                            })
+                            }, timer)
                             raise Exception(f"Both primary action and agent.execute() fallback failed. Diagnostics: {agent_diagnostics}")
                     
                     except Exception as agent_error:
                         logger.error(f"❌ Agent fallback encountered error: {str(agent_error)}")
-                        executed_actions.append({
+                        self.log_step(executed_actions, {
                             "step": i,
                             "instruction": action_instruction,
                             "original": action_step,
@@ -363,68 +608,227 @@ Do not proceed to any other steps.
                             "primary_error": error_message,
                             "agent_error": str(agent_error),
                             "screenshot_error": screenshot_after
-                        })
+                        }, timer)
                         raise Exception(f"Action failed and agent fallback errored: {agent_error}")
                 else:
                     # Primary action succeeded
-                    executed_actions.append({
+                    if cache_key and resolved_by is None:
+                        # Write the freshly resolved (or healed) selectors back
+                        try:
+                            enriched = await perform_act_with_smart_selector(result, page)
+                            self.selector_cache.put(
+                                cache_key,
+                                "observe" if is_expect_action else "act",
+                                enriched["smart_selectors"],
+                            )
+                        except Exception as e:
+                            logger.warning(f"Could not update selector cache: {e}")
+
+                    self.log_step(executed_actions, {
                         "step": i,
                         "instruction": action_instruction,
                         "original": action_step,
-                        "status": "success",
-                        "result": str(result) if result else None,
+                        "status": f"success_via_{resolved_by}" if resolved_by else "success",
+                        "result": str(outcome) if not resolved_by else None,
+                        "selectors": list(outcome.selectors),
                         "screenshot_before": screenshot_before,
                         "screenshot_after": screenshot_after
-                    })
+                    }, timer)
+                    self.checkpoint_step(page, i, step, self.resolved_action(step, resolved_by, cached_entry, result, outcome))
                     
                     logger.info(f"✓ Action completed: {action_instruction}")
-                
-                # Small delay between actions
-                await asyncio.sleep(2)
-                
+
             except Exception as e:
                 logger.error(f"✗ Action failed: {action_step}")
                 logger.error(f"Error: {str(e)}")
                 
                 # Take error screenshot
-                screenshot_error = f"./storage/screenshots/step_{i:03d}_error.png"
-                try:
-                    await page.screenshot(path=screenshot_error)
+                with timer.span("screenshot"):
+                    screenshot_error = await self.screenshots.capture(page, f"step_{i:03d}_error", "error")
+                if screenshot_error:
                     logger.error(f"Error screenshot saved: {screenshot_error}")
-                except Exception as screenshot_error_ex:
-                    logger.warning(f"Could not save error screenshot: {screenshot_error_ex}")
                 
-                executed_actions.append({
+                self.log_step(executed_actions, {
                     "step": i,
                     "instruction": action_instruction,
                     "original": action_step,
                     "status": "failed",
                     "error": str(e),
                     "screenshot_error": screenshot_error
-                })
+                }, timer)
+                if self.checkpoint is not None:
+                    self.checkpoint.fail(i)
                 
                 # Stop execution on failure (don't continue with invalid state)
                 logger.error("❌ Stopping execution due to action failure")
                 break
-        
-        # Save executed actions log
-        with open(self.cache_file, "w", encoding="utf-8") as f:
-            json.dump(executed_actions, f, indent=2, ensure_ascii=False)
-        
-        logger.info(f"Executed actions log saved to {self.cache_file}")
+            finally:
+                if ahead is not None:
+                    await ahead.cancel()
+                step_span.end()
 
-        # Final screenshot
-        screenshot_path = "final.png"
-        await page.screenshot(path=screenshot_path)
-        logger.info(f"Screenshot saved to {screenshot_path}")
+        if lookahead is not None:
+            await lookahead.cancel()
+        return executed_actions
 
-        await stagehand.close()
-        logger.debug("End QA automation")
+    def look_ahead(self, stagehand, action_steps: list, step_no: int, stop: int = None) -> Lookahead | None:
+        """
+        Next step's work to start now: its settle wait, plus a speculative
+        observe when it is an Expect the fast path / selector cache will
+        likely not answer. Placeholders and step kinds are already compiled.
+        """
+        end = len(action_steps) if stop is None else min(stop, len(action_steps))
+        if step_no >= end:
+            return None
+        step = action_steps[step_no]
+        observe = None
+        answered_without_llm = (
+            (Config.FAST_PATH and step.fast_path is not None)
+            or (self.selector_cache is not None
+                and self.selector_cache.has_instruction(self.test_case.name, step.instruction))
+        )
+        if step.kind == KIND_EXPECT and not answered_without_llm:
+            async def observe():
+                async with self.scoped(stagehand):
+                    return await stagehand.page.observe(step.instruction)
+        return Lookahead(stagehand.page, observe)
+
+    async def speculative_observation(self, ahead: Lookahead | None):
+        """Result of the previous step's speculative observe, if still valid for the settled page."""
+        if ahead is None or not ahead.speculating:
+            return None
+        result = await ahead.observation()
+        if result is None:
+            self.speculation["discarded"] += 1
+            return None
+        self.speculation["used"] += 1
+        logger.info("⚡ Speculative observe still matches the settled page, reusing it")
+        return result
+
+    def checkpoint_step(self, page, step_no: int, step, resolved: dict):
+        if self.checkpoint is not None:
+            self.checkpoint.record(step_no, step, page.url, resolved)
+
+    @staticmethod
+    def resolved_action(step, resolved_by, cached_entry, result, outcome) -> dict:
+        """How a completed step is replayed from its checkpoint without the LLM."""
+        if resolved_by == "cache":
+            return {"kind": cached_entry["kind"], "selectors": cached_entry["selectors"]}
+        if resolved_by == "fast_path":
+            return {"kind": RESOLVED_FAST_PATH}
+        if resolved_by is None and step.kind != KIND_WAIT and outcome.selectors:
+            is_expect = step.kind == KIND_EXPECT
+            method = None if is_expect else extract_method_from_act_result(result)
+            return {
+                "kind": "observe" if is_expect else "act",
+                "selectors": [{"original": selector, "method": method} for selector in outcome.selectors],
+            }
+        # Wait steps, recovered steps: nothing deterministic to replay
+        return {"kind": RESOLVED_LIVE}
+
+    async def replay_checkpointed(self, page, step, resolved: dict) -> bool:
+        """Run a checkpointed step through Playwright; False when it no longer applies."""
+        try:
+            if resolved.get("kind") == RESOLVED_FAST_PATH:
+                if step.fast_path is None:
+                    return False
+                await execute_compiled(page, step.fast_path, wait_timeout_ms=self.max_wait_ms())
+                return True
+            return await replay_cached_step(page, resolved, step.instruction)
+        except PartialReplayError:
+            raise
+        except Exception as e:
+            logger.debug(f"Checkpoint replay failed: {e}")
+            return False
+
+    async def resume_steps(self, stagehand, action_steps: list, checkpoint, resume_at: int) -> list:
+        """
+        Replay action_steps[:resume_at] from the checkpoint at Playwright
+        speed, then run the rest live. Steps with nothing to replay (waits,
+        agent recoveries) run live in place; the first replay that misses or
+        ends on another URL than recorded hands all remaining steps to the
+        live run.
+        """
+        page = stagehand.page
+        executed_actions = []
+        logger.info(f"⏩ Resuming at step {resume_at + 1}, replaying {resume_at} checkpointed steps")
+
+        index = 0
+        while index < resume_at:
+            step, record = action_steps[index], checkpoint.steps[index]
+            resolved = record.get("resolved") or {}
+            i = index + 1
+
+            if resolved.get("kind") == RESOLVED_SKIPPED:
+                self.log_step(executed_actions, {
+                    "step": i, "instruction": step.instruction, "original": step.text,
+                    "status": "skipped_via_session",
+                })
+                self.checkpoint_step(page, i, step, resolved)
+                index += 1
+                continue
+
+            if resolved.get("kind") == RESOLVED_LIVE:
+                executed_actions += await self.run_steps(stagehand, action_steps, start=index, stop=i)
+                if self.failed_actions(executed_actions):
+                    return executed_actions
+                index += 1
+                continue
+
+            await wait_for_settle(page)
+            try:
+                replayed = await self.replay_checkpointed(page, step, resolved)
+            except PartialReplayError as e:
+                # Running the step live would repeat what was already done
+                logger.error(f"✗ Checkpointed step {i} failed partway: {e}")
+                self.log_step(executed_actions, {
+                    "step": i, "instruction": step.instruction, "original": step.text,
+                    "status": "failed", "error": str(e),
+                })
+                if self.checkpoint is not None:
+                    self.checkpoint.fail(i)
+                return executed_actions
+            if not replayed:
+                logger.info(f"Checkpointed step {i} no longer replays, continuing live")
+                break
+
+            self.log_step(executed_actions, {
+                "step": i, "instruction": step.instruction, "original": step.text,
+                "status": "success_via_checkpoint",
+            })
+            self.checkpoint_step(page, i, step, resolved)
+            logger.info(f"⏩ [{i}/{len(action_steps)}] Replayed from checkpoint: {step.instruction}")
+            index += 1
+
+            if record.get("url") and page.url != record["url"]:
+                logger.info(f"Page left the checkpointed path after step {i} ({page.url}), continuing live")
+                break
+
+        executed_actions += await self.run_steps(stagehand, action_steps, start=index)
+        return executed_actions
 
     def load_recorded_actions(self):
         with open(self.cache_file, "r", encoding="utf-8") as f:
             return json.load(f)
 
+    def scope_mode(self) -> str:
+        """`@scope` of the testcase: auto (topmost ExtJS window), page, or a CSS selector."""
+        directives = self.test_case.directives if self.test_case else {}
+        return directives.get("scope") or (SCOPE_AUTO if Config.SCOPE_ACTIVE_WINDOW else SCOPE_PAGE)
+
+    @asynccontextmanager
+    async def scoped(self, stagehand):
+        """Limit the next act/observe snapshot to the active window (see scope_mode)."""
+        async with scoped_snapshot(stagehand, self.scope_mode()) as roots:
+            if roots:
+                logger.debug(f"Snapshot scoped to {', '.join(roots)}")
+            yield roots
+
+    def max_wait_ms(self) -> int:
+        """@max_wait of the testcase (minutes) in ms."""
+        cfg = (self.test_case.config if self.test_case else None) or {}
+        return int(float(cfg.get("max_wait", 60)) * 60 * 1000)
+
     def parse_wait_condition(self, step: str) -> dict:
         match = re.search(r'not\s+"([^"]+)"', step, re.IGNORECASE)
         return {
@@ -432,59 +836,105 @@ Do not proceed to any other steps.
         }
 
     async def execute_wait_step(self, page, step: str):
+        """
+        Resolve the status element once with page.observe(), then watch it
+        in the DOM until the forbidden value disappears. The LLM is only
+        called again when the watched element vanishes.
+        """
         condition = self.parse_wait_condition(step)
         forbidden_value = condition["forbiddenValue"]
 
         # Treat @max_wait and @poll_interval as minutes
         cfg = self.test_case.config or {}
-        max_wait_min = int(cfg.get("max_wait", 60))  # default 60 minutes
+        max_wait_min = float(cfg.get("max_wait", 60))  # default 60 minutes
         poll_interval_min = float(cfg.get("poll_interval", 3))  # default 3 minutes
 
         timeout_ms = int(max_wait_min * 60 * 1000)  # minutes -> ms
+        # Only used between LLM re-resolutions now, the DOM watcher reacts instantly
         interval_ms = int(poll_interval_min * 60 * 1000)  # minutes -> ms
 
         start = time.time()
         last_status = None
+        selector = None
 
         while (time.time() - start) * 1000 < timeout_ms:
-            try:
-                result = await page.observe(step)
-            except Exception as e:
-                logger.debug(f"observe failed: {e}; retrying...")
-                await asyncio.sleep(interval_ms / 1000)
-                continue
+            if selector is None:
+                try:
+                    async with self.scoped(self.stagehand):
+                        result = await page.observe(step)
+                except Exception as e:
+                    logger.debug(f"observe failed: {e}; retrying...")
+                    await asyncio.sleep(interval_ms / 1000)
+                    continue
+
+                if result is None or (isinstance(result, list) and len(result) == 0):
+                    logger.debug("No status element found, retrying...")
+                    await asyncio.sleep(interval_ms / 1000)
+                    continue
+
+                # Extract status text from observe result (robust)
+                status_text = await self.extract_status_text(page, result)
+                if not status_text:
+                    logger.debug("Could not extract status text, retrying...")
+                    await asyncio.sleep(interval_ms / 1000)
+                    continue
+
+                last_status = status_text
+                logger.debug(f"Current status: {status_text}")
+
+                if forbidden_value not in status_text:
+                    # Status has changed from "Running" to something else (Success/Failed)
+                    logger.info(f"✓ Wait condition met. Status changed to: {status_text}")
+                    return status_text
+
+                selector = self.status_selector(result)
+                if selector is None:
+                    # Nothing concrete to watch, keep polling through the LLM
+                    logger.info(f"⏳ Still waiting... Current status: {status_text}")
+                    await asyncio.sleep(interval_ms / 1000)
+                    continue
+
+                logger.info(f"⏳ Still waiting... Current status: {status_text} (watching {selector})")
+
+            remaining_ms = timeout_ms - int((time.time() - start) * 1000)
+            if remaining_ms <= 0:
+                break
 
-            if result is None or (isinstance(result, list) and len(result) == 0):
-                logger.debug("No status element found, retrying...")
-                await asyncio.sleep(interval_ms / 1000)
-                continue
+            watch = await watch_status(page, selector, forbidden_value, remaining_ms)
+            if watch.get("text"):
+                last_status = watch["text"]
 
-            # Extract status text from observe result (robust)
-            status_text = await self.extract_status_text(page, result)
-            if not status_text:
-                logger.debug("Could not extract status text, retrying...")
-                await asyncio.sleep(interval_ms / 1000)
+            if watch["state"] == "changed":
+                logger.info(f"✓ Wait condition met. Status changed to: {last_status}")
+                return last_status
+
+            if watch["state"] == "gone":
+                logger.info("Status element disappeared, re-resolving with observe()")
+                selector = None
+                await asyncio.sleep(min(interval_ms, 5000) / 1000)
                 continue
-            
-            last_status = status_text
-            logger.debug(f"Current status: {status_text}")
-            
-            # Check if status contains the forbidden value (e.g., "Running")
-            is_still_forbidden = forbidden_value in status_text
-            
-            if not is_still_forbidden:
-                # Status has changed from "Running" to something else (Success/Failed)
-                logger.info(f"✓ Wait condition met. Status changed to: {status_text}")
-                return
-
-            # Status is still "Running", continue waiting
-            logger.info(f"⏳ Still waiting... Current status: {status_text}")
-            await asyncio.sleep(interval_ms / 1000)
+
+            logger.info(f"⏳ Still waiting... Current status: {last_status}")
 
         raise TimeoutError(
             f"Timeout waiting for backup job. Last status: {last_status}"
         )
 
+    @staticmethod
+    def observe_items(result) -> list:
+        if isinstance(result, dict) and 'elements' in result:
+            return result.get('elements') or []
+        if isinstance(result, list):
+            return result
+        return [result]
+
+    def status_selector(self, result) -> str | None:
+        for item in self.observe_items(result):
+            selector = getattr(item, 'selector', None)
+            if selector:
+                return selector
+        return None
+
     async def extract_status_text(self, page, result):
         """Robustly extract visible status text from observe results.
         - Supports list/dict/single result
@@ -494,13 +944,7 @@ Do not proceed to any other steps.
             return None
 
         # Normalize to a list of items to inspect
-        items = []
-        if isinstance(result, dict) and 'elements' in result:
-            items = result.get('elements') or []
-        elif isinstance(result, list):
-            items = result
-        else:
-            items = [result]
+        items = self.observe_items(result)
 
         # First pass: use any direct text fields provided by Stagehand
         for item in items:
@@ -535,46 +979,13 @@ Do not proceed to any other steps.
 
         page = stagehand.page
 
-        mouse = page.mouse
-        keyboard = page.keyboard
-
         for step in cached:
             logger.debug('Start step -> %s' % step)
-
-            t = step.get("type")
-
-            # CLICK by coordinates
-            if t == "click":
-                x = step["x"]
-                y = step["y"]
-                button = step.get("button", "left")
-                await mouse.click(x, y, button=button)
-
-            # MOVE mouse
-            elif t == "move":
-                await mouse.move(step["x"], step["y"])
-
-            # TYPE text
-            elif t == "type":
-                x = step["x"]
-                y = step["y"]
-                text = step["text"]
-                await mouse.click(x, y)
-                await asyncio.sleep(1)
-                await keyboard.type(text)
-
-                if step.get("press_enter_after"):
-                    await keyboard.press("Enter")
-
-            # WAIT
-            elif t == "wait":
-                await asyncio.sleep(step["miliseconds"] / 1000)
-
-            # OPEN BROWSER (ignore)
-            elif t == "function" and step.get("name") == "open_web_browser":
+            try:
+                await perform_agent_action(page, step)
+            except ValueError as e:
+                logger.warning(f"Skipping recorded step: {e}")
                 continue
+            await wait_for_settle(page)
 
-            await asyncio.sleep(5)
-
-        await stagehand.close()
         logger.info("Replay mode completed successfully")
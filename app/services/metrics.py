@@ -0,0 +1,134 @@
+import time
+from contextlib import contextmanager
+
+from app.services.llm_cache import cache_hits
+from app.services.tracing import NOOP_SPAN
+
+TOKEN_FIELDS = ("total_prompt_tokens", "total_completion_tokens", "total_inference_time_ms")
+
+# Where each computer-use agent client sends its model requests (it does not
+# go through the session's LLM client)
+AGENT_SDK_CALLS = (
+    ("genai_client", "models", "generate_content"),
+    ("openai_sdk_client", "responses", "create"),
+    ("anthropic_sdk_client", "beta", "messages", "create"),
+)
+
+
+def _token_snapshot(stagehand) -> dict:
+    metrics = getattr(stagehand, "_local_metrics", None)
+    return {name: getattr(metrics, name, 0) or 0 for name in TOKEN_FIELDS}
+
+
+def llm_requests(stagehand) -> int:
+    """Model requests the session sent so far (see count_llm_requests)."""
+    return getattr(stagehand, "_llm_requests", 0) or 0
+
+
+def _count_request(stagehand):
+    stagehand._llm_requests = llm_requests(stagehand) + 1
+
+
+def count_llm_requests(stagehand):
+    """
+    Count every request the session's LLM client sends to the model:
+    act/observe, wait-step and speculative observes alike. Install it before
+    the LLM response cache, so cache hits never get here. A no-op in API
+    mode (no local client).
+    """
+    client = getattr(stagehand, "llm", None)
+    if client is None or getattr(client, "_counts_requests", False):
+        return
+    original = client.create_response
+
+    async def create_response(**kwargs):
+        _count_request(stagehand)
+        return await original(**kwargs)
+
+    client.create_response = create_response
+    client._counts_requests = True
+
+
+def count_agent_requests(stagehand, agent):
+    """Count the model requests of a computer-use agent toward the session."""
+    for path in AGENT_SDK_CALLS:
+        owner = getattr(agent, "client", None)
+        for name in path[:-1]:
+            owner = getattr(owner, name, None)
+        method = getattr(owner, path[-1], None) if owner is not None else None
+        if method is None:
+            continue
+
+        def counted(*args, _method=method, **kwargs):
+            _count_request(stagehand)
+            return _method(*args, **kwargs)
+
+        setattr(owner, path[-1], counted)
+        return
+
+
+class StepTimer:
+    """
+    Wall-clock spans per phase of one step, plus the model requests sent
+    (counted at the client, see count_llm_requests), the tokens Stagehand
+    accounted and the cached responses it was given instead while the step
+    ran. Each span is also a child span of `trace` (the step's tracing span,
+    if any).
+
+        timer = StepTimer(stagehand, trace=step_span)
+        with timer.span("act"):
+            await page.act(...)
+        action["metrics"] = timer.as_dict()
+    """
+
+    def __init__(self, stagehand=None, trace=NOOP_SPAN):
+        self.stagehand = stagehand
+        self.trace = trace
+        self.started = time.perf_counter()
+        self.phases = {}
+        self._requests_before = llm_requests(stagehand)
+        self._tokens_before = _token_snapshot(stagehand)
+        self.cache_hits_before = cache_hits(stagehand)
+
+    @contextmanager
+    def span(self, phase: str):
+        started = time.perf_counter()
+        trace_span = self.trace.child(phase)
+        try:
+            yield
+        except BaseException as e:
+            trace_span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            trace_span.end()
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.phases[phase] = self.phases.get(phase, 0.0) + elapsed_ms
+
+    def as_dict(self) -> dict:
+        tokens = _token_snapshot(self.stagehand)
+        return {
+            "duration_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "phases": {phase: round(ms, 1) for phase, ms in self.phases.items()},
+            "llm_calls": llm_requests(self.stagehand) - self._requests_before,
+            "prompt_tokens": tokens["total_prompt_tokens"] - self._tokens_before["total_prompt_tokens"],
+            "completion_tokens": tokens["total_completion_tokens"] - self._tokens_before["total_completion_tokens"],
+            "inference_ms": tokens["total_inference_time_ms"] - self._tokens_before["total_inference_time_ms"],
+            "llm_cache_hits": cache_hits(self.stagehand) - self.cache_hits_before,
+        }
+
+
+def total_metrics(executed_actions: list) -> dict:
+    """Per-testcase totals of the step metrics."""
+    totals = {"duration_ms": 0.0, "phases": {}, "llm_calls": 0, "llm_cache_hits": 0,
+              "prompt_tokens": 0, "completion_tokens": 0, "inference_ms": 0}
+    # A failing step may be logged more than once; its last record has the full timing
+    by_step = {a.get("step"): a["metrics"] for a in executed_actions if a.get("metrics")}
+    for metrics in by_step.values():
+        for key in ("duration_ms", "llm_calls", "llm_cache_hits", "prompt_tokens", "completion_tokens", "inference_ms"):
+            totals[key] += metrics.get(key, 0)
+        for phase, ms in metrics.get("phases", {}).items():
+            totals["phases"][phase] = totals["phases"].get(phase, 0.0) + ms
+
+    totals["duration_ms"] = round(totals["duration_ms"], 1)
+    totals["phases"] = {phase: round(ms, 1) for phase, ms in totals["phases"].items()}
+    return totals
@@ -0,0 +1,93 @@
+import asyncio
+import logging
+
+from app import Config
+from app.services.settle import wait_for_settle
+
+logger = logging.getLogger(Config.APP_NAME)
+
+# "<document id>:<mutation count>" of the page. The observer is installed on
+# first use and lives as long as the document; a navigation yields a new id.
+# takeRecords() counts mutations whose callback has not run yet.
+DOM_VERSION_JS = """
+() => {
+    let state = window.__qaDomVersion;
+    if (!state) {
+        state = {id: Math.random().toString(36).slice(2), version: 0, observer: null};
+        state.observer = new MutationObserver((records) => { state.version += records.length; });
+        state.observer.observe(document, {
+            subtree: true, childList: true, characterData: true, attributes: true,
+        });
+        window.__qaDomVersion = state;
+    }
+    state.version += state.observer.takeRecords().length;
+    return `${state.id}:${state.version}`;
+}
+"""
+
+
+async def dom_version(page) -> str | None:
+    try:
+        return await page.evaluate(DOM_VERSION_JS)
+    except Exception as e:
+        logger.debug(f"dom_version: evaluate failed: {e}")
+        return None
+
+
+class Lookahead:
+    """
+    Work for the next step started while the current one is still wrapping
+    up (after screenshot, logging, cache writes): the settle wait and, for
+    an Expect step, a speculative observe.
+
+    The observe runs once Ajax and load masks are done, before the full
+    quiet period has passed. Its answer is only handed out when the DOM
+    has not changed between the snapshot and the settled page, otherwise
+    the step observes again as usual.
+    """
+
+    def __init__(self, page, observe=None):
+        self.page = page
+        self.settle_task = asyncio.create_task(wait_for_settle(page))
+        self.observe_task = asyncio.create_task(self._speculate(observe)) if observe else None
+
+    async def _speculate(self, observe):
+        await wait_for_settle(self.page, quiet_ms=Config.PIPELINE_SPECULATE_QUIET_MS)
+        version = await dom_version(self.page)
+        return version, await observe()
+
+    async def settled(self) -> dict:
+        return await self.settle_task
+
+    @property
+    def speculating(self) -> bool:
+        return self.observe_task is not None
+
+    async def observation(self):
+        """
+        The speculative observe result, if it was taken on the page as it is
+        now (call after settled()); None when it has to be redone.
+        """
+        if self.observe_task is None:
+            return None
+        task, self.observe_task = self.observe_task, None
+        try:
+            version, result = await task
+        except Exception as e:
+            logger.debug(f"Speculative observe failed: {e}")
+            return None
+
+        current = await dom_version(self.page)
+        if version is None or version != current:
+            logger.debug(f"Page changed since the speculative observe ({version} -> {current}), discarding it")
+            return None
+        return result
+
+    async def cancel(self):
+        """Drop whatever was not used (nothing keeps running into the next step)."""
+        tasks = [task for task in (self.settle_task, self.observe_task) if task is not None]
+        self.observe_task = None
+        for task in tasks:
+            task.cancel()
+        # Also collects the exception of a task that already failed
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import json
+import logging
+import signal
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+
+class QueueWorker:
+    """
+    Reliable Redis list consumer.
+
+    Every message is atomically moved from `<queue>` to this worker's
+    processing list (`<queue>:processing:<worker_id>`) with BLMOVE and only
+    removed once the handler finished. Failed messages are re-queued until
+    `max_retries`, then moved to `<queue>:dead`. Messages left in the
+    processing list by a crashed worker are re-queued when a worker with
+    the same id starts again.
+
+    The redis client is injected (redis.asyncio or fakeredis.aioredis), so
+    the worker can run against a local stand-in.
+    """
+
+    def __init__(self, redis_client, queue_name: str, handler, worker_id: str = "default",
+                 concurrency: int = None, max_retries: int = None,
+                 block_timeout_s: float = 1.0, shutdown_timeout_s: float = None):
+        self.redis = redis_client
+        self.queue_name = queue_name
+        self.handler = handler
+        self.worker_id = worker_id
+        self.concurrency = max(1, concurrency or Config.WORKER_CONCURRENCY)
+        self.max_retries = Config.WORKER_MAX_RETRIES if max_retries is None else max_retries
+        self.block_timeout_s = block_timeout_s
+        self.shutdown_timeout_s = (
+            Config.WORKER_SHUTDOWN_TIMEOUT_S if shutdown_timeout_s is None else shutdown_timeout_s
+        )
+
+        self.processing_key = f"{queue_name}:processing:{worker_id}"
+        self.attempts_key = f"{queue_name}:attempts"
+        self.dead_key = f"{queue_name}:dead"
+
+        self._stopping = asyncio.Event()
+        self.processed = 0
+        self.failed = 0
+
+    @staticmethod
+    def message_id(raw: str) -> str:
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def stop(self):
+        if not self._stopping.is_set():
+            logger.info("Worker shutdown requested, finishing in-flight messages...")
+            self._stopping.set()
+
+    def install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError):
+                # Windows / non-main thread: rely on KeyboardInterrupt
+                pass
+
+    async def recover(self) -> int:
+        """Re-queue messages orphaned in this worker's processing list."""
+        recovered = 0
+        while True:
+            raw = await self.redis.lmove(self.processing_key, self.queue_name, "RIGHT", "LEFT")
+            if raw is None:
+                break
+            recovered += 1
+        if recovered:
+            logger.info(f"Recovered {recovered} unacknowledged messages from {self.processing_key}")
+        return recovered
+
+    async def run(self):
+        await self.recover()
+        logger.info(
+            f"Listening on Redis queue → {self.queue_name} "
+            f"(worker={self.worker_id}, concurrency={self.concurrency})"
+        )
+        consumers = [
+            asyncio.create_task(self._consume(n)) for n in range(self.concurrency)
+        ]
+        await self._stopping.wait()
+
+        done, pending = await asyncio.wait(consumers, timeout=self.shutdown_timeout_s)
+        for task in pending:
+            # Unfinished messages stay in the processing list and are recovered on restart
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        logger.info(f"Worker stopped: {self.processed} processed, {self.failed} failed")
+
+    async def _consume(self, slot: int):
+        errors = 0
+        while not self._stopping.is_set():
+            try:
+                raw = await self.redis.blmove(
+                    self.queue_name, self.processing_key,
+                    self.block_timeout_s, "LEFT", "RIGHT",
+                )
+                if raw is not None:
+                    await self.handle(raw)
+                errors = 0
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # A message whose ack / retry / dead-letter failed stays in the
+                # processing list and is recovered on restart
+                errors += 1
+                logger.exception(f"[slot {slot}] Consumer error, backing off: {e}")
+                await self._backoff(errors)
+
+    async def _backoff(self, errors: int):
+        """Sleep before the next attempt (doubling, capped at 30s); returns early on stop()."""
+        delay = min(self.block_timeout_s * 2 ** (errors - 1), 30.0)
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+
+    async def handle(self, raw: str):
+        logger.debug(f"Received message: {raw}")
+        try:
+            data = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in message, dead-lettering: {e}")
+            await self._dead_letter(raw)
+            return
+
+        try:
+            await self.handler(self.queue_name, data)
+        except Exception as e:
+            logger.exception(f"Message failed: {e}")
+            await self._retry(raw)
+            return
+
+        await self._ack(raw)
+        logger.debug("Message processed successfully")
+
+    async def _ack(self, raw: str):
+        self.processed += 1
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, raw)
+            pipe.hdel(self.attempts_key, self.message_id(raw))
+            await pipe.execute()
+
+    async def _retry(self, raw: str):
+        self.failed += 1
+        attempts = await self.redis.hincrby(self.attempts_key, self.message_id(raw), 1)
+        if attempts > self.max_retries:
+            logger.error(f"Message failed {attempts} times, moving to {self.dead_key}")
+            await self._dead_letter(raw)
+            return
+
+        logger.warning(f"Re-queueing message (attempt {attempts}/{self.max_retries})")
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, raw)
+            pipe.rpush(self.queue_name, raw)
+            await pipe.execute()
+
+    async def _dead_letter(self, raw: str):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, raw)
+            pipe.lpush(self.dead_key, raw)
+            pipe.hdel(self.attempts_key, self.message_id(raw))
+            await pipe.execute()
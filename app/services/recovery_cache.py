@@ -0,0 +1,205 @@
+import asyncio
+import json
+import logging
+import os
+import time
+
+from app import Config
+from app.services.selector_cache import normalize_instruction, page_fingerprint
+
+logger = logging.getLogger(Config.APP_NAME)
+
+# Agent action types that can be replayed without the model
+REPLAYABLE_TYPES = (
+    "click", "double_click", "doubleClick", "type", "keypress", "key",
+    "scroll", "move", "drag", "wait",
+)
+
+# Agent bookkeeping (opening the browser, screenshots): nothing to replay
+IGNORED_TYPES = ("function", "screenshot")
+
+# Every text the recovery typed is still in some field of the page
+FIELD_VALUES_JS = """
+(texts) => texts.every(text => Array.from(
+    document.querySelectorAll('input, textarea')
+).some(el => (el.value || '').includes(text)))
+"""
+
+# Computer-use key names -> Playwright key names
+KEY_NAMES = {
+    "CONTROL": "Control", "CTRL": "Control", "ALT": "Alt", "SHIFT": "Shift",
+    "META": "Meta", "CMD": "Meta", "ENTER": "Enter", "RETURN": "Enter",
+    "ESC": "Escape", "ESCAPE": "Escape", "TAB": "Tab", "SPACE": "Space",
+    "BACKSPACE": "Backspace", "DELETE": "Delete",
+    "ARROWUP": "ArrowUp", "ARROWDOWN": "ArrowDown", "ARROWLEFT": "ArrowLeft", "ARROWRIGHT": "ArrowRight",
+    "UP": "ArrowUp", "DOWN": "ArrowDown", "LEFT": "ArrowLeft", "RIGHT": "ArrowRight",
+}
+
+
+def _key(name: str) -> str:
+    return KEY_NAMES.get(name.upper(), name)
+
+
+def agent_action(raw) -> dict:
+    """
+    The concrete action of an agent step as a plain dict. Local agents
+    report AgentAction(action=ClickAction(...)) or the bare action model,
+    the API reports dicts.
+    """
+    if hasattr(raw, "model_dump"):
+        raw = raw.model_dump()
+    elif hasattr(raw, "__dict__"):
+        raw = dict(raw.__dict__)
+    if isinstance(raw, dict) and isinstance(raw.get("action"), dict):
+        return raw["action"]
+    return raw if isinstance(raw, dict) else {}
+
+
+async def perform_agent_action(page, action: dict):
+    """Execute one computer-use action with the Playwright mouse/keyboard."""
+    t = action.get("type")
+    mouse = page.mouse
+    keyboard = page.keyboard
+
+    # CLICK by coordinates
+    if t == "click":
+        await mouse.click(action["x"], action["y"], button=action.get("button") or "left")
+
+    elif t in ("double_click", "doubleClick"):
+        await mouse.dblclick(action["x"], action["y"])
+
+    # MOVE mouse
+    elif t == "move":
+        await mouse.move(action["x"], action["y"])
+
+    elif t == "drag":
+        path = action.get("path") or []
+        if path:
+            await mouse.move(path[0]["x"], path[0]["y"])
+            await mouse.down()
+            for point in path[1:]:
+                await mouse.move(point["x"], point["y"])
+            await mouse.up()
+
+    elif t == "scroll":
+        await mouse.move(action["x"], action["y"])
+        await mouse.wheel(action.get("scroll_x") or 0, action.get("scroll_y") or 0)
+
+    # TYPE text
+    elif t == "type":
+        if action.get("x") is not None and action.get("y") is not None:
+            await mouse.click(action["x"], action["y"])
+            await asyncio.sleep(1)
+        await keyboard.type(action["text"])
+
+        if action.get("press_enter_after"):
+            await keyboard.press("Enter")
+
+    elif t == "keypress":
+        await keyboard.press("+".join(_key(k) for k in action.get("keys") or []))
+
+    elif t == "key":
+        await keyboard.press("+".join(_key(k) for k in action["text"].split("+")))
+
+    # WAIT
+    elif t == "wait":
+        await asyncio.sleep((action.get("miliseconds") or 0) / 1000)
+
+    else:
+        raise ValueError(f"Unsupported agent action: {t}")
+
+
+def typed_texts(actions: list) -> list:
+    return [a["text"] for a in actions if a.get("type") == "type" and a.get("text")]
+
+
+async def verify_replay(page, entry: dict) -> str | None:
+    """
+    Why a replayed recovery did not reproduce the agent's run, None when it
+    did: the page must end where the agent left it and keep what it typed.
+    """
+    fingerprint = await page_fingerprint(page)
+    if fingerprint != entry.get("fingerprint_after"):
+        return f"page fingerprint {fingerprint}, recorded {entry.get('fingerprint_after')}"
+    texts = typed_texts(entry["actions"])
+    if texts and not await page.evaluate(FIELD_VALUES_JS, texts):
+        return "typed text not found in any field"
+    return None
+
+
+class RecoveryCache:
+    """
+    Persistent (testcase, failed step, page fingerprint) -> agent actions.
+
+    A successful agent.execute() recovery is stored per failing step and
+    page. The next time the same step fails on the same page the actions
+    are replayed with the mouse/keyboard, and the entry is dropped as soon
+    as a replay does not pass the step's own check.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.RECOVERY_CACHE_FILE
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    @staticmethod
+    def make_key(test_case: str, instruction: str, fingerprint: str) -> str:
+        return f"{test_case}|{normalize_instruction(instruction)}|{fingerprint}"
+
+    def load(self):
+        if not os.path.exists(self.path):
+            self.entries = {}
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Recovery cache unreadable, starting empty: {e}")
+            self.entries = {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str) -> dict | None:
+        entry = self.entries.get(key)
+        if entry and entry.get("actions") and entry.get("fingerprint_after"):
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def put(self, key: str, actions: list, fingerprint_after: str) -> bool:
+        actions = [a for a in map(agent_action, actions) if a.get("type") not in IGNORED_TYPES]
+        if not actions or any(a.get("type") not in REPLAYABLE_TYPES for a in actions):
+            logger.debug(f"Agent recovery not cacheable: {[a.get('type') for a in actions]}")
+            return False
+        # Neither a page change nor typed text to check a replay against
+        if fingerprint_after == key.rsplit("|", 1)[-1] and not typed_texts(actions):
+            logger.debug("Agent recovery not cacheable: replay could not be verified")
+            return False
+
+        self.entries[key] = {
+            "actions": actions,
+            "fingerprint_after": fingerprint_after,
+            "uses": 0,
+            "updated_at": time.time(),
+        }
+        self.save()
+        return True
+
+    def touch(self, key: str):
+        entry = self.entries.get(key)
+        if entry:
+            entry["uses"] = entry.get("uses", 0) + 1
+            self.save()
+
+    def invalidate(self, key: str):
+        if self.entries.pop(key, None) is not None:
+            logger.info(f"Recovery cache entry invalidated: {key}")
+            self.save()
@@ -0,0 +1,145 @@
+import glob
+import math
+import os
+
+from app import Config
+from app.services.run_log import RUN_END, RUN_START, STEP, read_run_log
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def find_run_logs(paths: list) -> list:
+    """Run log files in the given files/directories (searched recursively)."""
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for pattern in ("*.jsonl", "*.jsonl.gz"):
+            found.extend(glob.glob(os.path.join(path, "**", pattern), recursive=True))
+    return sorted(set(found))
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def distribution(values: list) -> dict:
+    stats = {"count": len(values), "total": round(sum(values), 1), "max": round(max(values, default=0), 1)}
+    for pct in PERCENTILES:
+        stats[f"p{pct}"] = round(percentile(values, pct), 1)
+    return stats
+
+
+def build_report(paths: list = None, top: int = 10) -> dict:
+    """Aggregate step metrics of all run logs under `paths`."""
+    paths = paths or [Config.RUN_LOG_DIR, "./storage/results"]
+    files = find_run_logs(paths)
+
+    step_durations = []
+    phase_durations = {}
+    steps = []
+    testcases = {}
+    llm = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "inference_ms": 0}
+
+    for path in files:
+        testcase = None
+        by_step = {}
+        for record in read_run_log(path):
+            if record.get("type") == RUN_START:
+                testcase = record.get("testcase")
+            elif record.get("type") == STEP and record.get("metrics"):
+                # Keep the last record of a step (failed steps may be logged twice)
+                by_step[record.get("step")] = record
+            elif record.get("type") == RUN_END:
+                entry = testcases.setdefault(record.get("testcase") or testcase, {
+                    "runs": 0, "passed": 0, "durations_s": [], "llm_calls": 0,
+                    "prompt_tokens": 0, "completion_tokens": 0,
+                })
+                entry["runs"] += 1
+                entry["passed"] += record.get("status") == "passed"
+                if record.get("duration_s") is not None:
+                    entry["durations_s"].append(record["duration_s"])
+                totals = record.get("metrics") or {}
+                entry["llm_calls"] += totals.get("llm_calls", 0)
+                entry["prompt_tokens"] += totals.get("prompt_tokens", 0)
+                entry["completion_tokens"] += totals.get("completion_tokens", 0)
+
+        for record in by_step.values():
+            metrics = record["metrics"]
+            step_durations.append(metrics.get("duration_ms", 0))
+            for phase, ms in (metrics.get("phases") or {}).items():
+                phase_durations.setdefault(phase, []).append(ms)
+            llm["calls"] += metrics.get("llm_calls", 0)
+            llm["prompt_tokens"] += metrics.get("prompt_tokens", 0)
+            llm["completion_tokens"] += metrics.get("completion_tokens", 0)
+            llm["inference_ms"] += metrics.get("inference_ms", 0)
+            steps.append({
+                "file": path,
+                "testcase": testcase,
+                "step": record.get("step"),
+                "instruction": record.get("instruction"),
+                "status": record.get("status"),
+                **metrics,
+            })
+
+    slowest = sorted(steps, key=lambda s: s.get("duration_ms", 0), reverse=True)[:top]
+    return {
+        "files": len(files),
+        "steps": distribution(step_durations),
+        "phases": {
+            phase: distribution(values)
+            for phase, values in sorted(phase_durations.items(), key=lambda kv: -sum(kv[1]))
+        },
+        "llm": llm,
+        "testcases": {
+            name: {
+                "runs": entry["runs"],
+                "passed": entry["passed"],
+                "p50_s": round(percentile(entry["durations_s"], 50), 2),
+                "p90_s": round(percentile(entry["durations_s"], 90), 2),
+                "llm_calls": entry["llm_calls"],
+                "tokens": entry["prompt_tokens"] + entry["completion_tokens"],
+            }
+            for name, entry in sorted(testcases.items(), key=lambda kv: str(kv[0]))
+        },
+        "slowest": slowest,
+    }
+
+
+def format_report(report: dict) -> str:
+    lines = [f"Run logs: {report['files']}", ""]
+
+    lines.append(
+        f"{'Phase (ms)':<14}{'count':>7}" + "".join(f"{'p' + str(p):>10}" for p in PERCENTILES)
+        + f"{'max':>10}{'total':>12}"
+    )
+    for name, stats in [("step", report["steps"]), *report["phases"].items()]:
+        lines.append(
+            f"{name:<14}{stats['count']:>7}"
+            + "".join(f"{stats[f'p{p}']:>10.0f}" for p in PERCENTILES)
+            + f"{stats['max']:>10.0f}{stats['total']:>12.0f}"
+        )
+
+    llm = report["llm"]
+    lines += ["", f"LLM: {llm['calls']} calls, {llm['prompt_tokens']} prompt + "
+                  f"{llm['completion_tokens']} completion tokens, {llm['inference_ms'] / 1000:.1f}s inference"]
+
+    if report["testcases"]:
+        lines += ["", f"{'Testcase':<32}{'runs':>6}{'passed':>8}{'p50 s':>9}{'p90 s':>9}{'llm':>7}{'tokens':>10}"]
+        for name, t in report["testcases"].items():
+            lines.append(f"{str(name)[:31]:<32}{t['runs']:>6}{t['passed']:>8}{t['p50_s']:>9}"
+                         f"{t['p90_s']:>9}{t['llm_calls']:>7}{t['tokens']:>10}")
+
+    if report["slowest"]:
+        lines += ["", "Slowest steps:"]
+        for s in report["slowest"]:
+            phases = ", ".join(f"{k} {v:.0f}" for k, v in sorted(s.get("phases", {}).items(), key=lambda kv: -kv[1])[:3])
+            lines.append(f"  {s['duration_ms']:>9.0f} ms  {s.get('testcase')} #{s.get('step')} "
+                         f"[{s.get('status')}] {s.get('instruction')}  ({phases})")
+    return "\n".join(lines)
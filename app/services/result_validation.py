@@ -0,0 +1,146 @@
+from dataclasses import dataclass
+
+from app.services.smart_selector import extract_selectors_from_message
+
+# Outcome kinds
+KIND_ACT = "act"
+KIND_OBSERVE = "observe"
+KIND_AGENT = "agent"
+KIND_VALUE = "value"      # wait steps: the final status text
+KIND_RESOLVED = "resolved"  # selector cache / fast path / recovery replay, no Stagehand result
+
+
+@dataclass(frozen=True)
+class Outcome:
+    """What a Stagehand call achieved, without its (possibly huge) string form."""
+
+    success: bool
+    kind: str
+    element_count: int = 0
+    selectors: tuple = ()
+    action_count: int = 0
+    reason: str | None = None
+    message: str | None = None
+
+    def __str__(self):
+        if not self.success:
+            return f"{self.kind} failed: {self.reason}"
+        if self.kind == KIND_OBSERVE:
+            return f"observe found {self.element_count} element(s)"
+        return f"{self.kind} ok" + (f": {self.message}" if self.message else "")
+
+
+RESOLVED = Outcome(success=True, kind=KIND_RESOLVED)
+
+
+def _act_result(result) -> Outcome:
+    message = getattr(result, "message", None)
+    selectors = tuple(extract_selectors_from_message(message or ""))
+    if result.success:
+        return Outcome(True, KIND_ACT, len(selectors), selectors, message=message)
+    return Outcome(False, KIND_ACT, selectors=selectors, message=message,
+                   reason=f"ActResult: success=False, message='{message or 'No message'}'")
+
+
+def _observe_results(result: list) -> Outcome:
+    if not result:
+        return Outcome(False, KIND_OBSERVE, reason="Action found 0 elements - element not found on page")
+    selectors = tuple(item.selector for item in result if getattr(item, "selector", None))
+    return Outcome(True, KIND_OBSERVE, len(result), selectors)
+
+
+def _dict_result(result: dict) -> Outcome:
+    if "elements" in result:
+        elements = result.get("elements") or []
+        if not elements:
+            return Outcome(False, KIND_OBSERVE,
+                           reason="Action returned empty elements list - element not found on page")
+        return _observe_results(list(elements))
+    if "success" in result:
+        # ActResult as a plain dict (API responses)
+        return Outcome(bool(result["success"]), KIND_ACT, message=result.get("message"),
+                       reason=None if result["success"] else f"success=False, message='{result.get('message')}'")
+    return Outcome(True, KIND_ACT)
+
+
+def _str_result(result: str) -> Outcome:
+    if not result:
+        return Outcome(False, KIND_VALUE, reason="Action result is empty - element not found on page")
+    return Outcome(True, KIND_VALUE, message=result)
+
+
+# Exact type name -> validator. Matched by name so neither stagehand.schemas
+# (API mode) nor stagehand.types (local mode) has to be imported here.
+_VALIDATORS = {
+    "ActResult": _act_result,
+    "list": _observe_results,
+    "dict": _dict_result,
+    "str": _str_result,
+}
+
+
+def validate_result(result) -> Outcome:
+    """Outcome of page.act() / page.observe() / a wait step."""
+    validator = _VALIDATORS.get(type(result).__name__)
+    if validator is not None:
+        return validator(result)
+
+    if result is None:
+        return Outcome(False, KIND_ACT, reason="Action returned None - no element found or action failed")
+    if isinstance(result, list):
+        return _observe_results(result)
+    if isinstance(result, dict):
+        return _dict_result(result)
+    if hasattr(result, "success"):
+        return _act_result(result)
+    if hasattr(result, "__len__") and len(result) == 0:
+        return Outcome(False, KIND_ACT, reason="Action result is empty - element not found on page")
+    return Outcome(True, KIND_ACT)
+
+
+def _agent_execute_result(result) -> Outcome:
+    """API mode: the server reports success itself."""
+    actions = getattr(result, "actions", None) or []
+    message = getattr(result, "message", None)
+    if result.success:
+        return Outcome(True, KIND_AGENT, action_count=len(actions), message=message)
+    return Outcome(False, KIND_AGENT, action_count=len(actions), message=message,
+                   reason=message or "Agent reported success=False")
+
+
+def _agent_result(result) -> Outcome:
+    """Local mode: the actions the computer-use agent performed."""
+    actions = result.actions or []
+    message = getattr(result, "message", None)
+    if not actions:
+        return Outcome(False, KIND_AGENT, message=message,
+                       reason=message or "Agent could not find any way to complete the action")
+
+    last_action = actions[-1]
+    status = getattr(last_action, "success", None)
+    if status is None and getattr(last_action, "status", None) is not None:
+        status = last_action.status == "success"
+    if status is False:
+        return Outcome(False, KIND_AGENT, action_count=len(actions), message=message,
+                       reason=message or "Last agent action failed")
+    return Outcome(True, KIND_AGENT, action_count=len(actions), message=message)
+
+
+_AGENT_VALIDATORS = {
+    "AgentExecuteResult": _agent_execute_result,
+    "AgentResult": _agent_result,
+}
+
+
+def validate_agent_result(result) -> Outcome:
+    """Outcome of agent.execute()."""
+    validator = _AGENT_VALIDATORS.get(type(result).__name__)
+    if validator is not None:
+        return validator(result)
+    if result is None:
+        return Outcome(False, KIND_AGENT, reason="Agent returned no result")
+    if hasattr(result, "success"):
+        return _agent_execute_result(result)
+    if hasattr(result, "actions"):
+        return _agent_result(result)
+    return Outcome(True, KIND_AGENT)
@@ -0,0 +1,122 @@
+import glob
+import gzip
+import json
+import logging
+import os
+import time
+import zlib
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+# Record types, one JSON object per line
+RUN_START = "run_start"
+STEP = "step"
+RESTART = "restart"   # earlier steps were discarded (e.g. stale session, logged in again)
+RUN_END = "run_end"
+
+
+def run_log_path(run_id: str, directory: str = None, compress: bool = None) -> str:
+    directory = directory or Config.RUN_LOG_DIR
+    compress = Config.RUN_LOG_COMPRESS if compress is None else compress
+    return os.path.join(directory, f"{run_id}.jsonl{'.gz' if compress else ''}")
+
+
+class RunLog:
+    """
+    Append-only JSON Lines log of one run, flushed after every record so a
+    crashed or killed run keeps everything up to its last step and a
+    dashboard can tail it while the run is going.
+
+    A `.gz` path is written as one gzip stream with a sync flush per record,
+    which keeps it readable (and tail-able) before the run has finished.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.compressed = path.endswith(".gz")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = gzip.open(path, "ab") if self.compressed else open(path, "ab")
+
+    def write(self, record_type: str, **fields):
+        record = {"type": record_type, "ts": round(time.time(), 3), **fields}
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        self._file.write(line.encode("utf-8"))
+        if self.compressed:
+            self._file.flush(zlib.Z_SYNC_FLUSH)
+        else:
+            self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _decoded_lines(f, compressed: bool, follow: bool = False, poll_s: float = 0.5):
+    """Complete lines of a (possibly still growing) log file."""
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if compressed else None
+    pending = b""
+    while True:
+        chunk = f.read(64 * 1024)
+        if not chunk:
+            if not follow:
+                break
+            time.sleep(poll_s)
+            continue
+
+        if decompressor is not None:
+            data = decompressor.decompress(chunk)
+            # A finished member may be followed by another one (appended run)
+            while decompressor.eof and decompressor.unused_data:
+                rest = decompressor.unused_data
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                data += decompressor.decompress(rest)
+            chunk = data
+
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+
+
+def read_run_log(path: str, follow: bool = False, poll_s: float = 0.5):
+    """
+    Yield the records of a run log. With `follow`, keep waiting for new
+    records (like `tail -f`) until the run_end record arrives.
+    A half-written last line is ignored.
+    """
+    with open(path, "rb") as f:
+        for line in _decoded_lines(f, path.endswith(".gz"), follow=follow, poll_s=poll_s):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.debug(f"Skipping unreadable run log line in {path}")
+                continue
+            yield record
+            if follow and record.get("type") == RUN_END:
+                return
+
+
+def load_actions(path: str) -> list:
+    """The run's executed actions in the old `cached_steps.json` array format."""
+    actions = []
+    for record in read_run_log(path):
+        if record.get("type") == RESTART:
+            actions = []
+        elif record.get("type") == STEP:
+            actions.append({k: v for k, v in record.items() if k not in ("type", "ts")})
+    return actions
+
+
+def latest_run_log(directory: str = None) -> str | None:
+    directory = directory or Config.RUN_LOG_DIR
+    paths = glob.glob(os.path.join(directory, "*.jsonl")) + glob.glob(os.path.join(directory, "*.jsonl.gz"))
+    return max(paths, key=os.path.getmtime) if paths else None
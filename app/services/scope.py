@@ -0,0 +1,170 @@
+import contextvars
+import json
+import logging
+from contextlib import asynccontextmanager
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+# Scope values of the `@scope` directive besides a CSS selector
+SCOPE_AUTO = "auto"
+SCOPE_PAGE = "page"
+
+# Backend node ids the snapshots of the current task are limited to (None:
+# the whole page). A context variable, so scopes that overlap in time, such
+# as a speculative observe in its own task next to the step's act, neither
+# see nor undo each other.
+_snapshot_roots = contextvars.ContextVar("snapshot_roots", default=None)
+
+# Elements the model should see: the topmost visible ExtJS window / message
+# box / dialog (or the visible matches of `selector`), plus the floating
+# layers ExtJS renders to <body> for it (combo boundlists, menus, pickers).
+# Returns [] when nothing modal is open, i.e. the whole page stays in scope.
+SCOPE_ROOTS_JS = """
+(selector) => {
+    const visible = (el) => {
+        if (el.closest('.x-hidden, .x-hide-display, .x-hidden-offsets')) return false;
+        const style = getComputedStyle(el);
+        if (style.display === 'none' || style.visibility === 'hidden') return false;
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0;
+    };
+    const zIndex = (el) => {
+        const z = parseInt(getComputedStyle(el).zIndex, 10);
+        return Number.isNaN(z) ? 0 : z;
+    };
+
+    let roots;
+    if (selector) {
+        roots = [...document.querySelectorAll(selector)].filter(visible);
+    } else {
+        const windows = [...document.querySelectorAll(
+            '.x-window, .x-message-box, [role="dialog"], [role="alertdialog"]'
+        )].filter((el) => visible(el) && !el.matches('.x-tip, .x-toast, .x-menu'));
+        // Outermost windows only, the topmost of them (later in the DOM wins ties)
+        const outer = windows.filter((el) => !windows.some((o) => o !== el && o.contains(el)));
+        let top = null;
+        for (const el of outer) {
+            if (top === null || zIndex(el) >= zIndex(top)) top = el;
+        }
+        roots = top ? [top] : [];
+    }
+    if (!roots.length) return [];
+
+    const floating = [...document.querySelectorAll('.x-boundlist, .x-menu, .x-datepicker, .x-picker')]
+        .filter((el) => visible(el) && !roots.some((root) => root.contains(el)));
+    return [...roots, ...floating];
+}
+"""
+
+
+def prune_ax_tree(nodes: list, root_backend_ids: set) -> list:
+    """
+    Nodes of a CDP Accessibility.getFullAXTree result that belong to the
+    subtrees of the given DOM nodes; the subtree roots become tree roots.
+    Unchanged when none of the roots is part of the tree.
+    """
+    by_id = {node.get("nodeId"): node for node in nodes}
+    roots = {node["nodeId"] for node in nodes if node.get("backendDOMNodeId") in root_backend_ids}
+    if not roots:
+        return nodes
+
+    keep = set()
+    pending = list(roots)
+    while pending:
+        node_id = pending.pop()
+        if node_id in keep or node_id not in by_id:
+            continue
+        keep.add(node_id)
+        pending.extend(by_id[node_id].get("childIds") or [])
+
+    pruned = []
+    for node in nodes:
+        node_id = node.get("nodeId")
+        if node_id not in keep:
+            continue
+        if node_id in roots:
+            node = {k: v for k, v in node.items() if k != "parentId"}
+        pruned.append(node)
+    return pruned
+
+
+async def scope_roots(page, selector: str = None) -> list:
+    """(backend node id, label) of the scope roots on a StagehandPage."""
+    evaluated = await page.send_cdp("Runtime.evaluate", {
+        "expression": f"({SCOPE_ROOTS_JS})({json.dumps(selector)})",
+    })
+    if evaluated.get("exceptionDetails"):
+        raise ValueError(f"Invalid scope selector {selector!r}")
+    array_id = evaluated.get("result", {}).get("objectId")
+    if not array_id:
+        return []
+
+    try:
+        properties = await page.send_cdp("Runtime.getProperties", {"objectId": array_id, "ownProperties": True})
+        roots = []
+        for prop in properties.get("result", []):
+            object_id = prop.get("value", {}).get("objectId")
+            if not prop.get("name", "").isdigit() or not object_id:
+                continue
+            node = (await page.send_cdp("DOM.describeNode", {"objectId": object_id}))["node"]
+            attributes = dict(zip(node.get("attributes", [])[::2], node.get("attributes", [])[1::2]))
+            label = node.get("localName", "")
+            if attributes.get("id"):
+                label += f"#{attributes['id']}"
+            roots.append((node["backendNodeId"], label))
+        return roots
+    finally:
+        await page.send_cdp("Runtime.releaseObject", {"objectId": array_id})
+
+
+@asynccontextmanager
+async def scoped_snapshot(stagehand, scope: str = SCOPE_AUTO):
+    """
+    Restrict the accessibility snapshot Stagehand sends to the model (and
+    so the elements it can return) to the active ExtJS window while the
+    block runs:
+
+        async with scoped_snapshot(stagehand, "auto"):
+            await page.act(instruction)
+
+    `scope` is "auto", "page" (no scoping) or a CSS selector. Yields the
+    scope root labels, or [] when the whole page is used.
+    """
+    # The live page proxy can't hold attributes, patch the StagehandPage itself
+    page = getattr(stagehand, "_page", None)
+    if page is None or not scope or scope == SCOPE_PAGE:
+        yield []
+        return
+
+    try:
+        roots = await scope_roots(page, None if scope == SCOPE_AUTO else scope)
+    except Exception as e:
+        logger.debug(f"Could not resolve the active window, using the whole page: {e}")
+        roots = []
+    if roots:
+        _install_pruning(page)
+    # Also set when empty, so a nested unscoped block sees the whole page
+    token = _snapshot_roots.set(frozenset(backend_id for backend_id, _ in roots) or None)
+    try:
+        yield [label for _, label in roots]
+    finally:
+        _snapshot_roots.reset(token)
+
+
+def _install_pruning(page):
+    """Wrap page.send_cdp once; accessibility trees are pruned to the calling task's scope."""
+    if vars(page).get("_prunes_snapshots"):
+        return
+    original = page.send_cdp
+
+    async def send_cdp(method, params=None):
+        result = await original(method, params)
+        backend_ids = _snapshot_roots.get()
+        if backend_ids and method == "Accessibility.getFullAXTree":
+            result = {**result, "nodes": prune_ax_tree(result.get("nodes", []), backend_ids)}
+        return result
+
+    page.send_cdp = send_cdp
+    page._prunes_snapshots = True
@@ -0,0 +1,149 @@
+import base64
+import logging
+import os
+import queue
+import threading
+from collections import deque
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+POLICIES = ("all", "after", "failure", "ring")
+FORMATS = {"png": "png", "jpeg": "jpg", "webp": "webp"}
+
+# Shot kinds that describe a failure; they are always written and, with the
+# "ring" policy, flush the buffered history to disk.
+FAILURE_KINDS = ("error", "agent")
+
+
+class ScreenshotPipeline:
+    """
+    Capture screenshots on the event loop, encode + write them on a
+    background thread.
+
+    Policies:
+      all      before / after / agent / error / final (previous behaviour)
+      after    everything except the "before" shots
+      failure  only agent-fallback and error shots
+      ring     keep the last `ring_size` shots in memory, write on failure
+               (paths returned for buffered shots exist only after a flush)
+    """
+
+    def __init__(self, directory: str, policy: str = None, fmt: str = None,
+                 quality: int = None, ring_size: int = None,
+                 queue_size: int = None):
+        self.directory = directory
+        self.policy = (policy or Config.SCREENSHOT_POLICY).lower()
+        self.format = (fmt or Config.SCREENSHOT_FORMAT).lower()
+        self.quality = quality or Config.SCREENSHOT_QUALITY
+        if self.policy not in POLICIES:
+            raise ValueError(f"Unknown screenshot policy '{self.policy}', expected one of {POLICIES}")
+        if self.format not in FORMATS:
+            raise ValueError(f"Unknown screenshot format '{self.format}', expected one of {tuple(FORMATS)}")
+
+        self.ring = deque(maxlen=ring_size or Config.SCREENSHOT_RING_SIZE)
+        self._queue = queue.Queue(maxsize=queue_size or Config.SCREENSHOT_QUEUE_SIZE)
+        self._worker = None
+        self.dropped = 0
+
+    def path_for(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.{FORMATS[self.format]}")
+
+    def wants(self, kind: str) -> bool:
+        if kind in FAILURE_KINDS:
+            return True
+        if self.policy == "all" or self.policy == "ring":
+            return True
+        if self.policy == "after":
+            return kind != "before"
+        return False
+
+    async def capture(self, page, name: str, kind: str) -> str | None:
+        """
+        Grab a screenshot and hand it to the writer thread.
+        Returns the target path, or None when the policy skips this shot.
+        """
+        if not self.wants(kind):
+            return None
+
+        path = self.path_for(name)
+        try:
+            data = await self._grab(page)
+        except Exception as e:
+            logger.warning(f"Could not capture {kind} screenshot: {e}")
+            return None
+
+        if self.policy == "ring" and kind not in FAILURE_KINDS:
+            self.ring.append((path, data))
+            return path
+
+        if kind in FAILURE_KINDS:
+            self.flush_ring()
+        self._enqueue(path, data)
+        return path
+
+    async def _grab(self, page) -> str | bytes:
+        params = {"format": self.format, "optimizeForSpeed": True}
+        if self.format != "png":
+            params["quality"] = self.quality
+        send_cdp = getattr(page, "send_cdp", None)
+        if send_cdp is not None:
+            # base64 payload, decoded on the writer thread
+            result = await send_cdp("Page.captureScreenshot", params)
+            return result["data"]
+
+        if self.format == "webp":
+            raise ValueError("webp screenshots need a CDP-capable page")
+        options = {"type": self.format}
+        if self.format == "jpeg":
+            options["quality"] = self.quality
+        return await page.screenshot(**options)
+
+    def flush_ring(self):
+        while self.ring:
+            self._enqueue(*self.ring.popleft())
+
+    def _enqueue(self, path: str, data):
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((path, data))
+        except queue.Full:
+            # Never block a step on disk I/O
+            self.dropped += 1
+            logger.warning(f"Screenshot queue full, dropped {path}")
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            os.makedirs(self.directory, exist_ok=True)
+            self._worker = threading.Thread(
+                target=self._run, name="screenshot-writer", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, data = item
+                if isinstance(data, str):
+                    data = base64.b64decode(data)
+                with open(path, "wb") as f:
+                    f.write(data)
+                logger.debug(f"Screenshot saved: {path}")
+            except Exception as e:
+                logger.warning(f"Could not write screenshot: {e}")
+            finally:
+                self._queue.task_done()
+
+    def close(self):
+        """Drain pending writes. Blocking: call via asyncio.to_thread()."""
+        if self._worker is None:
+            return
+        self._queue.put(None)
+        self._worker.join()
+        self._worker = None
+        if self.dropped:
+            logger.warning(f"{self.dropped} screenshots dropped (queue full)")
@@ -0,0 +1,247 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+# Cheap page-state fingerprint: location plus the titles of the visible
+# ExtJS windows / wizard headers, so the same instruction on two different
+# dialogs does not share a cache entry.
+PAGE_FINGERPRINT_JS = """
+() => {
+    const titles = [];
+    const headers = document.querySelectorAll(
+        '.x-window-header-text, .x-window-header-title, .x-panel-header-text'
+    );
+    for (const el of headers) {
+        if (el.offsetParent === null) continue;
+        const text = (el.innerText || '').trim();
+        if (text) titles.push(text);
+    }
+    return {
+        location: location.origin + location.pathname + location.hash,
+        title: document.title,
+        windows: titles.slice(0, 10),
+    };
+}
+"""
+
+
+class PartialReplayError(RuntimeError):
+    """A cached act failed after some of its actions were already performed."""
+
+
+def normalize_instruction(instruction: str) -> str:
+    """
+    Normalize a step so cosmetic edits (case, spacing, trailing dot)
+    keep hitting the same cache entry.
+    """
+    text = re.sub(r"\s+", " ", instruction or "").strip().lower()
+    return text.rstrip(".").strip()
+
+
+async def page_fingerprint(page) -> str:
+    try:
+        state = await page.evaluate(PAGE_FINGERPRINT_JS)
+    except Exception as e:
+        logger.debug(f"page_fingerprint: evaluate failed: {e}")
+        state = {"location": getattr(page, "url", ""), "title": "", "windows": []}
+
+    raw = json.dumps(state, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def instruction_value(instruction: str) -> str | None:
+    """
+    First quoted literal of a step, e.g. `Type "admin" on ...` -> admin.
+    Used when Stagehand did not report the typed arguments.
+    """
+    match = re.search(r'"([^"]*)"', instruction or "")
+    return match.group(1) if match else None
+
+
+class SelectorCache:
+    """
+    Persistent (testcase, instruction, page fingerprint) -> smart selectors map.
+
+    Entries are written after every successful LLM resolution so the next
+    run can drive Playwright directly and skip page.act()/page.observe().
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path or Config.SELECTOR_CACHE_FILE
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    @staticmethod
+    def make_key(test_case: str, instruction: str, fingerprint: str) -> str:
+        return f"{test_case}|{normalize_instruction(instruction)}|{fingerprint}"
+
+    def has_instruction(self, test_case: str, instruction: str) -> bool:
+        """Any entry for this step, on whatever page."""
+        prefix = f"{test_case}|{normalize_instruction(instruction)}|"
+        return any(key.startswith(prefix) for key in self.entries)
+
+    def load(self):
+        if not os.path.exists(self.path):
+            self.entries = {}
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Selector cache unreadable, starting empty: {e}")
+            self.entries = {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def get(self, key: str) -> dict | None:
+        entry = self.entries.get(key)
+        if entry and entry.get("selectors"):
+            self.hits += 1
+            return entry
+        self.misses += 1
+        return None
+
+    def put(self, key: str, kind: str, smart_selectors: list):
+        selectors = [
+            {
+                "original": item.get("original"),
+                "smart": item.get("smart"),
+                "score": item.get("score"),
+                "method": item.get("method"),
+                "value": item.get("value"),
+                "description": item.get("description"),
+            }
+            for item in smart_selectors
+            if item.get("original") or item.get("smart")
+        ]
+        if not selectors:
+            return
+
+        previous = self.entries.get(key) or {}
+        self.entries[key] = {
+            "kind": kind,
+            "selectors": selectors,
+            "uses": previous.get("uses", 0),
+            "updated_at": time.time(),
+        }
+        self.save()
+
+    def touch(self, key: str):
+        entry = self.entries.get(key)
+        if entry:
+            entry["uses"] = entry.get("uses", 0) + 1
+
+    def invalidate(self, key: str):
+        if self.entries.pop(key, None) is not None:
+            logger.info(f"Selector cache entry invalidated: {key}")
+            self.save()
+
+
+async def replay_cached_step(page, entry: dict, instruction: str,
+                             timeout_ms: int = None) -> bool:
+    """
+    Execute a cached step directly through Playwright.
+
+    Returns False, before anything was done, when a selector does not
+    resolve to exactly one visible element, so the caller can fall back to
+    the LLM and heal the entry. Raises PartialReplayError when an action
+    fails after earlier ones were performed: running the whole step again
+    would repeat them.
+    """
+    timeout_ms = timeout_ms or Config.SELECTOR_CACHE_TIMEOUT_MS
+    selectors = entry.get("selectors") or []
+    if not selectors:
+        return False
+
+    # Expect steps: any of the observed elements being visible is enough
+    if entry.get("kind") == "observe":
+        for item in selectors:
+            for selector in (item.get("smart"), item.get("original")):
+                if not selector:
+                    continue
+                try:
+                    await page.locator(selector).first.wait_for(
+                        state="visible", timeout=timeout_ms
+                    )
+                    return True
+                except Exception as e:
+                    logger.debug(f"Cached observe selector failed '{selector}': {e}")
+        return False
+
+    # Resolve every action's element first, so a stale entry touches nothing
+    targets = []
+    for item in selectors:
+        locator = await _single_visible(page, item)
+        if locator is None:
+            return False
+        targets.append((locator, item))
+
+    for done, (locator, item) in enumerate(targets):
+        try:
+            await _perform_cached_action(locator, item, instruction, timeout_ms)
+        except Exception as e:
+            if done == 0:
+                logger.debug(f"Cached action failed: {e}")
+                return False
+            raise PartialReplayError(
+                f"Cached action {done + 1}/{len(targets)} failed after {done} were performed: {e}"
+            ) from e
+
+    return True
+
+
+async def _single_visible(page, item: dict):
+    """Locator of the one visible element the item's smart or original selector matches."""
+    for selector in (item.get("smart"), item.get("original")):
+        if not selector:
+            continue
+        try:
+            visible = page.locator(selector).locator("visible=true")
+            count = await visible.count()
+        except Exception as e:
+            logger.debug(f"Cached selector failed '{selector}': {e}")
+            continue
+        if count == 1:
+            return visible.first
+        logger.debug(f"Cached selector '{selector}' has {count} visible matches")
+    return None
+
+
+async def _perform_cached_action(locator, item: dict, instruction: str,
+                                 timeout_ms: int):
+    method = (item.get("method") or "click").lower()
+    value = item.get("value")
+
+    if method in ("fill", "type"):
+        if value is None:
+            value = instruction_value(instruction)
+        if value is None:
+            raise ValueError("No value to type for cached fill action")
+        await locator.fill(str(value), timeout=timeout_ms)
+    elif method == "press":
+        if value is None:
+            match = re.search(r"press\s+(\w+)", instruction, re.IGNORECASE)
+            value = match.group(1) if match else "Enter"
+        await locator.press(str(value), timeout=timeout_ms)
+    elif method in ("selectoption", "selectoptionfromdropdown"):
+        if value is None:
+            value = instruction_value(instruction)
+        await locator.select_option(str(value), timeout=timeout_ms)
+    elif method == "check":
+        await locator.check(timeout=timeout_ms)
+    else:
+        await locator.click(timeout=timeout_ms)
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+from app import Config
+from app.services.browser_pool import BrowserPool
+
+logger = logging.getLogger(Config.APP_NAME)
+
+CLEAR_STORAGE_JS = """
+() => {
+    try { window.localStorage.clear(); } catch (e) {}
+    try { window.sessionStorage.clear(); } catch (e) {}
+}
+"""
+
+
+class PooledSession:
+    def __init__(self, stagehand):
+        self.stagehand = stagehand
+        self.uses = 0
+        self.tenant = None
+
+    @property
+    def context(self):
+        return self.stagehand._context
+
+
+class SessionPool:
+    """
+    Keep `size` initialized Stagehand sessions warm on one shared browser.
+
+    Sessions are handed out clean (cookies + web storage cleared) unless
+    they are re-acquired by the tenant that used them last, which keeps
+    that tenant logged in. Sessions failing the health check or used
+    `max_uses` times are replaced by fresh ones.
+    """
+
+    def __init__(self, size: int = None, max_uses: int = None, health_timeout_ms: int = None):
+        self.size = max(1, size or Config.SESSION_POOL_SIZE)
+        self.max_uses = max_uses or Config.SESSION_MAX_USES
+        self.health_timeout_ms = health_timeout_ms or Config.SESSION_HEALTH_TIMEOUT_MS
+        self.browser = BrowserPool()
+        self._idle = []
+        self._total = 0
+        self._available = asyncio.Condition()
+
+    async def start(self):
+        await self.browser.start()
+        sessions = await asyncio.gather(*(self._create() for _ in range(self.size)))
+        self._idle.extend(sessions)
+        logger.info(f"Session pool warmed up with {len(sessions)} sessions")
+
+    async def stop(self):
+        async with self._available:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            await self._dispose(session)
+        await self.browser.stop()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
+
+    @asynccontextmanager
+    async def session(self, tenant: str = None):
+        """`async with pool.session(tenant) as stagehand: ...`"""
+        session = await self.acquire(tenant)
+        healthy = True
+        try:
+            yield session.stagehand
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            await self.release(session, healthy=healthy)
+
+    async def acquire(self, tenant: str = None) -> PooledSession:
+        async with self._available:
+            while not self._idle and self._total >= self.size:
+                await self._available.wait()
+
+            session = self._take_idle(tenant)
+            if session is None:
+                self._total += 1
+
+        if session is None:
+            try:
+                session = await self._create(counted=True)
+            except Exception:
+                await self._forget()
+                raise
+        elif not await self._prepare(session, tenant):
+            await self._dispose(session)
+            try:
+                session = await self._create(counted=True)
+            except Exception:
+                await self._forget()
+                raise
+
+        session.tenant = tenant
+        return session
+
+    async def release(self, session: PooledSession, healthy: bool = True):
+        session.uses += 1
+        if not healthy or session.uses >= self.max_uses:
+            logger.debug(f"Recycling session after {session.uses} uses (healthy={healthy})")
+            await self._dispose(session)
+            await self._forget()
+            return
+
+        async with self._available:
+            self._idle.append(session)
+            self._available.notify()
+
+    def _take_idle(self, tenant: str = None) -> PooledSession | None:
+        if not self._idle:
+            return None
+        if tenant is not None:
+            for index, session in enumerate(self._idle):
+                if session.tenant == tenant:
+                    return self._idle.pop(index)
+        return self._idle.pop(0)
+
+    async def _prepare(self, session: PooledSession, tenant: str = None) -> bool:
+        """Health-check and, unless the tenant matches, wipe the session state."""
+        try:
+            context = session.context
+            if len(context.pages) != 1:
+                return False
+            page = context.pages[0]
+            await asyncio.wait_for(page.evaluate("1"), self.health_timeout_ms / 1000)
+
+            if tenant is None or session.tenant != tenant:
+                await context.clear_cookies()
+                await page.evaluate(CLEAR_STORAGE_JS)
+                await page.goto("about:blank")
+            return True
+        except Exception as e:
+            logger.warning(f"Pooled session failed health check: {e}")
+            return False
+
+    async def _create(self, counted: bool = False) -> PooledSession:
+        stagehand = await self.browser.new_session()
+        if not counted:
+            self._total += 1
+        return PooledSession(stagehand)
+
+    async def _dispose(self, session: PooledSession):
+        try:
+            await session.stagehand.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled session: {e}")
+
+    async def _forget(self):
+        async with self._available:
+            self._total -= 1
+            self._available.notify()
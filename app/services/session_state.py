@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+import re
+import time
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+RESTORE_LOCAL_STORAGE_JS = """
+(items) => {
+    for (const item of items) window.localStorage.setItem(item.name, item.value);
+}
+"""
+
+
+async def apply_storage_state(page, storage: dict | None, url: str):
+    """Load recorded cookies + localStorage into the page's context and open `url`."""
+    storage = storage or {}
+    await page.context.add_cookies(storage.get("cookies") or [])
+    await page.goto(url)
+
+    origin = await page.evaluate("() => location.origin")
+    for entry in storage.get("origins") or []:
+        if entry.get("origin") == origin and entry.get("localStorage"):
+            await page.evaluate(RESTORE_LOCAL_STORAGE_JS, entry["localStorage"])
+            await page.reload()
+            break
+
+
+class SessionStateStore:
+    """
+    Playwright storage state recorded after a testcase's login prefix,
+    stored per `@use_session <name>` under `storage/sessions/<name>.json`.
+    """
+
+    def __init__(self, directory: str = None, ttl_s: int = None):
+        self.directory = directory or Config.SESSION_STATE_DIR
+        self.ttl_s = Config.SESSION_STATE_TTL_S if ttl_s is None else ttl_s
+
+    def path_for(self, name: str) -> str:
+        safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        return os.path.join(self.directory, f"{safe_name}.json")
+
+    def load(self, name: str) -> dict | None:
+        path = self.path_for(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Session state '{name}' unreadable: {e}")
+            return None
+
+        if self.ttl_s and time.time() - state.get("created_at", 0) > self.ttl_s:
+            logger.info(f"Session state '{name}' expired")
+            self.invalidate(name)
+            return None
+        return state
+
+    async def save(self, name: str, page):
+        state = {
+            "url": page.url,
+            "created_at": time.time(),
+            "storage_state": await page.context.storage_state(),
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.path_for(name), "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2, ensure_ascii=False)
+        logger.info(f"Session state '{name}' recorded")
+
+    def invalidate(self, name: str):
+        path = self.path_for(name)
+        if os.path.exists(path):
+            os.remove(path)
+            logger.info(f"Session state '{name}' invalidated")
+
+    async def restore(self, name: str, page) -> bool:
+        """Load cookies + localStorage and open the post-login URL."""
+        state = self.load(name)
+        if not state:
+            return False
+
+        try:
+            await apply_storage_state(page, state.get("storage_state"), state["url"])
+        except Exception as e:
+            logger.warning(f"Could not restore session state '{name}': {e}")
+            self.invalidate(name)
+            await page.context.clear_cookies()
+            return False
+
+        logger.info(f"Session state '{name}' restored")
+        return True
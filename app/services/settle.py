@@ -0,0 +1,81 @@
+import logging
+import time
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+# The page counts as settled once the document is loaded, no ExtJS Ajax
+# request or load mask is pending and the DOM has been quiet for
+# `quietMs`. Resolves with settled=false when `maxMs` is hit first.
+SETTLE_JS = """
+([quietMs, maxMs]) => new Promise((resolve) => {
+    const start = performance.now();
+    let lastMutation = start;
+    const observer = new MutationObserver(() => { lastMutation = performance.now(); });
+    observer.observe(document, {
+        subtree: true, childList: true, characterData: true, attributes: true,
+    });
+
+    const ajaxPending = () => {
+        const ajax = window.Ext && window.Ext.Ajax;
+        if (!ajax) return false;
+        if (ajax.requests && typeof ajax.requests === 'object') {
+            return Object.keys(ajax.requests).length > 0;
+        }
+        try { return !!ajax.isLoading(); } catch (e) { return false; }
+    };
+
+    const maskVisible = () => {
+        for (const el of document.querySelectorAll('.x-mask-msg, .x-mask-loading')) {
+            if (el.offsetParent !== null) return true;
+        }
+        return false;
+    };
+
+    const tick = () => {
+        const now = performance.now();
+        let busy = null;
+        if (document.readyState !== 'complete') busy = 'document';
+        else if (ajaxPending()) busy = 'ajax';
+        else if (maskVisible()) busy = 'mask';
+        else if (now - lastMutation < quietMs) busy = 'dom';
+
+        if (!busy || now - start >= maxMs) {
+            observer.disconnect();
+            resolve({settled: !busy, reason: busy, waited_ms: Math.round(now - start)});
+            return;
+        }
+        setTimeout(tick, 50);
+    };
+    tick();
+})
+"""
+
+
+async def wait_for_settle(page, quiet_ms: int = None, max_ms: int = None) -> dict:
+    """
+    Wait until the UI is idle instead of sleeping a fixed interval.
+    Never raises: a page that does not settle within `max_ms` is logged
+    and the run continues, like the old fixed sleep did.
+    """
+    quiet_ms = Config.SETTLE_QUIET_MS if quiet_ms is None else quiet_ms
+    max_ms = Config.SETTLE_MAX_MS if max_ms is None else max_ms
+    started = time.monotonic()
+
+    try:
+        state = await page.evaluate(SETTLE_JS, [quiet_ms, max_ms])
+    except Exception as e:
+        # Execution context destroyed by a navigation: wait for the new document
+        logger.debug(f"Settle detector interrupted ({e}), waiting for load state")
+        remaining = max(0, max_ms - int((time.monotonic() - started) * 1000))
+        try:
+            await page.wait_for_load_state("load", timeout=remaining or 1)
+            state = {"settled": True, "reason": None}
+        except Exception:
+            state = {"settled": False, "reason": "navigation"}
+
+    state["waited_ms"] = int((time.monotonic() - started) * 1000)
+    if not state.get("settled"):
+        logger.debug(f"Page not settled after {state['waited_ms']}ms (busy: {state.get('reason')})")
+    return state
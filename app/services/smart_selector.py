@@ -1,4 +1,3 @@
-from playwright.async_api import async_playwright
 import re
 import logging
 from app import Config
@@ -23,6 +22,9 @@ PREFERRED_DATA_ATTRS = (
     "data-qa",
 )
 
+# Methods whose first argument is the value to replay (typed text, key, option)
+VALUE_METHODS = ("type", "fill", "press", "selectOptionFromDropdown")
+
 EXTJS_BAD_CLASS_PREFIXES = (
     "x-",          # ExtJS internal classes
     "x-boundlist", # dynamic
@@ -35,98 +37,193 @@ def is_stable_class(class_name: str) -> bool:
     return not any(class_name.startswith(p) for p in EXTJS_BAD_CLASS_PREFIXES)
 
 
-async def generate_smart_selector(page, element):
-    """
-    ExtJS-optimized Testim-style Smart Selector generator
-    """
-    attrs = await page.evaluate("""
-    (el) => {
-        const dataAttrs = {};
-        for (let a of el.attributes) {
-            if (a.name.startsWith('data-')) dataAttrs[a.name] = a.value;
+# Stability penalties applied to every candidate (see SMART_SELECTOR_LIB_JS)
+UNSTABLE_PATTERNS = {
+    "ext-gen|ext-comp|ext-element|-\\d{3,}": 40,   # ExtJS auto-generated ids
+    "\\[\\d+\\]": 50,                               # positional xpath steps
+    "\\.x-|\"x-": 30,                                # ExtJS internal classes
+}
+
+# Base score per strategy, highest = most stable by construction
+STRATEGY_SCORES = {
+    "data-attr": 100,
+    "aria-label": 90,
+    "placeholder": 85,
+    "name": 80,
+    "role-text": 75,
+    "label": 70,
+    "text": 65,
+    "aria-labelledby": 60,
+    "class": 50,
+    "id": 30,
+}
+
+# Shared in-page library: candidate generation, match-count verification
+# and stability scoring. Inlined into the single and batched evaluates.
+SMART_SELECTOR_LIB_JS = """
+const smartSelectorLib = (cfg) => {
+    const evaluateXPath = (xpath) => {
+        const snapshot = document.evaluate(
+            xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+        );
+        const nodes = [];
+        for (let i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+        return nodes;
+    };
+
+    const matchAll = (selector) => {
+        try {
+            if (selector.startsWith('xpath=')) return evaluateXPath(selector.slice(6));
+            if (selector.startsWith('/')) return evaluateXPath(selector);
+            return [...document.querySelectorAll(selector.replace(/^css=/, ''))];
+        } catch (e) {
+            return [];
         }
+    };
 
-        return {
-            tag: el.tagName.toLowerCase(),
-            role: el.getAttribute('role'),
-            id: el.id,
-            name: el.getAttribute('name'),
-            placeholder: el.getAttribute('placeholder'),
-            classList: [...el.classList],
-            ariaLabel: el.getAttribute('aria-label'),
-            ariaLabelledBy: el.getAttribute('aria-labelledby'),
-            text: el.innerText?.trim() || "",
-            dataAttrs: dataAttrs
-        };
-    }
-    """, element)
-
-    # 🔒 Filter non-actionable
-    if not (
-        attrs["tag"] in ACTIONABLE_TAGS
-        or (attrs["role"] and attrs["role"] in ACTIONABLE_ROLES)
-    ):
-        return None
-
-    # 1️⃣ data-* attributes (BEST)
-    if attrs["dataAttrs"]:
-        # key = list(attrs["dataAttrs"].keys())[0]
-        # return f'[{key}="{attrs["dataAttrs"][key]}"]'
-        for key, value in attrs["dataAttrs"].items():
-            if not value:
-                continue
-            if key in PREFERRED_DATA_ATTRS:
-                return f'[{key}="{value}"]'
-
-    # 2️⃣ aria-label
-    if attrs["ariaLabel"]:
-        return f'[aria-label="{attrs["ariaLabel"]}"]'
-
-    # 3️⃣ aria-labelledby
-    if attrs["ariaLabelledBy"]:
-        return f'[aria-labelledby="{attrs["ariaLabelledBy"]}"]'
-
-    # 4️⃣ placeholder (ExtJS inputs)
-    if attrs["placeholder"]:
-        return f'{attrs["tag"]}[placeholder="{attrs["placeholder"]}"]'
-
-    # 5️⃣ name attribute
-    if attrs["name"]:
-        return f'{attrs["tag"]}[name="{attrs["name"]}"]'
-
-    # 6️⃣ role + visible text (ExtJS buttons, menu items)
-    if attrs["role"] and attrs["text"]:
-        return (
-            f'xpath=//{attrs["tag"]}'
-            f'[@role="{attrs["role"]}" and normalize-space()="{attrs["text"]}"]'
-        )
+    const resolve = (selector) => matchAll(selector)[0] || null;
 
-    # 7️⃣ visible text only (common in ExtJS)
-    if attrs["text"]:
-        return (
-            f'xpath=//{attrs["tag"]}'
-            f'[normalize-space()="{attrs["text"]}"]'
-        )
+    const isStableClass = (c) => c && !cfg.badClassPrefixes.some((p) => c.startsWith(p));
 
-    # 8️⃣ stable class + tag
-    stable_classes = [c for c in attrs["classList"] if is_stable_class(c)]
-    if stable_classes:
-        return f'{attrs["tag"]}.' + '.'.join(stable_classes[:2])
-    
-    # ⭐ Checkbox / radio with label (ExtJS GOLD)
-    if attrs["role"] in ("checkbox", "radio") and attrs.get("labelText"):
-        return (
-            f'xpath=//label[normalize-space()="{attrs["labelText"]}"]'
-            f'/preceding-sibling::input[@role="{attrs["role"]}"]'
-        )
+    const penalty = (selector) => {
+        let total = 0;
+        for (const [pattern, cost] of Object.entries(cfg.unstablePatterns)) {
+            if (new RegExp(pattern).test(selector)) total += cost;
+        }
+        return total;
+    };
+
+    const rawCandidates = (el) => {
+        const tag = el.tagName.toLowerCase();
+        const role = el.getAttribute('role');
+        if (!(cfg.actionableTags.includes(tag) || (role && cfg.actionableRoles.includes(role)))) {
+            return [];
+        }
+
+        const out = [];
+        for (const a of el.attributes) {
+            if (a.value && cfg.preferredDataAttrs.includes(a.name)) {
+                out.push(['data-attr', `[${a.name}="${a.value}"]`]);
+                break;
+            }
+        }
+        const ariaLabel = el.getAttribute('aria-label');
+        if (ariaLabel) out.push(['aria-label', `[aria-label="${ariaLabel}"]`]);
+        const ariaLabelledBy = el.getAttribute('aria-labelledby');
+        if (ariaLabelledBy) out.push(['aria-labelledby', `[aria-labelledby="${ariaLabelledBy}"]`]);
+        const placeholder = el.getAttribute('placeholder');
+        if (placeholder) out.push(['placeholder', `${tag}[placeholder="${placeholder}"]`]);
+        const name = el.getAttribute('name');
+        if (name) out.push(['name', `${tag}[name="${name}"]`]);
+        const text = (el.innerText || '').trim();
+        const textOk = text && text.length <= 80 && !text.includes('"');
+        if (role && textOk) out.push(['role-text', `xpath=//${tag}[@role="${role}" and normalize-space()="${text}"]`]);
+        const labelText = el.labels && el.labels[0] ? el.labels[0].innerText.trim() : '';
+        if ((role === 'checkbox' || role === 'radio') && labelText && !labelText.includes('"')) {
+            out.push(['label', `xpath=//label[normalize-space()="${labelText}"]/preceding-sibling::input[@role="${role}"]`]);
+        }
+        if (textOk) out.push(['text', `xpath=//${tag}[normalize-space()="${text}"]`]);
+        const stable = [...el.classList].filter(isStableClass);
+        if (stable.length) out.push(['class', `${tag}.` + stable.slice(0, 2).join('.')]);
+        if (el.id) out.push(['id', `#${CSS.escape(el.id)}`]);
+        return out;
+    };
+
+    // Every candidate is verified against the live DOM: only selectors
+    // matching exactly this element count as unique.
+    const rank = (el) => rawCandidates(el)
+        .map(([strategy, selector]) => {
+            const matches = matchAll(selector);
+            const unique = matches.length === 1 && matches[0] === el;
+            return {
+                selector,
+                strategy,
+                matches: matches.length,
+                unique,
+                score: (cfg.strategyScores[strategy] || 0) - penalty(selector),
+            };
+        })
+        .sort((a, b) => (b.unique - a.unique) || (b.score - a.score));
+
+    return {resolve, rank};
+};
+"""
+
+SMART_SELECTOR_JS = """
+([el, cfg]) => {
+    /*LIB*/
+    return smartSelectorLib(cfg).rank(el);
+}
+""".replace("/*LIB*/", SMART_SELECTOR_LIB_JS)
+
+# Batched variant: resolves every raw selector and ranks its candidates in
+# one page.evaluate round-trip.
+SMART_SELECTORS_BATCH_JS = """
+([selectors, cfg]) => {
+    /*LIB*/
+    const lib = smartSelectorLib(cfg);
+    return selectors.map((selector) => {
+        const el = lib.resolve(selector);
+        if (!el) return {found: false, candidates: []};
+        return {found: true, candidates: lib.rank(el)};
+    });
+}
+""".replace("/*LIB*/", SMART_SELECTOR_LIB_JS)
+
+
+def _smart_selector_config() -> dict:
+    return {
+        "actionableTags": ACTIONABLE_TAGS,
+        "actionableRoles": ACTIONABLE_ROLES,
+        "preferredDataAttrs": list(PREFERRED_DATA_ATTRS),
+        "badClassPrefixes": list(EXTJS_BAD_CLASS_PREFIXES),
+        "unstablePatterns": UNSTABLE_PATTERNS,
+        "strategyScores": STRATEGY_SCORES,
+    }
 
-    # 9️⃣ LAST RESORT: id (ExtJS auto-generated)
-    if attrs["id"]:
-        return f'#{attrs["id"]}'
 
+def best_candidate(candidates: list[dict]) -> dict | None:
+    """Highest scored candidate that matches exactly the target element."""
+    for candidate in candidates:
+        if candidate.get("unique"):
+            return candidate
     return None
 
 
+async def rank_smart_selectors(page, element) -> list[dict]:
+    """
+    All smart-selector candidates for `element`, best first:
+    [{"selector", "strategy", "matches", "unique", "score"}, ...]
+    """
+    return await page.evaluate(SMART_SELECTOR_JS, [element, _smart_selector_config()])
+
+
+async def generate_smart_selector(page, element):
+    """
+    ExtJS-optimized Testim-style Smart Selector generator.
+    Returns the best unique candidate ({"selector", "score", ...}) or None.
+    """
+    return best_candidate(await rank_smart_selectors(page, element))
+
+
+async def generate_smart_selectors_batch(page, selectors: list[str]) -> list[dict]:
+    """
+    Resolve all `selectors` and rank their smart-selector candidates in a
+    single page.evaluate call.
+    Returns one {"found": bool, "candidates": [...]} per input selector.
+    """
+    if not selectors:
+        return []
+    try:
+        return await page.evaluate(
+            SMART_SELECTORS_BATCH_JS, [list(selectors), _smart_selector_config()]
+        )
+    except Exception as e:
+        # Execution context gone (navigation) - nothing can be resolved
+        logger.debug(f"Batched smart selector evaluation failed: {e}")
+        return [{"found": False, "candidates": []} for _ in selectors]
+
+
 # async def generate_smart_selector(page, element_handle):
 #     attrs = await page.evaluate("""
 #     (el) => {
@@ -238,8 +335,12 @@ async def perform_act_with_smart_selector(result, page):
 
     # -------------------------------------------------------
     # Case C: ObserveResult used as action
+    # (page.observe() returns a plain List[ObserveResult])
     # -------------------------------------------------------
-    raw_elements = getattr(result, "elements", None)
+    raw_elements = (
+        result if isinstance(result, list)
+        else getattr(result, "elements", None)
+    )
     if raw_elements and not normalized_actions:
         observe_list = (
             raw_elements.elements
@@ -277,19 +378,18 @@ async def perform_act_with_smart_selector(result, page):
             })
 
     # -------------------------------------------------------
-    # Generate smart selectors
+    # Generate smart selectors (one evaluate for all actions)
     # -------------------------------------------------------
-    for action in normalized_actions:
+    resolved = await generate_smart_selectors_batch(
+        page, [action["selector"] for action in normalized_actions]
+    )
+
+    for action, info in zip(normalized_actions, resolved):
         selector = action["selector"]
         method = action.get("method")
-        value = extract_action_value(action) if method == "type" else None
-
-        try:
-            el = await page.query_selector(selector)
-        except Exception:
-            el = None
+        value = extract_action_value(action) if method in VALUE_METHODS else None
 
-        if not el:
+        if not info["found"]:
             smart_selectors.append({
                 "original": selector,
                 "smart": None,
@@ -300,14 +400,11 @@ async def perform_act_with_smart_selector(result, page):
             })
             continue
 
-        try:
-            smart_sel = await generate_smart_selector(page, el)
-        except Exception:
-            smart_sel = None
-
+        best = best_candidate(info["candidates"])
         smart_selectors.append({
             "original": selector,
-            "smart": smart_sel,
+            "smart": best["selector"] if best else None,
+            "score": best["score"] if best else None,
             "description": action["description"],
             "method": method,
             "value": value,
@@ -551,7 +648,8 @@ async def perform_observe_with_smart_selector(page, observe_results):
         # 2️⃣ Generate smart selector
         # ---------------------------------------------------
         try:
-            smart_selector = await generate_smart_selector(page, element)
+            best = await generate_smart_selector(page, element)
+            smart_selector = best["selector"] if best else None
         except Exception as e:
             logger.warning(f"⚠️ Smart selector generation failed: {e}")
             smart_selector = None
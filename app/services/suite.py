@@ -0,0 +1,168 @@
+import asyncio
+import glob
+import json
+import logging
+import os
+import time
+
+from app import Config
+from app.services.browser_pool import BrowserPool
+from app.services.main import DATA_FILE, MainService
+from app.services.recovery_cache import RecoveryCache
+from app.services.run_log import run_log_path
+from app.services.selector_cache import SelectorCache
+from app.testcase.compiled import TestCaseCache, dataset_path, load_dataset
+
+logger = logging.getLogger(Config.APP_NAME)
+
+
+class SuiteRunner:
+    """
+    Run every testcase of a directory concurrently on one shared browser.
+
+    Each testcase gets its own BrowserContext, result log and screenshot
+    folder under `<output_dir>/<run_id>/<testcase>/`; an aggregated
+    `summary.json` is written next to them.
+
+    A testcase with `@dataset <file>` runs once per row, in
+    `<testcase>__row<NNN>/`. Rows share the selector cache; when a cache or
+    `@use_session` is in play the first row runs alone so the others start
+    warm.
+    """
+
+    def __init__(self, directory: str, concurrency: int = None, mode: str = "ai",
+                 output_dir: str = "./storage/results", pattern: str = "*.txt"):
+        self.directory = directory
+        self.concurrency = max(1, concurrency or Config.SUITE_CONCURRENCY)
+        self.mode = mode
+        self.pattern = pattern
+        self.run_id = time.strftime("%Y%m%d_%H%M%S")
+        self.run_dir = os.path.join(output_dir, self.run_id)
+        # One cache instance for the whole suite so parallel runs never
+        # overwrite each other's entries on disk
+        self.selector_cache = SelectorCache() if mode == "cache" else None
+        self.recovery_cache = RecoveryCache() if Config.RECOVERY_CACHE else None
+        self.testcases = TestCaseCache()
+
+    def collect(self) -> list:
+        return sorted(glob.glob(os.path.join(self.directory, self.pattern)))
+
+    def expand(self, path: str) -> list:
+        """[(job name, testcase path, dataset row or None)] for one testcase file."""
+        name = os.path.splitext(os.path.basename(path))[0]
+        test_case = self.testcases.load(path, DATA_FILE)
+        rows_path = dataset_path(test_case, path)
+        if not rows_path:
+            return [(name, path, None)]
+
+        rows = load_dataset(rows_path)
+        logger.info(f"{name}: {len(rows)} dataset rows from {rows_path}")
+        return [(f"{name}__row{index:03d}", path, row) for index, row in enumerate(rows, 1)]
+
+    @staticmethod
+    def expand_error(path: str, error: Exception) -> dict:
+        name = os.path.splitext(os.path.basename(path))[0]
+        logger.error(f"Testcase {name} could not be loaded: {error}")
+        return {
+            "testcase": name,
+            "status": "error",
+            "error": str(error),
+            "duration_s": 0,
+            "file": path,
+        }
+
+    def needs_warmup(self, path: str) -> bool:
+        test_case = self.testcases.load(path, DATA_FILE)
+        return self.selector_cache is not None or "use_session" in test_case.directives
+
+    async def run(self) -> dict:
+        testcases = self.collect()
+        if not testcases:
+            raise FileNotFoundError(f"No testcases matching {self.pattern} in {self.directory}")
+
+        groups, broken = [], []
+        for path in testcases:
+            # A file that does not parse (or whose dataset is missing) fails
+            # on its own instead of aborting the suite
+            try:
+                groups.append((path, self.expand(path)))
+            except Exception as e:
+                broken.append(self.expand_error(path, e))
+        os.makedirs(self.run_dir, exist_ok=True)
+        logger.info(
+            f"Running {sum(len(jobs) for _, jobs in groups)} runs of {len(testcases)} testcases "
+            f"with concurrency={self.concurrency} (mode={self.mode}) -> {self.run_dir}"
+        )
+
+        started_at = time.time()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async with BrowserPool() as pool:
+            grouped = await asyncio.gather(
+                *(self.run_group(pool, semaphore, path, jobs) for path, jobs in groups)
+            )
+        results = broken + [result for group in grouped for result in group]
+
+        summary = {
+            "run_id": self.run_id,
+            "mode": self.mode,
+            "concurrency": self.concurrency,
+            "total": len(results),
+            "passed": sum(1 for r in results if r["status"] == "passed"),
+            "failed": sum(1 for r in results if r["status"] != "passed"),
+            "duration_s": round(time.time() - started_at, 2),
+            "results": results,
+        }
+
+        with open(os.path.join(self.run_dir, "summary.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
+
+        logger.info(
+            f"Suite finished: {summary['passed']}/{summary['total']} passed "
+            f"in {summary['duration_s']}s"
+        )
+        return summary
+
+    async def run_group(self, pool: BrowserPool, semaphore: asyncio.Semaphore,
+                        path: str, jobs: list) -> list:
+        if len(jobs) > 1 and self.needs_warmup(path):
+            first = await self.run_one(pool, semaphore, *jobs[0])
+            rest = await asyncio.gather(*(self.run_one(pool, semaphore, *job) for job in jobs[1:]))
+            return [first, *rest]
+        return list(await asyncio.gather(*(self.run_one(pool, semaphore, *job) for job in jobs)))
+
+    async def run_one(self, pool: BrowserPool, semaphore: asyncio.Semaphore,
+                      name: str, path: str, row: dict = None) -> dict:
+        test_dir = os.path.join(self.run_dir, name)
+
+        async with semaphore:
+            started_at = time.time()
+            stagehand = None
+            try:
+                stagehand = await pool.new_session()
+                service = MainService(
+                    stagehand=stagehand,
+                    run_id=f"{self.run_id}_{name}",
+                    run_log_file=run_log_path("run", test_dir),
+                    screenshot_dir=os.path.join(test_dir, "screenshots"),
+                    selector_cache=self.selector_cache,
+                    recovery_cache=self.recovery_cache,
+                )
+                result = await service.process(mode=self.mode, test_case=path, data_row=row)
+            except Exception as e:
+                logger.error(f"Testcase {name} crashed: {e}")
+                result = {
+                    "testcase": name,
+                    "status": "error",
+                    "error": str(e),
+                    "duration_s": round(time.time() - started_at, 2),
+                }
+            finally:
+                if stagehand is not None:
+                    await stagehand.close()
+
+        result["file"] = path
+        if row is not None:
+            result["row"] = row
+        logger.info(f"[{result['status'].upper()}] {name} ({result.get('duration_s')}s)")
+        return result
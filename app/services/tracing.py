@@ -0,0 +1,271 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+EXPORTERS = ("off", "otlp", "file")
+
+# OTLP span kind / status codes
+SPAN_KIND_INTERNAL = 1
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+def _attribute(key: str, value) -> dict:
+    if isinstance(value, bool):
+        encoded = {"boolValue": value}
+    elif isinstance(value, int):
+        encoded = {"intValue": str(value)}
+    elif isinstance(value, float):
+        encoded = {"doubleValue": value}
+    else:
+        encoded = {"stringValue": str(value)}
+    return {"key": key, "value": encoded}
+
+
+def parse_traceparent(header: str) -> tuple | None:
+    """W3C `traceparent` -> (trace_id, parent_span_id, sampled)."""
+    parts = (header or "").strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 1)
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+class NoopSpan:
+    """Returned for disabled or unsampled traces: every call is a no-op."""
+
+    recording = False
+    trace_id = None
+    traceparent = None
+
+    def child(self, name: str, **attributes):
+        return self
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def set_error(self, message: str):
+        pass
+
+    def end(self, error: str = None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        return False
+
+
+NOOP_SPAN = NoopSpan()
+
+
+class Span:
+    """One OTLP span; children share the trace id."""
+
+    recording = True
+
+    def __init__(self, tracer, name: str, trace_id: str, parent_id: str = None, attributes: dict = None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.attributes = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def child(self, name: str, **attributes) -> "Span":
+        return Span(self.tracer, name, self.trace_id, self.span_id, attributes)
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def set_error(self, message: str):
+        self.error = message
+
+    def end(self, error: str = None):
+        if self.end_ns is not None:
+            return
+        if error:
+            self.error = error
+        self.end_ns = time.time_ns()
+        self.tracer.export(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.end(f"{exc_type.__name__}: {exc_val}" if exc_type else None)
+        return False
+
+    def to_otlp(self) -> dict:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items() if v is not None],
+            "status": {"code": STATUS_ERROR, "message": self.error} if self.error else {"code": STATUS_OK},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class Tracer:
+    """
+    One trace per testcase run, exported in OTLP/JSON either to a collector
+    (OTLP/HTTP, e.g. http://localhost:4318/v1/traces) or appended to a file,
+    one ExportTraceServiceRequest per line.
+
+    Sampling is decided once per trace (trace id ratio, or the sampled flag
+    of an incoming `traceparent`); unsampled and disabled traces get the
+    shared NoopSpan, so instrumented code costs a method call per span.
+    Finished spans are batched and sent from a background thread.
+    """
+
+    def __init__(self, exporter: str = None, sample_rate: float = None, endpoint: str = None,
+                 file_path: str = None, service_name: str = None, batch_size: int = 256,
+                 interval_s: float = 2.0, queue_size: int = 4096):
+        self.exporter = (exporter or Config.TRACING).lower()
+        if self.exporter not in EXPORTERS:
+            raise ValueError(f"Unknown tracing exporter '{self.exporter}', expected one of {EXPORTERS}")
+        self.sample_rate = Config.TRACING_SAMPLE_RATE if sample_rate is None else sample_rate
+        self.endpoint = endpoint or Config.TRACING_ENDPOINT
+        self.file_path = file_path or Config.TRACING_FILE
+        self.service_name = service_name or Config.APP_NAME
+        self.batch_size = batch_size
+        self.interval_s = interval_s
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._worker = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter != "off" and self.sample_rate > 0
+
+    def start_trace(self, name: str, traceparent: str = None, **attributes):
+        """Root span of a testcase run (or a child of `traceparent`)."""
+        if not self.enabled:
+            return NOOP_SPAN
+
+        parent = parse_traceparent(traceparent or os.getenv("TRACEPARENT"))
+        if parent:
+            trace_id, parent_id, sampled = parent
+        else:
+            trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+            # Same rule as OpenTelemetry's TraceIdRatioBased sampler
+            sampled = int(trace_id[16:], 16) < self.sample_rate * (1 << 64)
+        if not sampled:
+            return NOOP_SPAN
+        return Span(self, name, trace_id, parent_id, attributes)
+
+    def export(self, span: Span):
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(span.to_otlp())
+        except queue.Full:
+            # Never block a step on the collector
+            self.dropped += 1
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                self._worker.start()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch = []
+            deadline = time.monotonic() + self.interval_s
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                self._send(batch)
+
+    def _payload(self, spans: list) -> dict:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", self.service_name)]},
+            "scopeSpans": [{"scope": {"name": "app.services.tracing"}, "spans": spans}],
+        }]}
+
+    def _send(self, spans: list):
+        payload = self._payload(spans)
+        try:
+            if self.exporter == "file":
+                os.makedirs(os.path.dirname(self.file_path) or ".", exist_ok=True)
+                with open(self.file_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            else:
+                import requests
+                response = requests.post(self.endpoint, json=payload, timeout=5)
+                response.raise_for_status()
+        except Exception as e:
+            self.dropped += len(spans)
+            logger.warning(f"Could not export {len(spans)} spans: {e}")
+
+    def shutdown(self):
+        """Export the pending spans. Blocking."""
+        with self._lock:
+            worker = self._worker
+            self._worker = None
+        if worker is None:
+            return
+        self._queue.put(None)
+        worker.join(timeout=10)
+        if self.dropped:
+            logger.warning(f"{self.dropped} spans dropped")
+
+
+_tracer = None
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer configured from Config.TRACING*."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+        if _tracer.enabled:
+            atexit.register(_tracer.shutdown)
+    return _tracer
+
+
+async def propagate(page, span):
+    """Send the span's `traceparent` with the browser's requests (TRACING_PROPAGATE)."""
+    if not Config.TRACING_PROPAGATE or not span.recording:
+        return
+    try:
+        await page.context.set_extra_http_headers({"traceparent": span.traceparent})
+    except Exception as e:
+        logger.debug(f"Could not set traceparent header: {e}")
@@ -0,0 +1,90 @@
+import asyncio
+import logging
+
+from app import Config
+
+logger = logging.getLogger(Config.APP_NAME)
+
+# Resolves as soon as the element behind `selector` no longer shows the
+# forbidden text. The selector is re-evaluated on every DOM mutation, so
+# ExtJS grid re-renders (same position, new node) keep being tracked;
+# only when nothing matches anymore the watcher reports "gone".
+WATCH_STATUS_JS = """
+([selector, forbidden, heartbeatMs]) => new Promise((resolve) => {
+    const resolveElement = () => {
+        if (selector.startsWith('xpath=')) {
+            return document.evaluate(
+                selector.slice(6), document, null,
+                XPathResult.FIRST_ORDERED_NODE_TYPE, null
+            ).singleNodeValue;
+        }
+        return document.querySelector(selector.replace(/^css=/, ''));
+    };
+
+    let observer = null;
+    let timer = null;
+    const finish = (result) => {
+        if (observer) observer.disconnect();
+        if (timer) clearTimeout(timer);
+        resolve(result);
+    };
+
+    const check = () => {
+        const el = resolveElement();
+        if (!el) {
+            finish({state: 'gone', text: null});
+            return true;
+        }
+        const text = (el.innerText || el.textContent || '').trim();
+        if (text && !text.includes(forbidden)) {
+            finish({state: 'changed', text: text});
+            return true;
+        }
+        return false;
+    };
+
+    if (check()) return;
+
+    observer = new MutationObserver(() => { check(); });
+    observer.observe(document.body, {
+        subtree: true, childList: true, characterData: true, attributes: true,
+    });
+
+    // Heartbeat so the caller can log progress and enforce its own timeout
+    timer = setTimeout(() => {
+        const el = resolveElement();
+        finish({
+            state: 'pending',
+            text: el ? (el.innerText || el.textContent || '').trim() : null,
+        });
+    }, heartbeatMs);
+})
+"""
+
+DEFAULT_HEARTBEAT_MS = 60 * 1000
+
+
+async def watch_status(page, selector: str, forbidden_value: str,
+                       timeout_ms: int,
+                       heartbeat_ms: int = DEFAULT_HEARTBEAT_MS) -> dict:
+    """
+    Block until the status element stops showing `forbidden_value`.
+
+    Returns {"state": "changed"|"gone"|"pending", "text": ...}; "pending"
+    means the heartbeat expired and the caller should re-arm the watcher.
+    """
+    heartbeat_ms = max(1000, min(heartbeat_ms, timeout_ms))
+    try:
+        return await asyncio.wait_for(
+            page.evaluate(
+                WATCH_STATUS_JS, [selector, forbidden_value, heartbeat_ms]
+            ),
+            # evaluate() has no timeout of its own; leave headroom for the JS one
+            timeout=heartbeat_ms / 1000 + 10,
+        )
+    except asyncio.TimeoutError:
+        return {"state": "pending", "text": None}
+    except Exception as e:
+        # Navigation / reload destroys the execution context
+        logger.debug(f"watch_status: watcher interrupted: {e}")
+        return {"state": "gone", "text": None}
@@ -0,0 +1,238 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+import re
+from dataclasses import asdict, dataclass, field, replace
+from typing import Dict, List, Optional
+
+from app import Config
+from app.testcase.step_compiler import CompiledStep, classify_step, compile_step
+from app.testcase.test_case import load_testcase
+
+logger = logging.getLogger(Config.APP_NAME)
+
+# Bump when the layout below or the step grammar changes
+IR_VERSION = 2
+
+# {{key}} slots of a step, resolved against the data file in one pass
+PLACEHOLDER_RE = re.compile(r"\{\{([^{}]+)\}\}")
+
+
+@dataclass
+class CompiledTestStep:
+    line_no: int
+    text: str           # as written in the testcase
+    instruction: str    # placeholders resolved
+    kind: str           # click | expect | wait | act, see step_compiler.classify_step
+    slots: List[str] = field(default_factory=list)
+    fast_path: Optional[CompiledStep] = None
+
+
+@dataclass
+class CompiledTestCase:
+    """A testcase + data file pair, ready to execute."""
+    name: str
+    config: Dict[str, float]
+    steps: List[CompiledTestStep]
+    directives: Dict[str, str] = field(default_factory=dict)
+    session_setup_steps: int = 0
+    data: Dict[str, object] = field(default_factory=dict)
+
+
+def resolve_placeholders(text: str, data_vars: dict) -> str:
+    """Replace every known {{key}}; unknown keys are left as written."""
+    def substitute(match):
+        key = match.group(1)
+        return str(data_vars[key]) if key in data_vars else match.group(0)
+    return PLACEHOLDER_RE.sub(substitute, text)
+
+
+def compile_testcase(path: str, data_path: str = None) -> CompiledTestCase:
+    data_vars = load_data(data_path)
+    test_case = load_testcase(path)
+
+    steps = []
+    for step in test_case.steps:
+        instruction = resolve_placeholders(step.text, data_vars)
+        steps.append(CompiledTestStep(
+            line_no=step.line_no,
+            text=step.text,
+            instruction=instruction,
+            kind=classify_step(instruction),
+            slots=PLACEHOLDER_RE.findall(step.text),
+            # Unresolved slots are left to the LLM
+            fast_path=None if PLACEHOLDER_RE.search(instruction) else compile_step(instruction),
+        ))
+
+    return CompiledTestCase(
+        name=test_case.name,
+        config=test_case.config,
+        steps=steps,
+        directives=test_case.directives,
+        session_setup_steps=test_case.session_setup_steps,
+        data=data_vars,
+    )
+
+
+def bind_row(test_case: CompiledTestCase, row: dict) -> CompiledTestCase:
+    """Copy of a compiled testcase with one dataset row layered over data.json."""
+    data_vars = {**test_case.data, **row}
+    missing = sorted({slot for step in test_case.steps for slot in step.slots} - set(data_vars))
+    if missing:
+        raise ValueError(f"Dataset row has no value for {', '.join(missing)}")
+    steps = []
+    for step in test_case.steps:
+        if not step.slots:
+            steps.append(step)
+            continue
+        instruction = resolve_placeholders(step.text, data_vars)
+        steps.append(replace(
+            step,
+            instruction=instruction,
+            kind=classify_step(instruction),
+            fast_path=None if PLACEHOLDER_RE.search(instruction) else compile_step(instruction),
+        ))
+    return replace(test_case, steps=steps, data=data_vars)
+
+
+def dataset_path(test_case: CompiledTestCase, testcase_path: str) -> str | None:
+    """`@dataset <file>`, relative to the testcase file unless it exists as given."""
+    name = test_case.directives.get("dataset")
+    if not name:
+        return None
+    if os.path.isabs(name) or os.path.exists(name):
+        return name
+    return os.path.join(os.path.dirname(testcase_path), name)
+
+
+def load_dataset(path: str) -> List[dict]:
+    """Rows of a `.csv` file (header = keys) or a JSON list of objects."""
+    if path.lower().endswith(".csv"):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            rows = json.load(f)
+        if isinstance(rows, dict):
+            rows = rows.get("rows", [])
+
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        raise ValueError(f"Dataset {path} must be a list of objects")
+    if not rows:
+        raise ValueError(f"Dataset {path} has no rows")
+    columns = set(rows[0])
+    for index, row in enumerate(rows, 1):
+        # csv.DictReader fills the columns of a short line with None
+        missing = sorted(columns - {key for key, value in row.items() if value is not None})
+        if missing:
+            raise ValueError(f"Dataset {path} row {index} is missing {', '.join(missing)}")
+    return rows
+
+
+def load_data(data_path: str = None) -> dict:
+    if not data_path or not os.path.exists(data_path):
+        return {}
+    with open(data_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _source_stamp(path: str) -> dict | None:
+    if not path or not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+
+def _file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def _from_dict(raw: dict) -> CompiledTestCase:
+    steps = []
+    for step in raw["steps"]:
+        fast_path = step.get("fast_path")
+        steps.append(CompiledTestStep(
+            **{**step, "fast_path": CompiledStep(**fast_path) if fast_path else None}
+        ))
+    return CompiledTestCase(**{**raw, "steps": steps})
+
+
+class TestCaseCache:
+    """
+    On-disk cache of compiled testcases under `TESTCASE_IR_DIR`.
+
+    An entry is reused while the version matches and both the testcase and
+    the data file keep their mtime/size; when only the mtime changed, the
+    content hash decides and the stamp is refreshed.
+    """
+
+    def __init__(self, directory: str = None):
+        self.directory = directory or Config.TESTCASE_IR_DIR
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, path: str, data_path: str = None) -> str:
+        key = f"{os.path.abspath(path)}|{os.path.abspath(data_path) if data_path else ''}"
+        return os.path.join(self.directory, f"{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}.json")
+
+    def load(self, path: str, data_path: str = None) -> CompiledTestCase:
+        cache_path = self.path_for(path, data_path)
+        sources = {"testcase": path, "data": data_path}
+        stamps = {role: _source_stamp(p) for role, p in sources.items()}
+
+        entry = self._read(cache_path)
+        if entry and self._is_fresh(entry, sources, stamps):
+            self.hits += 1
+            return _from_dict(entry["testcase"])
+
+        self.misses += 1
+        compiled = compile_testcase(path, data_path)
+        hashes = {role: _file_hash(p) for role, p in sources.items() if stamps[role]}
+        self._write(cache_path, {
+            "version": IR_VERSION,
+            "stamps": stamps,
+            "hashes": hashes,
+            "testcase": asdict(compiled),
+        })
+        return compiled
+
+    def _is_fresh(self, entry: dict, sources: dict, stamps: dict) -> bool:
+        if entry.get("version") != IR_VERSION:
+            return False
+        if entry.get("stamps") == stamps:
+            return True
+
+        # Touched but maybe unchanged (checkout, copy): compare contents
+        hashes = entry.get("hashes") or {}
+        for role, path in sources.items():
+            if bool(stamps[role]) != (role in hashes):
+                return False
+            if stamps[role] and _file_hash(path) != hashes[role]:
+                return False
+        entry["stamps"] = stamps
+        self._write(self.path_for(sources["testcase"], sources["data"]), entry)
+        return True
+
+    @staticmethod
+    def _read(cache_path: str) -> dict | None:
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.debug(f"Compiled testcase unreadable, recompiling: {e}")
+            return None
+
+    def _write(self, cache_path: str, entry: dict):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write compiled testcase: {e}")
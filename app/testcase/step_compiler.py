@@ -0,0 +1,90 @@
+import re
+from dataclasses import dataclass
+from typing import Optional
+
+# Step kinds used to pick the Stagehand call when a step is not compiled
+KIND_CLICK = "click"
+KIND_EXPECT = "expect"
+KIND_WAIT = "wait"
+KIND_ACT = "act"
+
+_CLICK_VERBS = ("click", "press")
+
+
+def classify_step(text: str) -> str:
+    """Action type of any step, from its leading verb."""
+    verb = text.strip().split(maxsplit=1)[0].lower() if text.strip() else ""
+    if verb in _CLICK_VERBS:
+        return KIND_CLICK
+    if verb == "expect":
+        return KIND_EXPECT
+    if verb == "wait":
+        return KIND_WAIT
+    return KIND_ACT
+
+
+@dataclass(frozen=True)
+class CompiledStep:
+    """
+    A step that follows the prompt standard (see README) and can be run
+    with plain Playwright locators.
+
+    action: type | clear | click | open | ensure | select | expect | wait | press
+    role:   button / link / checkbox / radio / menu / section, when the step names it
+    """
+    action: str
+    target: str
+    value: Optional[str] = None
+    role: Optional[str] = None
+    negate: bool = False
+
+
+_Q = r'"([^"]+)"'
+_END = r"\s*\.?\s*$"
+
+
+def _rule(pattern: str, build):
+    return re.compile(pattern, re.IGNORECASE), build
+
+
+def _lower(value: Optional[str]) -> Optional[str]:
+    return value.lower() if value else None
+
+
+# (pattern, builder) pairs, first match wins
+_GRAMMAR = (
+    _rule(rf'^type\s+"([^"]*)"\s+into\s+(?:the\s+)?{_Q}(?:\s+field)?{_END}',
+          lambda g: CompiledStep("type", target=g[1], value=g[0])),
+    _rule(rf"^clear\s+(?:the\s+)?{_Q}(?:\s+field)?{_END}",
+          lambda g: CompiledStep("clear", target=g[0])),
+    _rule(rf"^click\s+(button|link)\s+{_Q}{_END}",
+          lambda g: CompiledStep("click", target=g[1], role=_lower(g[0]))),
+    _rule(rf"^click\s+(?:on\s+)?the\s+{_Q}\s+(button|link){_END}",
+          lambda g: CompiledStep("click", target=g[0], role=_lower(g[1]))),
+    _rule(rf"^open\s+(section|menu|panel)\s+{_Q}{_END}",
+          lambda g: CompiledStep("open", target=g[1], role=_lower(g[0]))),
+    _rule(rf"^open\s+(?:the\s+)?{_Q}(?:\s+(menu|section|panel))?{_END}",
+          lambda g: CompiledStep("open", target=g[0], role=_lower(g[1]))),
+    _rule(rf"^ensure\s+(?:(checkbox|radio)\s+(?:option\s+)?)?{_Q}\s+is\s+(not\s+)?selected{_END}",
+          lambda g: CompiledStep("ensure", target=g[1], role=_lower(g[0]), negate=bool(g[2]))),
+    _rule(rf"^select\s+{_Q}\s+from\s+(?:the\s+)?{_Q}(?:\s+dropdown)?{_END}",
+          lambda g: CompiledStep("select", target=g[1], value=g[0])),
+    _rule(rf"^expect\s+{_Q}\s+(?:is|to\s+be)\s+(not\s+)?visible{_END}",
+          lambda g: CompiledStep("expect", target=g[0], negate=bool(g[1]))),
+    _rule(rf"^expect\s+{_Q}\s+exists{_END}",
+          lambda g: CompiledStep("expect", target=g[0])),
+    _rule(rf"^wait\s+until\s+(?:text\s+)?{_Q}\s+is\s+(not\s+)?visible{_END}",
+          lambda g: CompiledStep("wait", target=g[0], negate=bool(g[1]))),
+    _rule(rf"^press\s+([A-Za-z0-9+]+){_END}",
+          lambda g: CompiledStep("press", target=g[0])),
+)
+
+
+def compile_step(text: str) -> Optional[CompiledStep]:
+    """Parse a grammar-conforming step; None means "send it to Stagehand"."""
+    text = (text or "").strip()
+    for pattern, build in _GRAMMAR:
+        match = pattern.match(text)
+        if match:
+            return build(match.groups())
+    return None
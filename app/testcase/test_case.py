@@ -1,6 +1,9 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Dict, List
 
+# Directives whose value is kept as text instead of being parsed as a number
+TEXT_DIRECTIVES = ("use_session", "dataset", "scope")
+
 
 @dataclass
 class Step:
@@ -11,12 +14,17 @@ class Step:
 @dataclass
 class TestCase:
     name: str
-    config: Dict[str, int]
+    config: Dict[str, float]
     steps: List[Step]
+    directives: Dict[str, str] = field(default_factory=dict)
+    # Number of steps before the @session_ready marker (the login prefix)
+    session_setup_steps: int = 0
 
 def load_testcase(path: str) -> TestCase:
     name = None
     config = {}
+    directives = {}
+    session_setup_steps = 0
     steps = []
 
     with open(path, "r", encoding="utf-8") as f:
@@ -39,13 +47,21 @@ def load_testcase(path: str) -> TestCase:
                 name = parts[1]
                 continue
 
+            # End of the login prefix restored by @use_session
+            if line == "@session_ready":
+                session_setup_steps = len(steps)
+                continue
+
             # Config
             if line.startswith("@"):
                 key_value = line[1:].split(maxsplit=1)
                 if len(key_value) != 2:
                     raise ValueError(f"Invalid config at line {line_no}")
                 key, value = key_value
-                config[key] = int(value)
+                if key in TEXT_DIRECTIVES:
+                    directives[key] = value
+                else:
+                    config[key] = float(value)
                 continue
 
             # Step
@@ -54,4 +70,13 @@ def load_testcase(path: str) -> TestCase:
     if not name:
         raise ValueError("Missing @testcase name")
 
-    return TestCase(name=name, config=config, steps=steps)
+    if "use_session" in directives and not session_setup_steps:
+        raise ValueError("@use_session requires a @session_ready marker after the login steps")
+
+    return TestCase(
+        name=name,
+        config=config,
+        steps=steps,
+        directives=directives,
+        session_setup_steps=session_setup_steps,
+    )
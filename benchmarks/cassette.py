@@ -0,0 +1,116 @@
+"""
+Record / replay of Stagehand's model calls for the end-to-end benchmark.
+
+Every act/observe/extract inference goes through
+`stagehand.llm.client.LLMClient.create_response`. `Cassette.install()`
+swaps that method:
+
+    record  call the real model (needs GEMINI_API_KEY), store the response
+    replay  answer from the cassette file, never touch the network; a
+            request that was not recorded raises CassetteMiss
+    auto    replay what is recorded, record the rest
+
+Requests are keyed by model + messages + call parameters, with inline
+screenshots reduced to a placeholder so vision calls stay replayable.
+Replayed calls sleep `latency_ms` (or the recorded inference time when
+latency_ms is None) and still feed Stagehand's token metrics.
+
+agent.execute() talks to the computer-use API directly and is not covered;
+benchmark flows are expected to pass without the recovery agent.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import time
+
+from app.services.llm_cache import scrub_images
+
+MODES = ("record", "replay", "auto")
+
+
+class CassetteMiss(KeyError):
+    pass
+
+
+def request_key(model: str, messages: list, params: dict) -> str:
+    payload = {"model": model, "messages": scrub_images(messages), "params": scrub_images(params)}
+    return hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str = "replay", latency_ms: float | None = None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode '{mode}', expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.latency_ms = latency_ms
+        self.entries = {}
+        self.hits = 0
+        self.recorded = 0
+        self._original = None
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+        elif mode == "replay":
+            raise FileNotFoundError(f"No cassette at {path}, record one first (--record)")
+
+    def install(self):
+        from stagehand.llm.client import LLMClient
+
+        cassette = self
+        self._original = original = LLMClient.create_response
+
+        async def create_response(client, *, messages, model=None, function_name=None, **kwargs):
+            completion_model = model or client.default_model
+            key = request_key(completion_model, messages, kwargs)
+            if cassette.mode == "record" or (cassette.mode == "auto" and key not in cassette.entries):
+                started = time.perf_counter()
+                response = await original(client, messages=messages, model=model,
+                                          function_name=function_name, **kwargs)
+                cassette.entries[key] = {
+                    "function": function_name,
+                    "inference_ms": round((time.perf_counter() - started) * 1000),
+                    "response": response.model_dump(),
+                }
+                cassette.recorded += 1
+                return response
+            return await cassette.replay(client, key, function_name)
+
+        LLMClient.create_response = create_response
+        return self
+
+    async def replay(self, client, key: str, function_name):
+        import litellm
+
+        entry = self.entries.get(key)
+        if entry is None:
+            raise CassetteMiss(f"Request {key} ({function_name}) is not in {self.path}; re-record the cassette")
+        latency_ms = entry["inference_ms"] if self.latency_ms is None else self.latency_ms
+        await asyncio.sleep(latency_ms / 1000)
+
+        response = litellm.ModelResponse(**entry["response"])
+        if client.metrics_callback:
+            client.metrics_callback(response, latency_ms, function_name)
+        self.hits += 1
+        return response
+
+    def uninstall(self):
+        if self._original is not None:
+            from stagehand.llm.client import LLMClient
+            LLMClient.create_response = self._original
+            self._original = None
+
+    def save(self):
+        if not self.recorded:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1, ensure_ascii=False, default=str)
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.uninstall()
+        self.save()
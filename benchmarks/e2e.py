@@ -0,0 +1,203 @@
+"""
+End-to-end benchmark of MainService.process against a local fixture page.
+
+    python benchmarks/e2e.py --record                 # first, with GEMINI_API_KEY: record the model calls
+    python benchmarks/e2e.py --runs 5                 # replay the recorded cassette, no key needed
+    python benchmarks/e2e.py --mode cache --latency-ms 800 --output result.json
+    python benchmarks/e2e.py --baseline benchmarks/baseline.json   # exit 1 on regression
+
+A local HTTP server serves benchmarks/fixtures/app.html (ExtJS-like login
+and job wizard), Stagehand's model calls are answered from a cassette
+(benchmarks/cassette.py) and the testcase runs on a shared headless browser,
+one fresh context per run. Reported per run: wall time, time per phase (from
+the step metrics), LLM calls/tokens and Python heap peak (tracemalloc).
+"""
+import argparse
+import asyncio
+import functools
+import json
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.cassette import Cassette  # noqa: E402
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+DEFAULT_TESTCASE = os.path.join(FIXTURES, "job_wizard.txt")
+DEFAULT_CASSETTE = os.path.join(HERE, "cassettes", "job_wizard.json")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_fixtures() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=FIXTURES))
+    threading.Thread(target=server.serve_forever, name="fixture-server", daemon=True).start()
+    return server
+
+
+def isolate_storage(directory: str):
+    """Point every cache/log the runner writes at a scratch directory."""
+    from app import Config
+
+    Config.RUN_LOG_DIR = os.path.join(directory, "runs")
+    Config.TESTCASE_IR_DIR = os.path.join(directory, "compiled")
+    Config.SELECTOR_CACHE_FILE = os.path.join(directory, "selector_cache.json")
+    Config.RECOVERY_CACHE_FILE = os.path.join(directory, "recovery_cache.json")
+    Config.SESSION_STATE_DIR = os.path.join(directory, "sessions")
+    Config.CHECKPOINT_DIR = os.path.join(directory, "checkpoints")
+    Config.TRACING_FILE = os.path.join(directory, "traces", "spans.jsonl")
+    Config.LLM_CACHE_DIR = os.path.join(directory, "llm_cache")
+    # Every run has to reach the (recorded) model, or runs 2..N measure the cache
+    Config.LLM_CACHE = False
+    Config.GEMINI_API_KEY = Config.GEMINI_API_KEY or "offline"
+
+
+async def run_benchmark(args, url: str, scratch: str) -> list:
+    from app.services.browser_pool import BrowserPool
+    from app.services.main import MainService
+
+    results = []
+    async with BrowserPool(headless=not args.headed) as pool:
+        for n in range(1, args.runs + 1):
+            stagehand = await pool.new_session()
+            service = MainService(
+                stagehand=stagehand,
+                run_id=f"bench_{n:02d}",
+                screenshot_dir=os.path.join(scratch, "screenshots", f"{n:02d}"),
+            )
+            if args.memory:
+                tracemalloc.start()
+            started = time.perf_counter()
+            try:
+                summary = await service.process(mode=args.mode, test_case=args.testcase, data_row={"url": url})
+            finally:
+                wall_s = time.perf_counter() - started
+                heap_peak_mb = tracemalloc.get_traced_memory()[1] / 2**20 if args.memory else None
+                tracemalloc.stop()
+                await stagehand.close()
+
+            metrics = summary["metrics"]
+            results.append({
+                "run": n,
+                "status": summary["status"],
+                "failed_step": summary["failed_step"],
+                "wall_s": round(wall_s, 3),
+                "phases_ms": metrics["phases"],
+                "llm_calls": metrics["llm_calls"],
+                "tokens": metrics["prompt_tokens"] + metrics["completion_tokens"],
+                "heap_peak_mb": round(heap_peak_mb, 1) if heap_peak_mb is not None else None,
+            })
+            print(f"run {n}: {summary['status']} in {wall_s:.2f}s, {metrics['llm_calls']} LLM calls", flush=True)
+    return results
+
+
+def aggregate(results: list) -> dict:
+    phases = {}
+    for result in results:
+        for phase, ms in result["phases_ms"].items():
+            phases.setdefault(phase, []).append(ms)
+    heap = [r["heap_peak_mb"] for r in results if r["heap_peak_mb"] is not None]
+    return {
+        "runs": len(results),
+        "passed": sum(r["status"] == "passed" for r in results),
+        "wall_s": {
+            "median": round(statistics.median(r["wall_s"] for r in results), 3),
+            "min": min(r["wall_s"] for r in results),
+            "max": max(r["wall_s"] for r in results),
+        },
+        "phases_ms": {phase: round(statistics.median(values), 1) for phase, values in
+                      sorted(phases.items(), key=lambda kv: -sum(kv[1]))},
+        "llm_calls": statistics.median(r["llm_calls"] for r in results),
+        "tokens": statistics.median(r["tokens"] for r in results),
+        "heap_peak_mb": max(heap) if heap else None,
+        # ru_maxrss is KiB on Linux
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """Regressions of the median wall time / LLM calls against a baseline report."""
+    regressions = []
+    for name, current, previous in (
+        ("wall_s.median", report["wall_s"]["median"], baseline["wall_s"]["median"]),
+        ("llm_calls", report["llm_calls"], baseline["llm_calls"]),
+    ):
+        if previous and current > previous * (1 + tolerance):
+            regressions.append(f"{name}: {current} > {previous} (+{tolerance:.0%})")
+    return regressions
+
+
+def print_report(report: dict):
+    wall = report["wall_s"]
+    print(f"\n{report['passed']}/{report['runs']} passed, wall median {wall['median']}s "
+          f"(min {wall['min']}s, max {wall['max']}s)")
+    print(f"LLM calls {report['llm_calls']}, tokens {report['tokens']}, "
+          f"heap peak {report['heap_peak_mb']} MB, max RSS {report['max_rss_mb']} MB")
+    print(f"\n{'Phase':<12}{'median ms':>12}")
+    for phase, ms in report["phases_ms"].items():
+        print(f"{phase:<12}{ms:>12.0f}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--testcase", default=DEFAULT_TESTCASE)
+    parser.add_argument("--cassette", default=DEFAULT_CASSETTE)
+    parser.add_argument("--record", action="store_true", help="Call the real model and (re)record the cassette")
+    parser.add_argument("--record-missing", action="store_true", help="Replay, record only requests not in the cassette")
+    parser.add_argument("--latency-ms", type=float, default=None, help="Simulated model latency (default: as recorded)")
+    parser.add_argument("--server-latency-ms", type=int, default=250, help="Simulated product request latency")
+    parser.add_argument("--mode", default="ai", help="ai or cache")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--memory", action="store_true", help="Trace the Python heap peak (slows the run down)")
+    parser.add_argument("--headed", action="store_true")
+    parser.add_argument("--output", help="Write the report as JSON")
+    parser.add_argument("--baseline", help="JSON report to compare with; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="qa-bench-")
+    isolate_storage(scratch)
+
+    cassette_mode = "record" if args.record else "auto" if args.record_missing else "replay"
+    server = serve_fixtures()
+    url = f"http://127.0.0.1:{server.server_port}/app.html?latency={args.server_latency_ms}"
+    try:
+        with Cassette(args.cassette, mode=cassette_mode, latency_ms=args.latency_ms) as cassette:
+            results = asyncio.run(run_benchmark(args, url, scratch))
+    finally:
+        server.shutdown()
+    if cassette.recorded:
+        print(f"Recorded {cassette.recorded} model calls to {args.cassette}")
+
+    report = {"config": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+              **aggregate(results), "results": results}
+    print_report(report)
+    print(f"Run logs and screenshots: {scratch}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
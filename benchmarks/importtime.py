@@ -0,0 +1,76 @@
+"""
+Import-time budget for the CLI entry points.
+
+    python benchmarks/importtime.py            # check budgets, exit 1 on regression
+    python benchmarks/importtime.py --report   # print timings only
+
+Each module is imported in a fresh interpreter with `python -X importtime`;
+the median cumulative time of `--runs` runs is compared with its budget.
+Light entry points must also never pull in the browser or REST stack.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# module -> budget in ms (cumulative import time, median)
+BUDGETS_MS = {
+    "app": 150,
+    "app.cli": 200,
+    "app.testcase.compiled": 200,
+    "app.services.main": 400,
+}
+
+# Modules that must stay out of the light entry points
+HEAVY_MODULES = ("stagehand", "playwright", "flask_restx", "flask", "redis")
+LIGHT_ENTRY_POINTS = ("app", "app.cli", "app.testcase.compiled")
+
+
+def import_profile(module: str) -> dict:
+    """{imported module: cumulative us} for one cold import of `module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        profile[name] = int(cumulative)
+    return profile
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--report", action="store_true", help="Print timings, never fail")
+    args = parser.parse_args()
+
+    failures = []
+    for module, budget_ms in BUDGETS_MS.items():
+        profiles = [import_profile(module) for _ in range(args.runs)]
+        median_ms = statistics.median(p.get(module, 0) for p in profiles) / 1000
+
+        status = "ok" if median_ms <= budget_ms else "OVER BUDGET"
+        print(f"{module:<28} {median_ms:8.1f} ms  (budget {budget_ms} ms)  {status}")
+        if median_ms > budget_ms:
+            failures.append(f"{module} took {median_ms:.1f} ms > {budget_ms} ms")
+
+        if module in LIGHT_ENTRY_POINTS:
+            leaked = sorted(name for name in profiles[0] if name in HEAVY_MODULES)
+            if leaked:
+                print(f"{'':<28} imports heavy modules: {', '.join(leaked)}")
+                failures.append(f"{module} imports {', '.join(leaked)}")
+
+    if failures and not args.report:
+        print("\n".join(["", "Import-time regression:"] + [f"  - {f}" for f in failures]))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
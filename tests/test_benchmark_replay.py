@@ -0,0 +1,59 @@
+import asyncio
+import os
+
+import pytest
+
+from benchmarks.cassette import Cassette, CassetteMiss
+
+LLMClient = pytest.importorskip("stagehand.llm.client").LLMClient
+
+
+def _messages(screenshot: str) -> list:
+    return [{"role": "user", "content": [
+        {"type": "text", "text": "Find the Log In button"},
+        {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{screenshot}"}},
+    ]}]
+
+
+def _client(metrics: list):
+    client = LLMClient.__new__(LLMClient)
+    client.default_model = "gemini/test"
+    client.metrics_callback = lambda response, ms, name: metrics.append((name, ms))
+    return client
+
+
+def test_cassette_records_and_replays(tmp_path, monkeypatch):
+    import litellm
+
+    calls = []
+
+    async def model(client, *, messages, model=None, function_name=None, **kwargs):
+        calls.append(function_name)
+        return litellm.ModelResponse(
+            choices=[{"message": {"role": "assistant", "content": '{"elements": [{"elementId": "1-2"}]}'}}],
+            usage={"prompt_tokens": 120, "completion_tokens": 8, "total_tokens": 128},
+        )
+
+    monkeypatch.setattr(LLMClient, "create_response", model)
+    path = str(tmp_path / "cassette.json")
+
+    async def ask(client, screenshot: str):
+        return await client.create_response(messages=_messages(screenshot), function_name="OBSERVE")
+
+    with Cassette(path, mode="record"):
+        recorded = asyncio.run(ask(_client([]), "AAAA"))
+    assert calls == ["OBSERVE"] and os.path.exists(path)
+
+    metrics = []
+    with Cassette(path, mode="replay", latency_ms=0) as cassette:
+        # A new capture of the same page is the same request
+        replayed = asyncio.run(ask(_client(metrics), "BBBB"))
+        with pytest.raises(CassetteMiss):
+            asyncio.run(_client([]).create_response(messages=[{"role": "user", "content": "other"}],
+                                                   function_name="ACT"))
+
+    assert calls == ["OBSERVE"]
+    assert cassette.hits == 1
+    assert metrics == [("OBSERVE", 0)]
+    assert replayed.choices[0].message.content == recorded.choices[0].message.content
+    assert LLMClient.create_response is model
@@ -0,0 +1,121 @@
+import asyncio
+
+import pytest
+
+from app.services.checkpoints import (
+    RESOLVED_LIVE, CheckpointStore, first_changed_step, parse_resume_from, resume_point,
+)
+from app.testcase.compiled import CompiledTestStep
+from app.testcase.step_compiler import classify_step
+
+TESTCASE = [
+    'Type "admin" into "Username"',
+    'Click button "Log In"',
+    'Expect "Data Protection" to be visible',
+    "Click create a new job.",
+    'Click button "Next"',
+]
+
+
+def steps_of(lines: list) -> list:
+    return [
+        CompiledTestStep(line_no=n, text=line, instruction=line, kind=classify_step(line))
+        for n, line in enumerate(lines, 1)
+    ]
+
+
+class FakeContext:
+    async def storage_state(self):
+        return {"cookies": [], "origins": []}
+
+
+class FakePage:
+    url = "https://vbo/#home"
+    context = FakeContext()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return CheckpointStore(str(tmp_path / "checkpoints"))
+
+
+def run(store, testcase_path: str, steps: list, completed: int, failed: int = None, data_row=None):
+    """A checkpointed run that completed the first `completed` steps."""
+    checkpoint = asyncio.run(store.begin(testcase_path, data_row, "run_1", FakePage()))
+    for step_no, step in enumerate(steps[:completed], 1):
+        checkpoint.record(step_no, step, FakePage.url, {"kind": RESOLVED_LIVE})
+    if failed:
+        checkpoint.fail(failed)
+    return store.load(testcase_path, data_row)
+
+
+@pytest.mark.parametrize("resume_from, expected", [
+    ("last-failure", 3),   # step 4 failed
+    ("changed", 3),
+    ("2", 1),
+    (9, 3),                # never past the last completed step
+])
+def test_resume_point_of_an_unchanged_testcase(store, resume_from, expected):
+    steps = steps_of(TESTCASE)
+    checkpoint = run(store, "job.txt", steps, completed=3, failed=4)
+    assert resume_point(checkpoint, steps, resume_from) == expected
+
+
+def test_edited_step_caps_the_resume_point(store):
+    checkpoint = run(store, "job.txt", steps_of(TESTCASE), completed=5)
+    edited = steps_of(TESTCASE[:2] + ['Expect "Backups" to be visible'] + TESTCASE[3:])
+
+    assert first_changed_step(checkpoint, edited) == 2
+    assert resume_point(checkpoint, edited, "5") == 2
+    assert resume_point(checkpoint, edited, "changed") == 2
+    assert resume_point(checkpoint, edited, "1") == 0
+
+
+def test_inserted_step_shifts_everything_after_it(store):
+    checkpoint = run(store, "job.txt", steps_of(TESTCASE), completed=5)
+    inserted = steps_of(TESTCASE[:1] + ['Type "secret" into "Password"'] + TESTCASE[1:])
+    assert first_changed_step(checkpoint, inserted) == 1
+
+
+def test_stale_checkpoint_of_a_longer_testcase(store):
+    checkpoint = run(store, "job.txt", steps_of(TESTCASE), completed=5, failed=None)
+    shortened = steps_of(TESTCASE[:3])
+    assert first_changed_step(checkpoint, shortened) == 3
+    # The checkpointed run passed: nothing failed to resume at
+    assert resume_point(checkpoint, shortened, "last-failure") == 3
+
+
+def test_checkpoint_failed_past_the_end_of_an_edited_testcase(store):
+    checkpoint = run(store, "job.txt", steps_of(TESTCASE), completed=4, failed=5)
+    assert resume_point(checkpoint, steps_of(TESTCASE[:2]), "last-failure") == 2
+
+
+def test_checkpoints_are_kept_per_dataset_row(store):
+    steps = steps_of(TESTCASE)
+    run(store, "job.txt", steps, completed=3, failed=4, data_row={"user": "alice"})
+
+    assert store.load("job.txt", {"user": "bob"}) is None
+    assert store.load("job.txt") is None
+    assert store.load("job.txt", {"user": "alice"}).failed_step == 4
+
+
+def test_missing_or_unreadable_checkpoint_loads_as_none(store):
+    assert store.load("job.txt") is None
+    run(store, "job.txt", steps_of(TESTCASE), completed=1)
+    with open(store.path_for("job.txt"), "w", encoding="utf-8") as f:
+        f.write('{"steps": [')
+    assert store.load("job.txt") is None
+
+
+def test_new_run_replaces_the_steps_after_it(store):
+    steps = steps_of(TESTCASE)
+    run(store, "job.txt", steps, completed=5)
+    checkpoint = run(store, "job.txt", steps, completed=2, failed=3)
+    assert [s["step"] for s in checkpoint.steps] == [1, 2]
+    assert checkpoint.start["url"] == FakePage.url
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "last", ""])
+def test_invalid_resume_from(value):
+    with pytest.raises(ValueError):
+        parse_resume_from(value)
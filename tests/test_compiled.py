@@ -0,0 +1,98 @@
+import json
+import os
+
+import pytest
+
+from app.testcase import compiled
+
+TESTCASE = """@testcase login
+@max_wait 2
+
+Type "{{user}}" into "Username"
+Click button "Log In"
+"""
+
+
+def write(path, text: str, mtime_ns: int = None):
+    path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+@pytest.fixture
+def sources(tmp_path):
+    testcase = write(tmp_path / "login.txt", TESTCASE, mtime_ns=1_000_000_000)
+    data = write(tmp_path / "data.json", json.dumps({"user": "admin"}), mtime_ns=1_000_000_000)
+    return testcase, data
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return compiled.TestCaseCache(str(tmp_path / "ir"))
+
+
+def test_unchanged_sources_are_served_from_the_cache(cache, sources):
+    first = cache.load(*sources)
+    second = compiled.TestCaseCache(cache.directory).load(*sources)
+    assert cache.misses == 1
+    assert second == first
+    assert second.steps[0].instruction == 'Type "admin" into "Username"'
+    assert second.steps[1].fast_path == compiled.CompiledStep("click", target="Log In", role="button")
+
+
+def test_same_size_edit_is_recompiled(cache, sources, tmp_path):
+    testcase, data = sources
+    cache.load(testcase, data)
+    # Same length, new content, and a new mtime
+    write(tmp_path / "login.txt", TESTCASE.replace("Log In", "Log Up"), mtime_ns=2_000_000_000)
+    assert os.path.getsize(testcase) == len(TESTCASE)
+
+    reloaded = cache.load(testcase, data)
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert reloaded.steps[1].fast_path.target == "Log Up"
+
+
+def test_touched_but_unchanged_source_is_a_hit(cache, sources, tmp_path):
+    testcase, data = sources
+    cache.load(testcase, data)
+    write(tmp_path / "data.json", json.dumps({"user": "admin"}), mtime_ns=3_000_000_000)
+
+    cache.load(testcase, data)
+    cache.load(testcase, data)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_ir_version_change_invalidates(cache, sources, monkeypatch):
+    cache.load(*sources)
+    monkeypatch.setattr(compiled, "IR_VERSION", compiled.IR_VERSION + 1)
+    cache.load(*sources)
+    assert cache.misses == 2
+
+
+def test_bind_row_rejects_a_row_without_a_used_slot(cache, tmp_path):
+    testcase = write(tmp_path / "rows.txt", TESTCASE.replace("Click button", 'Type "{{password}}" into'))
+    test_case = cache.load(testcase)
+
+    bound = compiled.bind_row(test_case, {"user": "a", "password": "b"})
+    assert bound.steps[0].instruction == 'Type "a" into "Username"'
+    with pytest.raises(ValueError, match="password"):
+        compiled.bind_row(test_case, {"user": "a"})
+
+
+@pytest.mark.parametrize("name, content", [
+    ("rows.csv", "user,password\nalice,secret\nbob\n"),
+    ("rows.json", json.dumps([{"user": "alice", "password": "secret"}, {"user": "bob"}])),
+])
+def test_load_dataset_rejects_missing_columns(tmp_path, name, content):
+    path = write(tmp_path / name, content)
+    with pytest.raises(ValueError, match="row 2 is missing password"):
+        compiled.load_dataset(path)
+
+
+def test_load_dataset_reads_csv_rows(tmp_path):
+    path = write(tmp_path / "rows.csv", "user,password\nalice,secret\nbob,\n")
+    assert compiled.load_dataset(path) == [
+        {"user": "alice", "password": "secret"},
+        {"user": "bob", "password": ""},
+    ]
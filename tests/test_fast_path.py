@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from app.services import fast_path
+from app.services.fast_path import FastPathMiss, execute_compiled
+from app.testcase.step_compiler import CompiledStep
+
+
+class TextLocator:
+    def __init__(self, page, text: str, visible_only: bool = False):
+        self.page = page
+        self.text = text
+        self.visible_only = visible_only
+
+    def locator(self, selector: str):
+        assert selector == "visible=true"
+        return TextLocator(self.page, self.text, visible_only=True)
+
+    async def count(self):
+        visible, hidden = self.page.next_counts(self.text)
+        return visible if self.visible_only else visible + hidden
+
+
+class FakePage:
+    def __init__(self, *counts):
+        # (visible, hidden) matches per poll; the last one repeats
+        self.counts = list(counts)
+        self.polls = 0
+
+    def get_by_text(self, text, exact=False):
+        return TextLocator(self, text)
+
+    def next_counts(self, text):
+        self.polls += 1
+        return self.counts.pop(0) if len(self.counts) > 1 else self.counts[0]
+
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(fast_path, "TEXT_POLL_S", 0.001)
+
+
+def run(page, step, timeout_ms=50):
+    return asyncio.run(execute_compiled(page, step, timeout_ms=timeout_ms))
+
+
+def test_expect_passes_on_one_visible_match_next_to_hidden_copies():
+    page = FakePage((0, 2), (1, 2))
+    run(page, CompiledStep("expect", target="Sources"))
+    assert page.polls == 2
+
+
+def test_expect_with_only_hidden_matches_misses():
+    with pytest.raises(FastPathMiss):
+        run(FakePage((0, 3)), CompiledStep("expect", target="Sources"))
+
+
+def test_expect_with_several_visible_matches_is_ambiguous():
+    page = FakePage((2, 0))
+    with pytest.raises(FastPathMiss, match="2 visible matches"):
+        run(page, CompiledStep("expect", target="Next"), timeout_ms=10_000)
+    assert page.polls == 1
+
+
+def test_negated_wait_ignores_hidden_copies():
+    page = FakePage((1, 1), (1, 1), (0, 1))
+    run(page, CompiledStep("wait", target="Running", negate=True))
+    assert page.polls == 3
+
+
+def test_negated_expect_fails_while_a_copy_is_visible():
+    with pytest.raises(FastPathMiss, match="still visible"):
+        run(FakePage((1, 1)), CompiledStep("expect", target="Running", negate=True))
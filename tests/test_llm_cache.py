@@ -0,0 +1,41 @@
+import asyncio
+import types
+
+import pytest
+
+from app.services.llm_cache import LLMResponseCache, cache_hits, install_response_cache
+
+litellm = pytest.importorskip("litellm")
+
+
+class FakeClient:
+    default_model = "gemini/test"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def create_response(self, *, messages, model=None, function_name=None, **kwargs):
+        self.calls += 1
+        return litellm.ModelResponse(
+            choices=[{"message": {"role": "assistant", "content": '{"elements": [{"elementId": "1-2"}]}'}}],
+            usage={"prompt_tokens": 900, "completion_tokens": 40, "total_tokens": 940},
+        )
+
+
+def test_hit_is_served_without_usage(tmp_path):
+    client = FakeClient()
+    stagehand = types.SimpleNamespace(llm=client)
+    install_response_cache(stagehand, LLMResponseCache(str(tmp_path)))
+    messages = [{"role": "user", "content": "Find the Log In button"}]
+
+    async def observe():
+        return await stagehand.llm.create_response(messages=messages, function_name="OBSERVE")
+
+    miss = asyncio.run(observe())
+    hit = asyncio.run(observe())
+
+    assert client.calls == 1
+    assert cache_hits(stagehand) == 1
+    assert miss.usage.prompt_tokens == 900
+    assert (hit.usage.prompt_tokens, hit.usage.completion_tokens) == (0, 0)
+    assert hit.choices[0].message.content == miss.choices[0].message.content
@@ -0,0 +1,181 @@
+import asyncio
+import json
+
+import fakeredis.aioredis
+
+from app.services.queue_worker import QueueWorker
+
+QUEUE = "qa:test"
+
+
+def make_worker(redis, handler, **kwargs):
+    kwargs.setdefault("concurrency", 1)
+    kwargs.setdefault("max_retries", 1)
+    return QueueWorker(redis, QUEUE, handler, worker_id="w1", block_timeout_s=0.05,
+                       shutdown_timeout_s=kwargs.pop("shutdown_timeout_s", 5), **kwargs)
+
+
+async def run_until(worker, condition, timeout_s: float = 5.0):
+    """Run the worker until `condition()` holds, then stop it gracefully."""
+    task = asyncio.create_task(worker.run())
+    try:
+        async with asyncio.timeout(timeout_s):
+            while not await condition():
+                await asyncio.sleep(0.01)
+    finally:
+        worker.stop()
+        await asyncio.wait_for(task, timeout_s)
+
+
+def test_ack_removes_the_message():
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        received = []
+
+        async def handler(queue, data):
+            received.append((queue, data))
+
+        worker = make_worker(redis, handler)
+        await redis.rpush(QUEUE, json.dumps({"testcase": "login.txt"}))
+        await run_until(worker, lambda: _done(worker, processed=1))
+
+        assert received == [(QUEUE, {"testcase": "login.txt"})]
+        assert await redis.llen(QUEUE) == 0
+        assert await redis.llen(worker.processing_key) == 0
+        assert await redis.hlen(worker.attempts_key) == 0
+
+    asyncio.run(scenario())
+
+
+def test_failing_message_is_retried_then_dead_lettered():
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        calls = []
+
+        async def handler(queue, data):
+            calls.append(data)
+            raise RuntimeError("browser crashed")
+
+        worker = make_worker(redis, handler, max_retries=1)
+        raw = json.dumps({"testcase": "flaky.txt"})
+        await redis.rpush(QUEUE, raw)
+
+        async def dead_lettered():
+            return await redis.llen(worker.dead_key) == 1
+        await run_until(worker, dead_lettered)
+
+        # First failure re-queues, the second exceeds max_retries
+        assert len(calls) == 2
+        assert await redis.lrange(worker.dead_key, 0, -1) == [raw]
+        assert await redis.llen(QUEUE) == 0
+        assert await redis.llen(worker.processing_key) == 0
+        assert await redis.hlen(worker.attempts_key) == 0
+
+    asyncio.run(scenario())
+
+
+def test_invalid_json_is_dead_lettered_without_calling_the_handler():
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        calls = []
+
+        async def handler(queue, data):
+            calls.append(data)
+
+        worker = make_worker(redis, handler)
+        await redis.rpush(QUEUE, "{not json")
+
+        async def dead_lettered():
+            return await redis.llen(worker.dead_key) == 1
+        await run_until(worker, dead_lettered)
+
+        assert calls == []
+        assert await redis.lrange(worker.dead_key, 0, -1) == ["{not json"]
+        assert await redis.llen(worker.processing_key) == 0
+
+    asyncio.run(scenario())
+
+
+def test_stop_finishes_in_flight_messages():
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        started = asyncio.Event()
+        release = asyncio.Event()
+
+        async def handler(queue, data):
+            started.set()
+            await release.wait()
+
+        worker = make_worker(redis, handler)
+        await redis.rpush(QUEUE, json.dumps({"testcase": "long.txt"}))
+        task = asyncio.create_task(worker.run())
+        await asyncio.wait_for(started.wait(), 5)
+
+        worker.stop()
+        await asyncio.sleep(0.1)
+        assert not task.done()  # waits for the running testcase
+
+        release.set()
+        await asyncio.wait_for(task, 5)
+        assert worker.processed == 1
+        assert await redis.llen(worker.processing_key) == 0
+
+    asyncio.run(scenario())
+
+
+def test_shutdown_timeout_leaves_the_message_for_recovery():
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+        started = asyncio.Event()
+
+        async def handler(queue, data):
+            started.set()
+            await asyncio.Event().wait()
+
+        raw = json.dumps({"testcase": "stuck.txt"})
+        worker = make_worker(redis, handler, shutdown_timeout_s=0.1)
+        await redis.rpush(QUEUE, raw)
+        task = asyncio.create_task(worker.run())
+        await asyncio.wait_for(started.wait(), 5)
+        worker.stop()
+        await asyncio.wait_for(task, 5)
+        assert await redis.lrange(worker.processing_key, 0, -1) == [raw]
+
+        # The next worker with the same id picks it up again
+        restarted = make_worker(redis, handler)
+        assert await restarted.recover() == 1
+        assert await redis.lrange(QUEUE, 0, -1) == [raw]
+
+    asyncio.run(scenario())
+
+
+def test_consumer_survives_a_failing_ack():
+    async def scenario():
+        redis = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+        async def handler(queue, data):
+            pass
+
+        worker = make_worker(redis, handler)
+        ack = worker._ack
+        failures = []
+
+        async def flaky_ack(raw):
+            if not failures:
+                failures.append(raw)
+                raise ConnectionError("connection reset")
+            await ack(raw)
+
+        worker._ack = flaky_ack
+        await redis.rpush(QUEUE, json.dumps({"n": 1}), json.dumps({"n": 2}))
+        await run_until(worker, lambda: _done(worker, processed=1))
+
+        # The slot kept consuming after the error; the unacked message waits for recovery
+        assert len(failures) == 1
+        assert await redis.lrange(worker.processing_key, 0, -1) == failures
+
+    asyncio.run(scenario())
+
+
+async def _done(worker, processed: int) -> bool:
+    return worker.processed >= processed
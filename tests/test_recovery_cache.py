@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from app.services.recovery_cache import FIELD_VALUES_JS, RecoveryCache, verify_replay
+from app.services.selector_cache import PAGE_FINGERPRINT_JS, page_fingerprint
+
+
+class FakePage:
+    def __init__(self, location: str, fields=()):
+        self.location = location
+        self.fields = list(fields)
+
+    async def evaluate(self, script, arg=None):
+        if script == PAGE_FINGERPRINT_JS:
+            return {"location": self.location, "title": "VBO", "windows": []}
+        assert script == FIELD_VALUES_JS
+        return all(any(text in value for value in self.fields) for text in arg)
+
+
+def fingerprint(page) -> str:
+    return asyncio.run(page_fingerprint(page))
+
+
+WIZARD = FakePage("https://vbo/#wizard")
+JOBS = FakePage("https://vbo/#jobs")
+CLICK = {"type": "click", "x": 10, "y": 20, "button": "left"}
+TYPE = {"type": "type", "text": "test_365"}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return RecoveryCache(str(tmp_path / "recovery.json"))
+
+
+def key_on(page) -> str:
+    return RecoveryCache.make_key("job", "Click Next.", fingerprint(page))
+
+
+def test_agent_bookkeeping_is_not_replayed(cache):
+    actions = [{"type": "function", "name": "goto"}, {"type": "screenshot"}, CLICK]
+    assert cache.put(key_on(WIZARD), actions, fingerprint(JOBS))
+    assert cache.get(key_on(WIZARD))["actions"] == [CLICK]
+
+
+@pytest.mark.parametrize("actions", [
+    [{"type": "screenshot"}],
+    [CLICK, {"type": "open_url", "url": "https://vbo"}],
+])
+def test_recoveries_without_replayable_actions_are_not_cached(cache, actions):
+    assert not cache.put(key_on(WIZARD), actions, fingerprint(JOBS))
+
+
+def test_recovery_that_cannot_be_verified_is_not_cached(cache):
+    # Same page before and after and nothing typed: a no-op replay would look identical
+    assert not cache.put(key_on(WIZARD), [CLICK], fingerprint(WIZARD))
+    assert cache.put(key_on(WIZARD), [CLICK, TYPE], fingerprint(WIZARD))
+
+
+def test_entry_without_a_recorded_fingerprint_is_a_miss(cache):
+    cache.entries[key_on(WIZARD)] = {"actions": [CLICK], "uses": 3}
+    assert cache.get(key_on(WIZARD)) is None
+
+
+@pytest.mark.parametrize("page, actions, mismatch", [
+    (JOBS, [CLICK], None),
+    (WIZARD, [CLICK], "page fingerprint"),
+    (FakePage("https://vbo/#jobs", fields=["test_365"]), [CLICK, TYPE], None),
+    (FakePage("https://vbo/#jobs", fields=[""]), [CLICK, TYPE], "typed text"),
+])
+def test_verify_replay(page, actions, mismatch):
+    entry = {"actions": actions, "fingerprint_after": fingerprint(JOBS)}
+    reason = asyncio.run(verify_replay(page, entry))
+    if mismatch is None:
+        assert reason is None
+    else:
+        assert mismatch in reason
@@ -0,0 +1,87 @@
+import pytest
+from stagehand.schemas import ActResult as ApiActResult, AgentExecuteResult
+from stagehand.types import ActResult, ObserveResult
+from stagehand.types.agent import AgentAction, AgentResult, ClickAction
+
+from app.services.result_validation import (
+    KIND_ACT, KIND_AGENT, KIND_OBSERVE, KIND_VALUE, validate_agent_result, validate_result,
+)
+
+CLICK = ClickAction(type="click", x=10, y=20, button="left")
+
+
+def observed(selector: str) -> ObserveResult:
+    return ObserveResult(selector=selector, description="Next button")
+
+
+class UnknownResult:
+    """Neither a known type name nor any of the attributes the fallbacks probe."""
+
+
+class Pending:
+    success = False
+    message = "still loading"
+
+
+@pytest.mark.parametrize("result, success, kind", [
+    (ActResult(success=True, message="Clicked selector: xpath=/html/body/button", action="click"), True, KIND_ACT),
+    (ActResult(success=False, message="No element", action="click"), False, KIND_ACT),
+    (ApiActResult(success=True, message="done", action="click"), True, KIND_ACT),
+    ([observed("xpath=/html/body/a"), observed("xpath=/html/body/b")], True, KIND_OBSERVE),
+    ([], False, KIND_OBSERVE),
+    ({"elements": [observed("xpath=/a")]}, True, KIND_OBSERVE),
+    ({"elements": []}, False, KIND_OBSERVE),
+    ({"success": False, "message": "No element"}, False, KIND_ACT),
+    ({"success": True}, True, KIND_ACT),
+    ({}, True, KIND_ACT),
+    ("Completed", True, KIND_VALUE),
+    ("", False, KIND_VALUE),
+    (None, False, KIND_ACT),
+    ((), False, KIND_ACT),
+    (Pending(), False, KIND_ACT),
+    (UnknownResult(), True, KIND_ACT),
+], ids=lambda value: type(value).__name__ if not isinstance(value, (bool, str)) else None)
+def test_validate_result(result, success, kind):
+    outcome = validate_result(result)
+    assert (outcome.success, outcome.kind) == (success, kind)
+    assert (outcome.reason is None) == success
+
+
+def test_act_result_selectors_come_from_the_message():
+    outcome = validate_result(ActResult(success=True, message="Clicked selector: xpath=/html/body/button", action="click"))
+    assert outcome.selectors == ("xpath=/html/body/button",)
+    assert str(outcome) == "act ok: Clicked selector: xpath=/html/body/button"
+
+
+def test_observe_result_counts_elements():
+    outcome = validate_result([observed("xpath=/a"), observed("xpath=/b")])
+    assert (outcome.element_count, outcome.selectors) == (2, ("xpath=/a", "xpath=/b"))
+    assert str(outcome) == "observe found 2 element(s)"
+
+
+def test_list_subclass_is_validated_as_observe_results():
+    class Observed(list):
+        pass
+
+    outcome = validate_result(Observed([observed("xpath=/a")]))
+    assert (outcome.success, outcome.kind, outcome.element_count) == (True, KIND_OBSERVE, 1)
+
+
+@pytest.mark.parametrize("result, success, action_count", [
+    (AgentResult(actions=[CLICK, CLICK], message="done", usage=None, completed=True), True, 2),
+    (AgentResult(actions=[], message=None, usage=None, completed=True), False, 0),
+    # Wrapped actions report their own status; the last one decides
+    (AgentResult.model_construct(actions=[
+        AgentAction(action_type="click", action=CLICK, status="success"),
+        AgentAction(action_type="click", action=CLICK, status="error"),
+    ], message=None), False, 2),
+    (AgentExecuteResult(success=True, actions=[{"type": "click"}], message="done"), True, 1),
+    (AgentExecuteResult(success=False, actions=None, message="gave up"), False, 0),
+    (None, False, 0),
+    (Pending(), False, 0),
+    (UnknownResult(), True, 0),
+], ids=lambda value: type(value).__name__ if not isinstance(value, (bool, int)) else None)
+def test_validate_agent_result(result, success, action_count):
+    outcome = validate_agent_result(result)
+    assert (outcome.success, outcome.kind, outcome.action_count) == (success, KIND_AGENT, action_count)
+    assert (outcome.reason is None) == success
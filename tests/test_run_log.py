@@ -0,0 +1,95 @@
+import os
+import threading
+
+import pytest
+
+from app.services.run_log import (
+    RESTART, RUN_END, RUN_START, STEP, RunLog, load_actions, read_run_log, run_log_path,
+)
+
+
+@pytest.fixture(params=[False, True], ids=["plain", "gzip"])
+def log_path(request, tmp_path):
+    return run_log_path("run_1", str(tmp_path), compress=request.param)
+
+
+def write_run(path, steps: int = 3, end: bool = True):
+    with RunLog(path) as log:
+        log.write(RUN_START, run_id="run_1", testcase="login")
+        for n in range(1, steps + 1):
+            log.write(STEP, step=n, instruction=f"step {n}", status="success")
+        if end:
+            log.write(RUN_END, status="passed")
+
+
+def test_round_trip(log_path):
+    write_run(log_path)
+    records = list(read_run_log(log_path))
+    assert [r["type"] for r in records] == [RUN_START, STEP, STEP, STEP, RUN_END]
+    assert records[2]["instruction"] == "step 2"
+    assert load_actions(log_path) == [
+        {"step": n, "instruction": f"step {n}", "status": "success"} for n in (1, 2, 3)
+    ]
+
+
+def test_restart_discards_earlier_steps(log_path):
+    with RunLog(log_path) as log:
+        log.write(STEP, step=1, status="failed")
+        log.write(RESTART, reason="session stale")
+        log.write(STEP, step=1, status="success")
+    assert load_actions(log_path) == [{"step": 1, "status": "success"}]
+
+
+def test_appended_run_is_read_after_the_first(log_path):
+    write_run(log_path, steps=1)
+    write_run(log_path, steps=2)
+    assert [r.get("step") for r in read_run_log(log_path) if r["type"] == STEP] == [1, 1, 2]
+
+
+def test_log_of_a_running_test_is_readable(log_path):
+    """Every record is flushed, so an unfinished (not closed) log reads up to its last step."""
+    log = RunLog(log_path)
+    try:
+        log.write(RUN_START, run_id="run_1")
+        log.write(STEP, step=1, status="success")
+        assert [r["type"] for r in read_run_log(log_path)] == [RUN_START, STEP]
+    finally:
+        log.close()
+
+
+def test_truncated_last_record_is_skipped(log_path, tmp_path):
+    log = RunLog(log_path)
+    log.write(RUN_START, run_id="run_1")
+    log.write(STEP, step=1, status="success")
+    complete = os.path.getsize(log_path)
+    log.write(STEP, step=2, status="success", note="x" * 500)
+    log.close()
+
+    with open(log_path, "rb") as f:
+        data = f.read()
+    truncated = tmp_path / os.path.basename(log_path).replace("run_1", "truncated")
+    # Cut inside the last record (and, for gzip, before the stream's trailer)
+    truncated.write_bytes(data[:complete + (len(data) - complete) // 2])
+
+    assert [r.get("step") for r in read_run_log(str(truncated))] == [None, 1]
+
+
+def test_follow_waits_for_run_end(log_path):
+    log = RunLog(log_path)
+    log.write(RUN_START, run_id="run_1")
+    done = threading.Event()
+
+    def finish_run():
+        done.wait(5)
+        log.write(STEP, step=1, status="success")
+        log.write(RUN_END, status="passed")
+        log.close()
+
+    writer = threading.Thread(target=finish_run)
+    writer.start()
+    seen = []
+    for record in read_run_log(log_path, follow=True, poll_s=0.01):
+        seen.append(record["type"])
+        done.set()
+    writer.join()
+    assert seen == [RUN_START, STEP, RUN_END]
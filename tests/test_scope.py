@@ -0,0 +1,60 @@
+import asyncio
+import types
+
+from app.services import scope
+from app.services.scope import scoped_snapshot
+
+# window-1 > button-2, window-3 > field-4
+AX_TREE = [
+    {"nodeId": "root", "childIds": ["w1", "w3"]},
+    {"nodeId": "w1", "parentId": "root", "backendDOMNodeId": 1, "childIds": ["b2"]},
+    {"nodeId": "b2", "parentId": "w1", "backendDOMNodeId": 2},
+    {"nodeId": "w3", "parentId": "root", "backendDOMNodeId": 3, "childIds": ["f4"]},
+    {"nodeId": "f4", "parentId": "w3", "backendDOMNodeId": 4},
+]
+
+
+class FakePage:
+    async def send_cdp(self, method, params=None):
+        await asyncio.sleep(0)
+        return {"nodes": AX_TREE}
+
+
+def snapshot_ids(page):
+    async def snapshot():
+        result = await page.send_cdp("Accessibility.getFullAXTree")
+        return [node["nodeId"] for node in result["nodes"]]
+    return snapshot()
+
+
+def test_overlapping_scopes_stay_separate(monkeypatch):
+    async def roots(page, selector=None):
+        return [(int(selector), f"div#{selector}")]
+
+    monkeypatch.setattr(scope, "scope_roots", roots)
+    page = FakePage()
+    stagehand = types.SimpleNamespace(_page=page)
+    entered, left = asyncio.Event(), asyncio.Event()
+
+    async def step():
+        async with scoped_snapshot(stagehand, "1"):
+            await entered.wait()
+            ids = await snapshot_ids(page)
+        left.set()
+        return ids
+
+    async def speculation():
+        async with scoped_snapshot(stagehand, "3"):
+            entered.set()
+            # The step left its scope first (not LIFO); this one is unaffected
+            await left.wait()
+            return await snapshot_ids(page)
+
+    async def scenario():
+        results = await asyncio.gather(step(), speculation())
+        return results, await snapshot_ids(page)
+
+    (step_ids, speculation_ids), after = asyncio.run(scenario())
+    assert step_ids == ["w1", "b2"]
+    assert speculation_ids == ["w3", "f4"]
+    assert after == ["root", "w1", "b2", "w3", "f4"]
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from app.services.selector_cache import PartialReplayError, replay_cached_step
+
+
+class FakeLocator:
+    def __init__(self, page, selector: str, visible_only: bool = False):
+        self.page = page
+        self.selector = selector
+        self.visible_only = visible_only
+
+    def locator(self, selector: str):
+        assert selector == "visible=true"
+        return FakeLocator(self.page, self.selector, visible_only=True)
+
+    @property
+    def first(self):
+        return self
+
+    async def count(self):
+        visible, hidden = self.page.elements.get(self.selector, (0, 0))
+        return visible if self.visible_only else visible + hidden
+
+    async def fill(self, value, timeout=None):
+        self.page.performed.append(("fill", self.selector, value))
+
+    async def click(self, timeout=None):
+        if self.selector in self.page.broken:
+            raise TimeoutError(f"{self.selector} detached")
+        self.page.performed.append(("click", self.selector))
+
+
+class FakePage:
+    def __init__(self, elements: dict, broken=()):
+        # selector -> (visible matches, hidden matches)
+        self.elements = elements
+        self.broken = set(broken)
+        self.performed = []
+
+    def locator(self, selector: str):
+        return FakeLocator(self, selector)
+
+
+ENTRY = {
+    "kind": "act",
+    "selectors": [
+        {"original": "#user", "method": "fill", "value": "admin"},
+        {"original": "#login", "method": "click"},
+    ],
+}
+
+
+def replay(page):
+    return asyncio.run(replay_cached_step(page, ENTRY, 'Type "admin" and log in', timeout_ms=100))
+
+
+def test_all_selectors_resolved_replays_every_action():
+    page = FakePage({"#user": (1, 0), "#login": (1, 2)})
+    assert replay(page) is True
+    assert page.performed == [("fill", "#user", "admin"), ("click", "#login")]
+
+
+@pytest.mark.parametrize("elements", [
+    {"#user": (1, 0)},                  # second target is gone
+    {"#user": (1, 0), "#login": (0, 1)},  # only a hidden copy is left
+    {"#user": (1, 0), "#login": (2, 0)},  # ambiguous
+])
+def test_stale_entry_does_nothing_before_falling_back(elements):
+    page = FakePage(elements)
+    assert replay(page) is False
+    assert page.performed == []
+
+
+def test_failure_after_a_performed_action_is_not_a_fallback():
+    page = FakePage({"#user": (1, 0), "#login": (1, 0)}, broken={"#login"})
+    with pytest.raises(PartialReplayError):
+        replay(page)
+    assert page.performed == [("fill", "#user", "admin")]
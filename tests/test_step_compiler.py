@@ -0,0 +1,102 @@
+import os
+
+import pytest
+
+from app.testcase.step_compiler import (
+    KIND_ACT, KIND_CLICK, KIND_EXPECT, KIND_WAIT, CompiledStep, classify_step, compile_step,
+)
+
+SHIPPED_TESTCASE = os.path.join(os.path.dirname(__file__), "..", "storage", "testcase", "create_backup_job_365.txt")
+
+# Steps of storage/testcase/create_backup_job_365.txt: (step, kind, compiled or None = LLM)
+SHIPPED_STEPS = [
+    ('Type "admin" on the username input.', KIND_ACT, None),
+    ('Type "admin" on password input.', KIND_ACT, None),
+    ('Expect "Log In" to be visible.', KIND_EXPECT, CompiledStep("expect", target="Log In")),
+    ('Click the "Log In" button.', KIND_CLICK, CompiledStep("click", target="Log In", role="button")),
+    ('Expect "Data Protection" to be visible.', KIND_EXPECT, CompiledStep("expect", target="Data Protection")),
+    ("Open the Data Protection menu.", KIND_ACT, None),
+    ("Click create a new job.", KIND_CLICK, None),
+    ('Select "Backup for Microsoft 365" as the job type.', KIND_ACT, None),
+    ('Type "danh07emptygr" on the source search input.', KIND_ACT, None),
+    ("Press Enter", KIND_CLICK, CompiledStep("press", target="Enter")),
+    ('Select the checkbox labeled "danh07emptygr" Group Mailboxes.', KIND_ACT, None),
+    ('Expect "danh07emptygr" Group Mailboxes to be visible in the right panel.', KIND_EXPECT, None),
+    ("Click Next.", KIND_CLICK, None),
+    ("Click the destination repository dropdown.", KIND_CLICK, None),
+    ('Select "365_Backup".', KIND_ACT, None),
+    ('Ensure "Do not schedule, run on demand" is selected.', KIND_ACT,
+     CompiledStep("ensure", target="Do not schedule, run on demand")),
+    ('Click the "Finish & Run" button.', KIND_CLICK, CompiledStep("click", target="Finish & Run", role="button")),
+    ('Expect "Run this job?" to be visible.', KIND_EXPECT, CompiledStep("expect", target="Run this job?")),
+    ('Wait until text "Running" is not visible for job "test_365"', KIND_WAIT, None),
+    ('Expect the job status to be "Completed".', KIND_EXPECT, None),
+    ("Click the Settings menu.", KIND_CLICK, None),
+    ("Click the Repositories section.", KIND_CLICK, None),
+    ('Expect "danh07emptygr" Group Mailboxes to be visible in the backup list.', KIND_EXPECT, None),
+    ('Expect "Backup for Microsoft 365" to be visible.', KIND_EXPECT,
+     CompiledStep("expect", target="Backup for Microsoft 365")),
+    ('Expect "Sources" to be visible.', KIND_EXPECT, CompiledStep("expect", target="Sources")),
+    ('Expect "Destination" to be visible.', KIND_EXPECT, CompiledStep("expect", target="Destination")),
+    ('Expect "Schedule" to be visible.', KIND_EXPECT, CompiledStep("expect", target="Schedule")),
+    ('Expect "Options" to be visible.', KIND_EXPECT, CompiledStep("expect", target="Options")),
+    ('Type "test_365" on the Job Name field.', KIND_ACT, None),
+    ('Click the "Run" button.', KIND_CLICK, CompiledStep("click", target="Run", role="button")),
+]
+
+# Prompt-standard templates (README), including negations and quoted values
+TEMPLATES = [
+    ('Type "admin" into "Username"', CompiledStep("type", target="Username", value="admin")),
+    ('type "a b, c" into the "Job Name" field.', CompiledStep("type", target="Job Name", value="a b, c")),
+    ('Type "" into "Search"', CompiledStep("type", target="Search", value="")),
+    ('Clear the "Job Name" field', CompiledStep("clear", target="Job Name")),
+    ('Click button "Next"', CompiledStep("click", target="Next", role="button")),
+    ('Click on the "Help" link.', CompiledStep("click", target="Help", role="link")),
+    ('Open menu "Settings"', CompiledStep("open", target="Settings", role="menu")),
+    ('Open the "Repositories" section', CompiledStep("open", target="Repositories", role="section")),
+    ('Ensure "Enable retention" is not selected', CompiledStep("ensure", target="Enable retention", negate=True)),
+    ('Ensure checkbox option "Teams" is selected.', CompiledStep("ensure", target="Teams", role="checkbox")),
+    ('Select "365_Backup" from the "Repository" dropdown',
+     CompiledStep("select", target="Repository", value="365_Backup")),
+    ('Expect "Running" is not visible', CompiledStep("expect", target="Running", negate=True)),
+    ('Expect "Log In" exists', CompiledStep("expect", target="Log In")),
+    ('Wait until text "Running" is not visible.', CompiledStep("wait", target="Running", negate=True)),
+    ('Wait until "Completed" is visible', CompiledStep("wait", target="Completed")),
+    ("Press Control+A", CompiledStep("press", target="Control+A")),
+]
+
+# Close to a template but not exact: these must reach the LLM
+FALL_THROUGH = [
+    'Expect "Running" should not be visible',
+    'Expect "Running" to be visible in the right panel.',
+    'Click "Next"',
+    'Type admin into "Username"',
+    'Type "admin" into Username',
+    'Select "365_Backup"',
+    'Ensure "Teams" is checked',
+    'Wait until "Running" is not visible for job "test_365"',
+    'Press the Enter key',
+    "",
+]
+
+
+@pytest.mark.parametrize("step, kind, compiled", SHIPPED_STEPS)
+def test_shipped_testcase_steps(step, kind, compiled):
+    assert classify_step(step) == kind
+    assert compile_step(step) == compiled
+
+
+@pytest.mark.parametrize("step, compiled", TEMPLATES)
+def test_templates_compile(step, compiled):
+    assert compile_step(step) == compiled
+
+
+@pytest.mark.parametrize("step", FALL_THROUGH)
+def test_non_conforming_steps_fall_through_to_the_llm(step):
+    assert compile_step(step) is None
+
+
+def test_shipped_testcase_is_covered():
+    with open(SHIPPED_TESTCASE, encoding="utf-8") as f:
+        steps = {line.strip() for line in f if line.strip() and not line.strip().startswith(("#", "@"))}
+    assert steps <= {step for step, _, _ in SHIPPED_STEPS}
@@ -1,54 +1,48 @@
 import argparse
-import json
+import asyncio
 import logging
-import time
-import traceback
-import redis
+import socket
+
+import redis.asyncio as redis
 
 from app import create_app
 from app.config import Config
 from app.controllers.main import process_message
 from app.resources import initLogger
+from app.services.queue_worker import QueueWorker
+from app.services.session_pool import SessionPool
 
 initLogger()
 logger = logging.getLogger(Config.APP_NAME)
 
 
-def run_worker(queue_name: str):
-    logger.info(f"Listening on Redis queue → {queue_name}")
+async def run_worker(queue_name: str, worker_id: str, concurrency: int = None):
+    concurrency = concurrency or Config.WORKER_CONCURRENCY
     r = redis.from_url(Config.REDIS_URL, decode_responses=True)
 
     app = create_app()
     with app.app_context():
-        while True:
-            try:
-                # Wait for a message (blocking up to 5 seconds)
-                message = r.blpop(queue_name, timeout=5)
-                if not message:
-                    continue  # no message → loop again
-
-                _, raw_data = message
-                logger.debug(f"Received message: {raw_data}")
-
-                try:
-                    data = json.loads(raw_data)
-                except json.JSONDecodeError as e:
-                    logger.error(f"Invalid JSON in message: {e}")
-                    continue
-
-                process_message(queue_name, data)
-                logger.debug("Message processed successfully")
+        # Browser + Stagehand sessions stay warm across messages, one per slot
+        async with SessionPool(size=concurrency) as pool:
+            async def handler(queue, data):
+                return await process_message(queue, data, pool)
 
-            except Exception as e:
-                logger.error(f"Worker error: {e}")
-                logger.debug(traceback.format_exc())
+            worker = QueueWorker(
+                r, queue_name, handler,
+                worker_id=worker_id,
+                concurrency=concurrency,
+            )
+            worker.install_signal_handlers()
+            await worker.run()
 
-            time.sleep(1)
+    await r.aclose()
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run Redis queue worker")
     parser.add_argument("--queue", required=True, help="Redis queue name to listen to")
+    parser.add_argument("--worker-id", default=socket.gethostname(), help="Stable id; unacked messages of this id are recovered on start")
+    parser.add_argument("--concurrency", type=int, default=None, help="Test runs in flight (default WORKER_CONCURRENCY)")
     args = parser.parse_args()
 
-    run_worker(args.queue)
+    asyncio.run(run_worker(args.queue, args.worker_id, args.concurrency))